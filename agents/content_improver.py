@@ -1,8 +1,10 @@
 # agents/content_improver.py
-from dataclasses import dataclass
-from typing import Dict, Any
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Any, Optional
+from tools.search_query import build_search_query
 from tools.web_search import WebSearchTool
 from tools.rag_retriever import RAGRetriever
+from utils.context_cache import summarize_usage
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,6 +14,12 @@ logger = logging.getLogger(__name__)
 class ContentImprovement:
     improved_readme: str
     suggested_images: Dict[str, str]
+    # What the context packer put into the prompt (tools.context_packer.PackReport.to_dict)
+    context_report: Dict[str, Any] = field(default_factory=dict)
+    # Outline, timings and failed sections of a sectioned run (tools.sectioned_writer.SectionReport)
+    generation_report: Dict[str, Any] = field(default_factory=dict)
+    # Cached vs fresh input tokens per LLM request (utils.context_cache.summarize_usage)
+    usage: Dict[str, Any] = field(default_factory=dict)
 
 
 class ContentImproverAgent:
@@ -19,25 +27,35 @@ class ContentImproverAgent:
     Uses an LLM provider (via web_search) to propose improved README content and suggest visuals.
     """
 
-    def __init__(self, web_search: WebSearchTool, rag: RAGRetriever):
+    def __init__(self, web_search: WebSearchTool, rag: RAGRetriever, keyword_extractor=None):
         self.web_search = web_search
         self.rag = rag
+        # Condenses the README into a search query when metadata carries no tags
+        self.keyword_extractor = keyword_extractor or getattr(web_search, "keyword_extractor", None)
 
-    def run(self, readme: str, metadata: Dict[str, Any], style: str = "Technical Blog", goal: str = "") -> ContentImprovement:
-        logger.info(f"ContentImproverAgent: generating improved content (Style: {style}, Goal: {goal})")
+    def run(self, readme: str, metadata: Dict[str, Any], style: str = "Technical Blog", goal: str = "",
+            repo_context: str = "", on_partial: Optional[Callable[[str], None]] = None,
+            length: Optional[str] = None) -> ContentImprovement:
+        logger.info(f"ContentImproverAgent: generating improved content (Style: {style}, Goal: {goal}, "
+                    f"Length: {length})")
 
-        # 1. Get similar repo examples
-        examples = self.web_search.search_similar_repos(readme, top_k=3)
+        # 1. Get similar repo examples with a short title + keywords query; the metadata
+        # tags were already extracted, so reuse them instead of a second extraction
+        tags = metadata.get("tags") if isinstance(metadata, dict) else getattr(metadata, "tags", None)
+        query = build_search_query(readme, keywords=tags or None, extractor=self.keyword_extractor)
+        examples = self.web_search.search_similar_repos(query, top_k=3)
 
         # 2. Get RAG suggestions
         rag_hints = self.rag.retrieve(readme)
 
-        # 3. Synthesize improved README
-        # We inject RAG hints into the readme for the prompt context
-        context_readme = readme + \
-            "\n\n<!-- BEST PRACTICES SUGGESTIONS -->\n" + "\n".join(rag_hints)
+        # 3. Synthesize improved README; README sections, code structure, RAG hints and
+        # examples are ranked and packed into the prompt's token budget
         improved = self.web_search.summarize_and_improve(
-            context_readme, examples, style=style, goal=goal)
+            readme, examples, style=style, goal=goal, repo_context=repo_context, hints=rag_hints,
+            on_partial=on_partial, length=length)
+        report = getattr(self.web_search, "last_context_report", None)
+        generation = getattr(self.web_search, "last_generation_report", None)
+        usage = getattr(self.web_search, "last_usage", None) or []
 
         # 4. Suggest images
         suggestions = {
@@ -46,5 +64,8 @@ class ContentImproverAgent:
         }
 
         improvement = ContentImprovement(
-            improved_readme=improved, suggested_images=suggestions)
+            improved_readme=improved, suggested_images=suggestions,
+            context_report=report.to_dict() if report is not None else {},
+            generation_report=generation.to_dict() if generation is not None else {},
+            usage=summarize_usage(usage) if usage else {})
         return improvement
@@ -2,8 +2,8 @@
 from dataclasses import dataclass
 from typing import List
 from tools.arxiv_scholar import ArxivScholarTool
+from tools.markdown_index import parse_markdown
 import logging
-import re
 
 logger = logging.getLogger(__name__)
 
@@ -26,10 +26,11 @@ class FactCheckerAgent:
     def run(self, readme_text: str) -> FactCheckResult:
         logger.info("FactCheckerAgent: extracting claims")
 
-        # Simple extraction of "scientific" looking sentences
+        # Simple extraction of "scientific" looking sentences from README prose
+        # (code blocks, headings and link targets are excluded by the index)
         # In production this would use an LLM extractor
-        sentences = re.split(r'[.!?]', readme_text)
-        claims = [s.strip() for s in sentences if len(s) > 30 and
+        sentences = parse_markdown(readme_text).sentences
+        claims = [s for s in sentences if len(s) > 30 and
                   any(w in s.lower() for w in ["novel", "state-of-the-art", "outperforms", "significant", "paper", "proposed"])]
 
         verified = []
@@ -1,16 +1,29 @@
 # agents/metadata_recommender.py
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
+import json
 import os
+import re
+import time
+from tools.context_packer import estimate_tokens
 from tools.keyword_extractor import KeywordExtractor
+from utils import llm_clients, resilience
+from utils.llm_cache import LLMCache
 import logging
-try:
-    from google import genai
-except Exception:
-    genai = None
 
 logger = logging.getLogger(__name__)
 
+# Notebook markdown cells feed keyword extraction (bounded, README first)
+NOTEBOOK_KEYWORD_FILES = 5
+NOTEBOOK_KEYWORD_CHARS = 20_000
+
+# "combined": one JSON call for keywords, titles and description;
+# "multi": one call per field (keyword extraction, titles, description)
+METADATA_MODES = ("combined", "multi")
+METADATA_MODEL = "gemini-flash-latest"
+DESCRIPTION_MAX_CHARS = 250
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
 
 @dataclass
 class MetadataRecommendation:
@@ -24,28 +37,39 @@ class MetadataRecommenderAgent:
     Suggest metadata (title, tags, short description) for the repository based on README and code.
     """
 
-    def __init__(self, keyword_extractor: KeywordExtractor):
+    def __init__(self, keyword_extractor: KeywordExtractor, mode: Optional[str] = None):
         self.keyword_extractor = keyword_extractor
-        # lazy model: only create if genai is available
-        self.model = None
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if genai is not None and api_key:
-            try:
-                self.model = genai.Client(api_key=api_key)
-            except Exception:
-                self.model = None
+        self.mode = mode or os.getenv("PUBLISH_ASSIST_METADATA_MODE", "combined")
+        if self.mode not in METADATA_MODES:
+            raise ValueError(f"Unknown metadata mode {self.mode!r}; expected one of {METADATA_MODES}")
+        # Shared long-lived client; None without google-genai or GOOGLE_API_KEY
+        self.model = llm_clients.get_client("google")
 
-    def run(self, readme_text: str, code_files: dict) -> MetadataRecommendation:
-        logger.info("MetadataRecommenderAgent: extracting keywords")
+    def run(self, readme_text: str, code_files: dict, symbols: Any = None) -> MetadataRecommendation:
+        logger.info("MetadataRecommenderAgent: extracting keywords (%s mode)", self.mode)
+        start = time.perf_counter()
+        keyword_text = self._keyword_text(readme_text, code_files)
 
-        # Extract keywords
-        keywords = self.keyword_extractor.extract(readme_text)
+        # Combined mode asks once for all fields; any field missing or invalid there
+        # falls back to its own call below
+        fields = {}
+        if self.model and self.mode == "combined":
+            fields = self._combined_metadata(readme_text, keyword_text)
+
+        # Extract keywords from the README plus notebook markdown cells; file names and
+        # docstrings from the symbol index inform the heuristic scorer
+        keywords = fields.get("keywords") or self.keyword_extractor.extract(
+            keyword_text,
+            docstrings=self._docstrings(symbols),
+            file_names=list(code_files or ()))
 
         # Use simple heuristics or LLM for title generation
-        title_suggestions = self._make_titles(readme_text, keywords)
+        title_suggestions = fields.get("titles") or self._make_titles(readme_text, keywords)
 
         # Generate description using Gemini
-        short_desc = self._generate_description(readme_text, keywords)
+        short_desc = fields.get("description") or self._generate_description(readme_text, keywords)
+        logger.info("MetadataRecommenderAgent: metadata ready in %.2fs (%s mode, %d/3 fields combined)",
+                    time.perf_counter() - start, self.mode, len(fields))
 
         rec = MetadataRecommendation(
             title_suggestions=title_suggestions,
@@ -54,6 +78,55 @@ class MetadataRecommenderAgent:
         )
         return rec
 
+    def _keyword_text(self, readme_text: str, code_files) -> str:
+        """README followed by the markdown cells of the first few notebooks of a RepoView."""
+        parts, budget = [readme_text], NOTEBOOK_KEYWORD_CHARS
+        for path in getattr(code_files, "notebook_paths", [])[:NOTEBOOK_KEYWORD_FILES]:
+            try:
+                cells = code_files.notebook_cells(path)
+            except Exception as e:
+                logger.warning("Failed to read notebook %s: %s", path, e)
+                continue
+            for cell in cells:
+                if cell.cell_type == "markdown" and budget > 0:
+                    parts.append(cell.source[:budget])
+                    budget -= len(parts[-1])
+        return "\n\n".join(p for p in parts if p)
+
+    def _combined_metadata(self, readme: str, keyword_text: str) -> Dict[str, Any]:
+        """Keywords, titles and description from one JSON call; only valid fields are returned."""
+        top_k = getattr(self.keyword_extractor, "top_k", 10)
+        prompt = f"""
+        Analyze this AI/Software project and return ONLY a JSON object with exactly these fields:
+        {{"keywords": [...], "titles": [...], "description": "..."}}
+        - keywords: the top {top_k} most relevant technical keywords, topics, and libraries
+        - titles: 3 catchy, professional titles, each ideally including a relevant emoji
+        - description: one high-impact, emoji-rich sentence (max 200 chars) with at least one relevant emoji
+
+        Text:
+        {keyword_text[:3000]}
+        """
+        try:
+            text = self._complete(prompt, config={"response_mime_type": "application/json"})
+        except Exception as e:
+            logger.error("Combined metadata call failed, using per-field calls: %s", e)
+            return {}
+        fields = parse_metadata_json(text, top_k=top_k)
+        missing = {"keywords", "titles", "description"} - fields.keys()
+        if missing:
+            logger.warning("Combined metadata response invalid for %s; falling back per field", sorted(missing))
+        return fields
+
+    @staticmethod
+    def _docstrings(symbols) -> List[str]:
+        """Module, class and function docstring summaries of a SymbolIndex."""
+        docs = []
+        for module in getattr(symbols, "modules", {}).values():
+            docs.append(module.doc)
+            docs.extend(c.doc for c in module.classes)
+            docs.extend(f.doc for f in module.functions)
+        return [d for d in docs if d]
+
     def _make_titles(self, readme: str, keywords: List[str]) -> List[str]:
         if not self.model or not keywords:
             base = " ".join(keywords[:2]).title() if keywords else "Project"
@@ -67,11 +140,8 @@ class MetadataRecommenderAgent:
         Return a comma-separated list. Each title should ideally include a relevant emoji.
         """
         try:
-            response = self.model.models.generate_content(
-                model="gemini-flash-latest",
-                contents=prompt
-            )
-            return [t.strip() for t in response.text.split(",") if t.strip()]
+            text = self._complete(prompt)
+            return [t.strip() for t in text.split(",") if t.strip()]
         except Exception:
             base = " ".join(keywords[:3]).title()
             return [f"{base} Project", f"Advanced {base}", f"{base} Implementation"]
@@ -87,11 +157,60 @@ class MetadataRecommenderAgent:
         Use at least one relevant emoji in the description.
         """
         try:
-            response = self.model.models.generate_content(
-                model="gemini-flash-latest",
-                contents=prompt
-            )
-            desc = response.text.replace("\n", " ").strip()
+            desc = self._complete(prompt).replace("\n", " ").strip()
             return desc if len(desc) < 250 else desc[:247] + "..."
         except Exception:
             return "A software project utilizing " + ", ".join(keywords[:3])
+
+    def _complete(self, prompt: str, config: Optional[Dict[str, Any]] = None) -> str:
+        """Gemini completion through the shared response cache, client pool and resilience layer."""
+        def call():
+            extra = {"config": config} if config else {}
+            return resilience.call("google", lambda: self.model.models.generate_content(
+                model=METADATA_MODEL,
+                contents=prompt,
+                **extra
+            ).text, tokens=estimate_tokens(prompt))
+
+        text = LLMCache.default().get_or_call("google", METADATA_MODEL, prompt, call, params=config)
+        if not text:
+            raise ValueError("empty response")
+        return text
+
+
+def _string_list(value: Any, limit: int) -> Optional[List[str]]:
+    if not isinstance(value, list):
+        return None
+    items: List[str] = []
+    for item in value:
+        if isinstance(item, str) and item.strip() and item.strip() not in items:
+            items.append(item.strip())
+    return items[:limit] or None
+
+
+def parse_metadata_json(text: str, top_k: int = 10) -> Dict[str, Any]:
+    """
+    Validate a combined metadata response against its schema:
+      keywords: non-empty list of strings (at most top_k)
+      titles: non-empty list of strings (at most 5)
+      description: non-empty string (truncated to DESCRIPTION_MAX_CHARS)
+    Returns only the fields that validate, so callers can fall back per field.
+    """
+    try:
+        data = json.loads(_JSON_FENCE.sub("", text.strip()))
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    fields: Dict[str, Any] = {}
+    keywords = _string_list(data.get("keywords"), top_k)
+    if keywords:
+        fields["keywords"] = keywords
+    titles = _string_list(data.get("titles"), 5)
+    if titles:
+        fields["titles"] = titles
+    desc = data.get("description")
+    if isinstance(desc, str) and desc.strip():
+        desc = " ".join(desc.split())
+        fields["description"] = desc if len(desc) <= DESCRIPTION_MAX_CHARS else desc[:DESCRIPTION_MAX_CHARS - 3] + "..."
+    return fields
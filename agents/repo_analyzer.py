@@ -1,7 +1,12 @@
 # agents/repo_analyzer.py
-from dataclasses import dataclass
-from typing import Dict, Any, List
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Mapping, Optional
+from tools.code_stats import CodeStats
+from tools.markdown_index import MarkdownIndex, parse_markdown
+from tools.notebook_reader import from_percent_script, is_notebook
+from tools.repo_manifest import ChangeSet
 from tools.repo_parser import RepoParser
+from tools.symbol_index import ModuleSymbols, SymbolIndex, SymbolIndexBuilder
 
 import logging
 logger = logging.getLogger(__name__)
@@ -9,11 +14,23 @@ logger = logging.getLogger(__name__)
 
 @dataclass
 class RepoAnalysis:
-    files: Dict[str, str]
+    # Lazy path -> content mapping (a RepoView); files are read only when accessed
+    files: Mapping[str, str]
     readme: str
     summary: str
     code_stats: Dict[str, Any]
     missing_sections: List[str]
+    # Files added/modified/removed since the project's previous run (None without a project_id)
+    changes: Optional[ChangeSet] = None
+    # Text files indexed but not read because of the scan budget (lowest priority first out)
+    skipped_files: List[str] = field(default_factory=list)
+    # AST outline of the Python code (modules, classes, functions, entry points, CLI flags)
+    symbols: Optional[SymbolIndex] = None
+
+    @property
+    def readme_index(self) -> MarkdownIndex:
+        """Parsed heading/code/link index of the README (parsed once, then memoized)."""
+        return parse_markdown(self.readme)
 
 
 class RepoAnalyzerAgent:
@@ -22,47 +39,124 @@ class RepoAnalyzerAgent:
     Responsibilities:
       - Parse repo files
       - Extract README content, list files
-      - Produce basic code metrics (line counts, languages)
+      - Produce per-language code metrics (code/comment/blank lines, bytes, files)
+      - Build a compact symbol index of the Python code (same pass over the files)
       - Detect missing documentation sections
+      - Report which files changed since the previous run of the same project;
+        files unchanged since then are not read again, their line counts, notebook
+        cells and symbols come from the project's manifest
+      - Report which files the scan budget left unread
     """
 
-    def __init__(self, repo_source: str, repo_parser: RepoParser):
+    def __init__(self, repo_source: str, repo_parser: RepoParser, project_id: Optional[str] = None):
         self.repo_source = repo_source
         self.parser = repo_parser
+        self.project_id = project_id
 
     def run(self) -> RepoAnalysis:
         logger.info("RepoAnalyzerAgent: parsing repository %s",
                     self.repo_source)
-        parsed = self.parser.parse(self.repo_source)
-        readme = parsed.get("README.md") or parsed.get("README") or ""
-        code_stats = self._compute_code_stats(parsed.get("files", {}))
-        missing = self._detect_missing_sections(readme)
-        # derive a short summary from the README (first non-empty paragraph)
-        summary = ""
-        for part in (p.strip() for p in readme.split("\n\n") if p.strip()):
-            summary = part
-            break
-        if not summary:
-            summary = parsed.get("title", "")
+        view = self.parser.scan(self.repo_source, project_id=self.project_id)
+        readme = view.readme
+        py_files = sum(1 for p in view if p.endswith(".py") and view.cached_analysis(p) is None)
+        symbols = SymbolIndexBuilder(expected_files=py_files)
+        per_file: Dict[str, Dict[str, Any]] = {}
+        code_stats = self._compute_code_stats(view, symbols, per_file)
+        symbol_index = symbols.build()
+        for path, results in per_file.items():
+            if path.endswith(".py"):
+                module = symbol_index.modules.get(path)
+                results["symbols"] = module.to_dict() if module is not None else None
+            view.store_analysis(path, results)
+        index = parse_markdown(readme)
+        missing = self._detect_missing_sections(index)
+        # derive a short summary from the README (first prose paragraph)
+        summary = index.paragraphs[0] if index.paragraphs else ""
 
         analysis = RepoAnalysis(
-            files=parsed.get("files", {}), readme=readme, summary=summary, code_stats=code_stats, missing_sections=missing
+            files=view, readme=readme, summary=summary, code_stats=code_stats, missing_sections=missing,
+            changes=view.changes, skipped_files=[e.path for e in view.skipped_entries],
+            symbols=symbol_index
         )
+        if analysis.skipped_files:
+            logger.info("RepoAnalyzerAgent: %d files skipped by the scan budget", len(analysis.skipped_files))
         # Return analysis directly (message bus removed)
         logger.debug("RepoAnalyzerAgent: analysis completed")
         return analysis
 
-    def _compute_code_stats(self, files: Dict[str, str]) -> Dict[str, Any]:
-        languages = {}
-        total_lines = 0
-        for fname, content in files.items():
-            total_lines += content.count("\n") + 1
-            ext = fname.split(".")[-1] if "." in fname else "txt"
-            languages[ext] = languages.get(ext, 0) + 1
-        return {"file_count": len(files), "languages": languages, "total_lines": total_lines}
+    def _compute_code_stats(self, files: Mapping[str, str], symbols: Optional[SymbolIndexBuilder] = None,
+                            per_file: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Per-language code/comment/blank totals in one streaming pass over the files;
+        Python sources are handed to the symbol index builder on the way. Files with
+        cached results (see RepoView.cached_analysis) are not read; the results of the
+        files that were read are collected in ``per_file``."""
+        stats = CodeStats()
+        notebooks = {"files": 0, "code_cells": 0, "markdown_cells": 0}
+        entries = getattr(files, "entries", {})
+        if hasattr(files, "iter_contents"):
+            # Stream contents one file at a time when given a lazy view
+            to_read = [p for p in files if not self._add_cached(files, p, stats, symbols, notebooks)]
+            items = self._iter_view(files, to_read)
+        else:
+            items = files.items()
+        for fname, content in items:
+            entry = entries.get(fname)
+            results = {"lines": list(stats.add(fname, content, size=entry.size if entry is not None else None))}
+            if symbols is not None and fname.endswith(".py"):
+                symbols.add(fname, content, digest=entry.digest if entry is not None else None)
+            if is_notebook(fname):
+                # A lazy view keeps the cells it parsed for the text; plain dicts hold cell text
+                cells = (files.notebook_cells(fname) if hasattr(files, "notebook_cells")
+                         else from_percent_script(content))
+                results["cells"] = [sum(c.cell_type == "code" for c in cells),
+                                    sum(c.cell_type == "markdown" for c in cells)]
+                self._count_cells(notebooks, *results["cells"])
+            if per_file is not None:
+                per_file[fname] = results
+        # Binary files count toward the file mix but are never read
+        for entry in getattr(files, "binary_entries", []):
+            stats.add_binary(entry.size)
+        stats.skipped_files = len(getattr(files, "skipped_entries", []))
+        return {**stats.to_dict(), "notebooks": notebooks}
+
+    @staticmethod
+    def _iter_view(view, paths: List[str]):
+        """Contents of ``paths``; the README comes from the view's copy instead of a second read."""
+        if view.readme_path in paths:
+            yield view.readme_path, view.readme
+        yield from view.iter_contents([p for p in paths if p != view.readme_path])
+
+    def _add_cached(self, view, path: str, stats: CodeStats, symbols: Optional[SymbolIndexBuilder],
+                    notebooks: Dict[str, int]) -> bool:
+        """Count a file from the results stored by an earlier scan; False if there are none."""
+        cached = view.cached_analysis(path)
+        if not cached:
+            return False
+        entry = view.entries[path]
+        try:
+            code, comment, blank = (int(n) for n in cached["lines"])
+            cells = tuple(int(n) for n in cached["cells"]) if is_notebook(path) else None
+            if cells is not None and len(cells) != 2:
+                raise ValueError(cells)
+            module = cached.get("symbols")
+            module = ModuleSymbols.from_dict(module) if module else None
+        except (KeyError, TypeError, ValueError):
+            return False  # unreadable record: analyze the file again
+        stats.add_counts(path, code, comment, blank, size=entry.size)
+        if cells is not None:
+            self._count_cells(notebooks, *cells)
+        if symbols is not None and path.endswith(".py"):
+            symbols.add_symbols(path, module, digest=entry.digest)
+        return True
+
+    @staticmethod
+    def _count_cells(notebooks: Dict[str, int], code: int, markdown: int) -> None:
+        notebooks["files"] += 1
+        notebooks["code_cells"] += code
+        notebooks["markdown_cells"] += markdown
 
-    def _detect_missing_sections(self, readme: str) -> List[str]:
+    def _detect_missing_sections(self, index: MarkdownIndex) -> List[str]:
+        # Only real headings count; a word mentioned in passing is not a section
         required = ["Installation", "Usage", "License",
                     "Contributing", "Credits", "Examples"]
-        missing = [r for r in required if r.lower() not in readme.lower()]
-        return missing
+        return index.missing_sections(required)
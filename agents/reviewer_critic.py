@@ -3,6 +3,8 @@ from dataclasses import dataclass
 from typing import List, Dict, Any
 import logging
 
+from tools.markdown_index import parse_markdown
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,7 +31,8 @@ class ReviewerCriticAgent:
         strengths = []
         recommendations = []
 
-        if "installation" not in readme.lower():
+        index = parse_markdown(readme)
+        if not index.has_section("Installation"):
             issues.append("Missing 'Installation' section.")
             recommendations.append(
                 "Add installation instructions with examples.")
@@ -3,6 +3,8 @@ from tools.rag_retriever import RAGRetriever
 from tools.keyword_extractor import KeywordExtractor
 from tools.web_search import WebSearchTool
 from tools.repo_parser import RepoParser
+from tools.markdown_index import parse_markdown
+from tools.repo_manifest import RepoManifest
 from agents.fact_checker import FactCheckerAgent
 from agents.reviewer_critic import ReviewerCriticAgent
 from agents.content_improver import ContentImproverAgent
@@ -15,6 +17,7 @@ import os
 import tempfile
 import json
 import re
+from contextlib import closing
 from pathlib import Path
 from dotenv import load_dotenv
 load_dotenv()
@@ -29,6 +32,8 @@ logger = logging.getLogger(__name__)
 
 # Projects persistence file
 PROJECTS_FILE = Path("projects.json")
+# Per-project file manifests used for incremental re-parsing
+MANIFESTS_DIR = PROJECTS_FILE.parent / "manifests"
 
 
 def load_projects():
@@ -65,6 +70,9 @@ def delete_project(project_id: str):
         projects.pop(project_id)
         with PROJECTS_FILE.open("w", encoding="utf-8") as f:
             json.dump(projects, f, indent=2)
+        manifest = RepoManifest.for_project(project_id, str(MANIFESTS_DIR))
+        if os.path.exists(manifest.path):
+            os.remove(manifest.path)
     return list(projects.keys())
 
 
@@ -88,8 +96,9 @@ def validate_repo_logic(repo_url):
 
     parser = RepoParser()
     try:
-        result = parser.parse(repo_url)
-        files = list(result.get("files", {}).keys())[:20]
+        # Only the file index is needed here; scan() never reads file contents
+        with parser.scan(repo_url) as view:
+            files = list(view)[:20]
         tree = "\n".join([f"📄 {f}" for f in files])
         return "✅ Repository validated successfully.", tree
     except Exception as e:
@@ -99,82 +108,97 @@ def validate_repo_logic(repo_url):
             with open(os.path.join(temp_dir, "README.md"), "w") as f:
                 f.write(
                     "# Fallback Project\nRemote clone failed, showing local structure.")
-            result = parser.parse(temp_dir)
-            files = list(result.get("files", {}).keys())
+            with parser.scan(temp_dir) as view:
+                files = list(view)
             tree = "\n".join([f"📄 {f}" for f in files])
             return f"ℹ️ Remote clone failed. Using offline sample fallback.", tree
         except:
             return f"❌ Validation Error: {str(e)}", ""
 
 
-def generate_full_article(repo_url, style, length, model, goal, project_desc, provider=None):
-    """The main generation pipeline triggered by the 'Generate' button."""
+def _build_agents(repo_url, model, provider, project_id):
+    parser = RepoParser(manifest_dir=str(MANIFESTS_DIR))
+    kw, rag = KeywordExtractor(), RAGRetriever()
+    web = WebSearchTool(selected_model=model, provider=provider, keyword_extractor=kw)
+    scholar = ArxivScholarTool()
+    return {
+        "repo_analyzer": RepoAnalyzerAgent(repo_url, parser, project_id=project_id),
+        "metadata_recommender": MetadataRecommenderAgent(kw),
+        "content_improver": ContentImproverAgent(web, rag),
+        "reviewer_critic": ReviewerCriticAgent(),
+        "fact_checker": FactCheckerAgent(scholar),
+    }
+
+
+def _format_header(metadata):
+    """Title and tag pills (HTML) for the output panel."""
+    title = (getattr(metadata, 'title_suggestions', None) or ["Untitled Project"])[0]
+    tags = getattr(metadata, 'tags', ["AI", "Research"])
+    # Render tags as HTML pill badges (only once, at the top)
+    tags_html = render_tags_as_html(tags)
+    out_tags = '<div style="margin-top: 10px; margin-bottom: 2px; font-weight: bold; font-size: 18px;">Project Tags</div>' + tags_html
+    return f"# {title}", out_tags
+
+
+def _format_body(improved_readme, placeholder="No improvements generated."):
+    """Improved README without its top-level title and tags block."""
+    body_start = parse_markdown(improved_readme).preamble_end(labels=("Project Tags",))
+    return improved_readme[body_start:].lstrip('\n') or placeholder
+
+
+def stream_full_article(repo_url, style, length, model, goal, project_desc, provider=None, project_id=None):
+    """
+    The generation pipeline as a generator of (title, subtitle, tags, body) tuples:
+    a status line while the repository is analyzed, title and tags as soon as the
+    metadata is ready, then the README body as the LLM streams it, and the final
+    formatted article last.
+    """
     if not repo_url:
-        return "Error", "Error", "Please provide a URL", "The URL is missing."
+        yield "Error", "Error", "Please provide a URL", "The URL is missing."
+        return
 
+    # The lazy RepoView holds a git mirror lease and a cat-file process; release both
+    # when this generator ends, including when Gradio abandons it (GeneratorExit)
+    analysis = None
     try:
-        # Instantiate Tools & Agents
-        parser, kw, rag = RepoParser(), KeywordExtractor(), RAGRetriever()
-        web = WebSearchTool(selected_model=model, provider=provider)
-        scholar = ArxivScholarTool()
-        agents = {
-            "repo_analyzer": RepoAnalyzerAgent(repo_url, parser),
-            "metadata_recommender": MetadataRecommenderAgent(kw),
-            "content_improver": ContentImproverAgent(web, rag),
-            "reviewer_critic": ReviewerCriticAgent(),
-            "fact_checker": FactCheckerAgent(scholar),
-        }
-
-        # Run Pipeline
+        agents = _build_agents(repo_url, model, provider, project_id)
         orch = Orchestrator()
-        result = orch.run_pipeline(agents, repo_url, style=style, goal=goal)
-
-        analysis = result.get("analysis")
-        metadata = result.get("metadata")
-        content_impr = result.get("content_improvement")
-
-        # Formatting Output
-        title = getattr(metadata, 'title_suggestions', ["Untitled Project"])[0]
-        subtitle = getattr(metadata, 'short_description',
-                           project_desc or "Analysis Result")
-        tags = getattr(metadata, 'tags', ["AI", "Research"])
-
-        # Render tags as HTML pill badges (only once, at the top)
-        tags_html = render_tags_as_html(tags)
-
-        # Build structured body: only one title, add 'Project Tags' subtitle above tags, and ensure tags are not repeated in the body
-        # Compose output: title, 'Project Tags' subtitle, tags, then cleaned body
-        out_title = f"# {title}"
-        out_tags = '<div style="margin-top: 10px; margin-bottom: 2px; font-weight: bold; font-size: 18px;">Project Tags</div>' + tags_html
-        improved_readme = getattr(
-            content_impr, 'improved_readme', "No improvements generated.")
-
-        # Remove any top-level title and tags section from improved_readme
-        import re
-        lines = improved_readme.splitlines()
-        cleaned_lines = []
-        skip = True
-        for i, line in enumerate(lines):
-            # Skip initial title (lines starting with # or ## at the very top)
-            if skip and (re.match(r'^\s*#{1,3} ', line) or re.match(r'^\s*Project Tags', line, re.IGNORECASE) or re.match(r'^\s*<div.*?>.*?</div>', line)):
-                continue
-            # Skip badge/tag lines (HTML or markdown) immediately after title
-            if skip and (re.match(r'^\s*<span|^\s*<div|^\s*#\w+', line)):
-                continue
-            # Once we hit a non-title/tag line, stop skipping
-            if skip and line.strip() and not (re.match(r'^\s*#{1,3} ', line) or re.match(r'^\s*Project Tags', line, re.IGNORECASE) or re.match(r'^\s*<div.*?>.*?</div>', line) or re.match(r'^\s*<span|^\s*#\w+', line)):
-                skip = False
-            if not skip:
-                cleaned_lines.append(line)
-        body = '\n'.join(cleaned_lines).lstrip(
-            '\n') or "No improvements generated."
-
-        # Only return one title, then tags, then body (no subtitle)
-        return out_title, "", out_tags, body
+        title, tags = "", ""
+        yield title, "", tags, "⏳ Analyzing repository..."
+        with closing(orch.stream_pipeline(agents, repo_url, style=style, goal=goal, length=length)) as events:
+            for event in events:
+                if event["type"] == "stage" and event["stage"] == "analyze_repo":
+                    analysis = event["state"].get("repo_analysis")
+                elif event["type"] == "stage" and event["stage"] == "recommend_metadata":
+                    title, tags = _format_header(event["state"].get("metadata"))
+                    yield title, "", tags, "✍️ Generating article..."
+                elif event["type"] == "partial":
+                    yield title, "", tags, _format_body(event["text"], placeholder="✍️ Generating article...")
+                elif event["type"] == "result":
+                    result = event["result"]
+                    analysis = result.get("analysis") or analysis
+                    title, tags = _format_header(result.get("metadata"))
+                    improved_readme = getattr(
+                        result.get("content_improvement"), 'improved_readme', "No improvements generated.")
+                    # Only return one title, then tags, then body (no subtitle)
+                    yield title, "", tags, _format_body(improved_readme)
 
     except Exception as e:
         logger.exception("Generation failed")
-        return "Error", "Error", "", f"Pipeline failed: {str(e)}"
+        yield "Error", "Error", "", f"Pipeline failed: {str(e)}"
+    finally:
+        files = getattr(analysis, "files", None)
+        if hasattr(files, "close"):
+            files.close()
+
+
+def generate_full_article(repo_url, style, length, model, goal, project_desc, provider=None, project_id=None):
+    """The main generation pipeline, returning only the final (title, subtitle, tags, body)."""
+    outputs = ("Error", "Error", "", "Pipeline produced no output.")
+    for outputs in stream_full_article(repo_url, style, length, model, goal, project_desc,
+                                       provider=provider, project_id=project_id):
+        pass
+    return outputs
 
 
 # --- Gradio UI (CSS removed; using a soft theme and simple Markdown for styling) ---
@@ -253,6 +277,9 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
                             placeholder="https://github.com/user/repo", scale=4, container=False)
                         validate_btn = gr.Button(
                             "🔍 Validate", scale=1, variant="secondary")
+                    archive_upload = gr.File(
+                        label="...or upload a repository archive (.zip, .tar.gz, .tar.zst)",
+                        file_types=[".zip", ".gz", ".tgz", ".zst"], file_count="single")
 
                     val_msg = gr.Markdown(visible=False)
                     tree_viewer = gr.Code(
@@ -296,6 +323,14 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
         msg, tree = validate_repo_logic(url)
         return gr.update(value=msg, visible=True), tree
 
+    # An uploaded archive is parsed from its temp path like any local source
+    def on_archive_upload(file):
+        path = getattr(file, "name", file) if file else ""
+        return gr.update(value=path or "")
+
+    archive_upload.upload(on_archive_upload, inputs=[
+                          archive_upload], outputs=[repo_url_input])
+
     validate_btn.click(on_validate, inputs=[
                        repo_url_input, proj_mode, existing_proj_dropdown], outputs=[val_msg, tree_viewer])
 
@@ -338,8 +373,11 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
             # Create new project: pick provided id or generate from repo URL
             project_id_to_save = new_id.strip() if new_id and new_id.strip() else slugify(final_url)
 
-        title, sub, tags, body = generate_full_article(
-            final_url, style, length, model_id, goal, desc, provider)
+        # Stream partial Markdown into the output panel as the article is generated
+        title = sub = tags = body = ""
+        for title, sub, tags, body in stream_full_article(
+                final_url, style, length, model_id, goal, desc, provider, project_id=project_id_to_save):
+            yield gr.update(visible=True), title, sub, tags, body, gr.update()
 
         # If we created a new project, persist it
         if mode != "Use Existing Project" and project_id_to_save:
@@ -350,7 +388,7 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
 
         # After potential save, refresh choices
         updated_choices = list(load_projects().keys())
-        return gr.update(visible=True), title, sub, tags, body, gr.update(choices=updated_choices, value=project_id_to_save or "", visible=len(updated_choices) > 0)
+        yield gr.update(visible=True), title, sub, tags, body, gr.update(choices=updated_choices, value=project_id_to_save or "", visible=len(updated_choices) > 0)
 
     generate_btn.click(
         on_generate,
@@ -26,10 +26,10 @@ def build_agents(repo_source: str):
     keyword_extractor = KeywordExtractor()
     metadata_recommender = MetadataRecommenderAgent(
         keyword_extractor=keyword_extractor)
-    web_search = WebSearchTool()
+    web_search = WebSearchTool(keyword_extractor=keyword_extractor)
     rag_retriever = RAGRetriever()
     content_improver = ContentImproverAgent(
-        web_search=web_search, rag=rag_retriever)
+        web_search=web_search, rag=rag_retriever, keyword_extractor=keyword_extractor)
     reviewer = ReviewerCriticAgent()
     scholar = ArxivScholarTool()
     fact_checker = FactCheckerAgent(scholar_tool=scholar)
@@ -47,11 +47,13 @@ def main():
     parser = argparse.ArgumentParser("Publication Assistant")
     parser.add_argument("--repo-path", required=True,
                         help="Path to repository directory or zip file")
+    parser.add_argument("--length", choices=["Short", "Medium", "Long"], default="Medium",
+                        help="Target article length (Long is generated section by section)")
     args = parser.parse_args()
     repo_path = args.repo_path
     agents = build_agents(repo_path)
     orchestrator = Orchestrator()
-    result = orchestrator.run_pipeline(agents=agents, repo_source=repo_path)
+    result = orchestrator.run_pipeline(agents=agents, repo_source=repo_path, length=args.length)
     # Print a concise report
     print("=== Publication Assistant Report ===")
     print("Suggested titles:", result["metadata"].title_suggestions)
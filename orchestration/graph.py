@@ -1,20 +1,35 @@
 # orchestration/graph.py
 from langgraph.graph import StateGraph, END  # type: ignore
 import logging
-from typing import Any, Dict
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional
 
 from utils.evaluation import evaluate_recommendations
 
 logger = logging.getLogger(__name__)
 
 
+class PipelineCancelled(RuntimeError):
+    """The consumer of stream_pipeline went away; the remaining nodes are skipped."""
+
+
 class Orchestrator:
     def __init__(self, bus: Any = None):
         logger.info("Initializing Orchestrator with LangGraph")
         self.bus = bus
 
-    def run_pipeline(self, agents: Dict[str, Any], repo_source: str, style: str = "Technical Blog", goal: str = ""):
-        """Run pipeline using LangGraph."""
+    def run_pipeline(self, agents: Dict[str, Any], repo_source: str, style: str = "Technical Blog", goal: str = "",
+                     on_partial: Optional[Callable[[str], None]] = None,
+                     on_stage: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                     length: Optional[str] = None):
+        """
+        Run pipeline using LangGraph.
+        ``length`` ("Short", "Medium", "Long") is the target article length; "Long"
+        articles are generated section by section in parallel.
+        ``on_stage(name, state)`` is called after each node; ``on_partial(text)`` receives
+        the improved README generated so far while the content improver streams it.
+        """
         logger.info(
             f"Orchestrator: executing pipeline (Style: {style}, Goal: {goal})")
 
@@ -28,8 +43,13 @@ class Orchestrator:
             repo_analysis = state.get("repo_analysis")
             if not repo_analysis:
                 raise ValueError("Repo analysis missing in state")
+            # Docstrings sharpen the heuristic keyword scorer when a symbol index exists
+            extra = {}
+            symbols = getattr(repo_analysis, "symbols", None)
+            if symbols is not None and len(symbols):
+                extra["symbols"] = symbols
             metadata = agents["metadata_recommender"].run(
-                repo_analysis.readme, repo_analysis.files)
+                repo_analysis.readme, repo_analysis.files, **extra)
             return {**state, "metadata": metadata}
 
         def improve_content(state):
@@ -40,8 +60,17 @@ class Orchestrator:
             # style and goal are already in state from inputs
             style_val = state.get("style", "Technical Blog")
             goal_val = state.get("goal", "")
+            # Ground architecture/usage sections in the code's symbol index when available
+            extra = {}
+            symbols = getattr(repo_analysis, "symbols", None)
+            if symbols is not None and len(symbols):
+                extra["repo_context"] = symbols.to_prompt()
+            if on_partial is not None:
+                extra["on_partial"] = on_partial
+            if state.get("length"):
+                extra["length"] = state["length"]
             content_improvement = agents["content_improver"].run(
-                repo_analysis.readme, metadata, style=style_val, goal=goal_val)
+                repo_analysis.readme, metadata, style=style_val, goal=goal_val, **extra)
             return {**state, "content_improvement": content_improvement}
 
         def review_content(state):
@@ -57,11 +86,21 @@ class Orchestrator:
                 getattr(repo_analysis, 'readme', ''))
             return {**state, "fact_check": fact_issues}
 
-        workflow.add_node("analyze_repo", analyze_repo)
-        workflow.add_node("recommend_metadata", recommend_metadata)
-        workflow.add_node("improve_content", improve_content)
-        workflow.add_node("review_content", review_content)
-        workflow.add_node("fact_check", fact_check)
+        def node(name, fn):
+            if on_stage is None:
+                return fn
+
+            def run(state):
+                new_state = fn(state)
+                on_stage(name, new_state)
+                return new_state
+            return run
+
+        workflow.add_node("analyze_repo", node("analyze_repo", analyze_repo))
+        workflow.add_node("recommend_metadata", node("recommend_metadata", recommend_metadata))
+        workflow.add_node("improve_content", node("improve_content", improve_content))
+        workflow.add_node("review_content", node("review_content", review_content))
+        workflow.add_node("fact_check", node("fact_check", fact_check))
 
         workflow.set_entry_point("analyze_repo")
         workflow.add_edge("analyze_repo", "recommend_metadata")
@@ -74,7 +113,8 @@ class Orchestrator:
         inputs = {
             "repo_source": repo_source,
             "style": style,
-            "goal": goal
+            "goal": goal,
+            "length": length,
         }
         result = compiled.invoke(inputs)
 
@@ -94,3 +134,60 @@ class Orchestrator:
             "fact_check": result.get("fact_check"),
             "evaluation": evaluation,
         }
+
+    def stream_pipeline(self, agents: Dict[str, Any], repo_source: str, style: str = "Technical Blog",
+                        goal: str = "", length: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Run the pipeline in a background thread and yield its progress as events:
+          {"type": "stage", "stage": name, "state": state}  after each node
+          {"type": "partial", "text": text}                  improved README so far
+          {"type": "result", "result": run_pipeline(...)}    once, at the end
+        Partial updates that pile up while the consumer is busy are coalesced into the
+        latest one. Pipeline exceptions are re-raised in the consuming thread.
+        Closing the generator early (the client went away) stops the pipeline after
+        the node that is running.
+        """
+        events: "queue.Queue" = queue.Queue()
+        done = object()
+        cancelled = threading.Event()
+
+        def on_stage(name, state):
+            if cancelled.is_set():
+                raise PipelineCancelled(f"stream consumer gone after {name}")
+            events.put({"type": "stage", "stage": name, "state": state})
+
+        def work():
+            try:
+                result = self.run_pipeline(
+                    agents, repo_source, style=style, goal=goal, length=length,
+                    on_partial=lambda text: events.put({"type": "partial", "text": text}),
+                    on_stage=on_stage)
+                events.put({"type": "result", "result": result})
+            except PipelineCancelled as e:
+                logger.info("Orchestrator: %s", e)
+            except BaseException as e:
+                events.put(e)
+            finally:
+                events.put(done)
+
+        threading.Thread(target=work, name="pipeline-stream", daemon=True).start()
+        try:
+            while True:
+                batch = [events.get()]
+                while True:
+                    try:
+                        batch.append(events.get_nowait())
+                    except queue.Empty:
+                        break
+                for i, event in enumerate(batch):
+                    if event is done:
+                        return
+                    if isinstance(event, BaseException):
+                        raise event
+                    # Only the newest of consecutive partials is worth rendering
+                    if event["type"] == "partial" and i + 1 < len(batch) \
+                            and isinstance(batch[i + 1], dict) and batch[i + 1]["type"] == "partial":
+                        continue
+                    yield event
+        finally:
+            cancelled.set()
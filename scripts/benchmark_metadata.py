@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark the combined (one JSON call) vs. multi-call metadata modes.
+
+By default the Gemini client is replaced by a stub that sleeps --latency-ms per
+call, so the comparison is pure round-trip count; --live uses the real client
+(GOOGLE_API_KEY required). The LLM response cache is disabled and every
+iteration uses a distinct README, so no call is served from cache.
+
+    python scripts/benchmark_metadata.py --latency-ms 800 --runs 3
+    python scripts/benchmark_metadata.py --live --readme README.md
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["PUBLISH_ASSIST_LLM_CACHE"] = "off"
+
+from agents.metadata_recommender import METADATA_MODES, MetadataRecommenderAgent
+from tools.keyword_extractor import KeywordExtractor
+
+SAMPLE_README = """# Image Classifier
+
+This project demonstrates image classification using CNN and PyTorch.
+
+## Usage
+python train.py --epochs 10
+"""
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubGemini:
+    """Stand-in for genai.Client with a fixed per-call latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self.models = self
+
+    def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        if config:
+            return _Response(json.dumps({
+                "keywords": ["image classification", "cnn", "pytorch"],
+                "titles": ["🖼️ CNN Image Classifier", "🔥 PyTorch Vision Starter", "🧠 Classify Anything"],
+                "description": "🖼️ A compact PyTorch CNN for image classification.",
+            }))
+        if "comma-separated list of keywords" in contents:
+            return _Response("image classification, cnn, pytorch")
+        if "titles" in contents:
+            return _Response("🖼️ CNN Image Classifier, 🔥 PyTorch Vision Starter, 🧠 Classify Anything")
+        return _Response("🖼️ A compact PyTorch CNN for image classification.")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--latency-ms", type=float, default=800.0, help="stub latency per LLM call")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--live", action="store_true", help="call Gemini instead of the stub")
+    ap.add_argument("--readme", help="README to use instead of the built-in sample")
+    args = ap.parse_args()
+
+    readme = SAMPLE_README
+    if args.readme:
+        with open(args.readme, "r", encoding="utf-8") as f:
+            readme = f.read()
+
+    for mode in METADATA_MODES:
+        extractor = KeywordExtractor()
+        agent = MetadataRecommenderAgent(extractor, mode=mode)
+        stub = None
+        if not args.live:
+            stub = StubGemini(args.latency_ms / 1000)
+            extractor.model = agent.model = stub
+        elif agent.model is None:
+            sys.exit("--live needs google-genai and GOOGLE_API_KEY")
+        timings = []
+        for i in range(args.runs):
+            start = time.perf_counter()
+            rec = agent.run(f"{readme}\n<!-- run {i} -->", {})
+            timings.append(time.perf_counter() - start)
+        calls = f", {stub.calls / args.runs:.0f} calls/run" if stub else ""
+        print(f"{mode:9s} best {min(timings):.3f}s  mean {sum(timings) / len(timings):.3f}s{calls}")
+        print(f"          tags={rec.tags[:5]} titles={len(rec.title_suggestions)}")
+
+
+if __name__ == "__main__":
+    main()
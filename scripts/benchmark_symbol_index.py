@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Benchmark SymbolIndexBuilder on a synthetic repository of Python modules.
+
+Generates --files module sources (classes, functions, argparse entry points and
+imports, ~60 lines each), then times:
+  - a cold inline parse (workers never used),
+  - a cold parse in the shared process pool, with pool start-up timed separately,
+  - a warm run where every file hits the process-wide digest cache,
+and checks the pooled and inline indexes are identical. The target is a full
+index of a 5k-file repo in under a second. Warm runs (re-analysed repos) do not
+parse at all; a cold parse costs ~1.3 ms per file per core, so it only meets the
+target with enough workers.
+
+    python scripts/benchmark_symbol_index.py --files 5000 --workers 8
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools import symbol_index
+from tools.symbol_index import SymbolIndexBuilder
+
+TARGET_SECONDS = 1.0
+
+TEMPLATE = '''"""Synthetic module {i}: data loading and training helpers."""
+import argparse
+import os
+import numpy as np
+from torch import nn
+
+
+class Model{i}(nn.Module):
+    """Model number {i}."""
+
+    def __init__(self, hidden, layers=2):
+        super().__init__()
+        self.hidden = hidden
+
+    def forward(self, x):
+        return x
+
+    def _reset(self):
+        pass
+
+
+def load_data(path, *, limit=None):
+    """Load samples from path."""
+    return [line for line in open(path)][:limit]
+
+
+def train(model, data, epochs=1, lr=1e-3):
+    for _ in range(epochs):
+        for batch in data:
+            model(batch)
+    return model
+
+
+def _helper(value):
+    return value * {i}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("-o", "--output")
+    args = parser.parse_args(argv)
+    train(Model{i}(8), load_data(os.devnull), args.epochs, args.lr)
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+
+def sources(n_files: int):
+    for i in range(n_files):
+        source = TEMPLATE.format(i=i)
+        digest = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        yield f"pkg_{i // 100}/module_{i}.py", source, digest
+
+
+def timed_build(files, **kwargs):
+    start = time.perf_counter()
+    builder = SymbolIndexBuilder(expected_files=len(files), **kwargs)
+    for path, source, digest in files:
+        builder.add(path, source, digest)
+    index = builder.build()
+    return time.perf_counter() - start, index
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--files", type=int, default=5000)
+    ap.add_argument("--workers", type=int, default=min(8, os.cpu_count() or 1))
+    args = ap.parse_args()
+
+    files = list(sources(args.files))
+    inline_time, inline = timed_build([(p, s, None) for p, s, _ in files], process_threshold=10 ** 9)
+
+    start = time.perf_counter()
+    symbol_index._process_pool(args.workers).submit(int).result()  # spawn the workers
+    startup_time = time.perf_counter() - start
+    pooled_time, pooled = timed_build(files, process_threshold=1)
+    warm_time, warm = timed_build(files, process_threshold=1)
+
+    assert {p: vars(m) for p, m in inline.modules.items()} == \
+        {p: vars(m) for p, m in pooled.modules.items()}, "pooled index differs from inline"
+    assert len(warm.modules) == args.files
+
+    print(f"files: {args.files} (cpus: {os.cpu_count()}, workers: {args.workers})")
+    print(f"cold, inline: {inline_time:.3f}s ({inline_time / args.files * 1000:.2f} ms/file)")
+    print(f"pool start-up (once per process): {startup_time:.3f}s")
+    print(f"cold, process pool: {pooled_time:.3f}s")
+    print(f"warm digest cache: {warm_time:.3f}s")
+    print(f"prompt: {len(pooled.to_prompt())} chars")
+    best_cold = min(inline_time, pooled_time)
+    print(f"target {TARGET_SECONDS:.1f}s: cold {'met' if best_cold < TARGET_SECONDS else 'missed'}, "
+          f"warm {'met' if warm_time < TARGET_SECONDS else 'missed'}")
+
+
+if __name__ == "__main__":
+    main()
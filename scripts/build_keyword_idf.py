@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Build the memory-mapped IDF table used by the heuristic keyword engine.
+
+Reads Markdown documents from JSONL files ({"text": ...} per line, optionally
+gzipped) and/or directories of .md/.rst/.txt files, counts document frequencies
+of 1-3 word n-grams with the same tokenizer as tools.keyword_engine, and writes
+assets/keyword_idf.bin. Terms seen in fewer than --min-df documents are not
+stored; the engine treats them as unseen (maximum IDF).
+
+By default it reads the bundled corpus, assets/keyword_corpus.jsonl.gz, and
+reproduces the bundled table byte for byte. That corpus holds 739 README texts
+of open-source packages and tools (340 npm, 227 crates.io, 106 PyPI long
+descriptions, 22 RubyGems and 44 other READMEs), one per package, de-duplicated
+by content; each line records its "source" (package and version, or file).
+It is a general-domain background corpus on purpose: what it makes common
+(install, usage, license, options) scores low, while ML terms stay rare and
+score high. Extra corpora, e.g. ML project READMEs, can be passed alongside it.
+
+    python scripts/build_keyword_idf.py
+    python scripts/build_keyword_idf.py --corpus assets/keyword_corpus.jsonl.gz ~/ml-readmes --min-df 3
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools.keyword_engine import ASSETS_DIR, DEFAULT_IDF_PATH, IdfTable, compute_idf
+
+DEFAULT_CORPUS = os.path.join(ASSETS_DIR, "keyword_corpus.jsonl.gz")
+DOC_EXTENSIONS = (".md", ".rst", ".txt")
+
+
+def iter_documents(sources):
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                for name in sorted(files):
+                    if name.lower().endswith(DOC_EXTENSIONS):
+                        with open(os.path.join(root, name), "r", encoding="utf-8", errors="ignore") as f:
+                            yield f.read()
+        else:
+            opener = gzip.open if source.endswith(".gz") else open
+            with opener(source, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)["text"]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--corpus", nargs="+", default=[DEFAULT_CORPUS],
+                    help="JSONL(.gz) files and/or directories of README documents")
+    ap.add_argument("--out", default=DEFAULT_IDF_PATH)
+    ap.add_argument("--min-df", type=int, default=2)
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    n_docs, avg_len, default_idf, table = compute_idf(iter_documents(args.corpus), min_df=args.min_df)
+    IdfTable.write(args.out, n_docs, avg_len, default_idf, table)
+    print(f"documents: {n_docs}, terms: {len(table)}, avg length: {avg_len:.1f} tokens")
+    print(f"wrote {args.out} ({os.path.getsize(args.out)} bytes) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# tests/test_code_stats.py
+from tools.code_stats import CODE, DATA, CodeStats, count_lines, detect_language
+
+
+def test_language_table_uses_filenames_before_extensions():
+    assert detect_language("docker/Dockerfile").name == "Dockerfile"
+    assert detect_language("Makefile").kind == CODE
+    assert detect_language("web/package-lock.json").name == "Lockfile"
+    assert detect_language("requirements-dev.txt").kind == DATA
+    assert detect_language("notebooks/demo.ipynb").kind == CODE
+    assert detect_language("src/model.py").name == "Python"
+
+
+def test_count_lines_separates_code_comments_and_blanks():
+    python = '"""Module docstring\nspanning lines."""\nimport os\n\n# comment\nx = 1  # trailing\n'
+    assert count_lines(python, detect_language("a.py")) == (2, 3, 1)
+    c = "/* header\n * more */\nint x;\n\n// note\nint y; /* open\nstill comment */\n"
+    assert count_lines(c, detect_language("a.c")) == (2, 4, 1)
+
+
+def test_code_stats_counts_only_code_toward_total_lines():
+    stats = CodeStats().update([
+        ("run.py", "print('hi')\n\n# done\n"),
+        ("package-lock.json", "{\n  \"a\": 1\n}\n"),
+        ("README.md", "# Title\n\ntext\n"),
+    ])
+    stats.add_binary(100)
+    result = stats.to_dict()
+    assert result["total_lines"] == 1
+    assert result["file_count"] == 4
+    assert result["languages"] == {"Lockfile": 1, "Markdown": 1, "Python": 1}
+    assert result["by_language"]["Python"] == {
+        "kind": "code", "files": 1, "code": 1, "comment": 1, "blank": 1, "bytes": 20}
@@ -0,0 +1,69 @@
+# tests/test_context_packer.py
+from tools.context_packer import ContextPacker, estimate_tokens
+from tools.web_search import WebSearchTool
+
+README = """# Graph Toolkit
+
+Graph neural networks for molecule property prediction.
+
+## Installation
+
+pip install graph-toolkit
+
+## Usage
+
+```python
+from graph_toolkit import train
+train("qm9")
+```
+
+## Changelog
+
+""" + "\n".join(f"- v0.{i}: fixed a minor typo in the docs" for i in range(200)) + """
+
+## License
+
+MIT
+"""
+
+
+def test_estimate_tokens_depends_on_model():
+    text = "word " * 100
+    assert estimate_tokens(text, "google", "gemini-1.5-flash") < estimate_tokens(text, "groq", "mixtral-8x7b")
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("🚀🚀") == 2
+
+
+def test_long_readme_keeps_key_sections_within_budget():
+    packer = ContextPacker(budget_tokens=300)
+    packed = packer.pack(README, goal="molecule prediction")
+    assert packed.report.used <= 300
+    assert packed.readme.startswith("# Graph Toolkit")
+    assert "## Usage" in packed.readme and "## Installation" in packed.readme
+    assert packed.readme.count("```") % 2 == 0
+    labels = {d["label"] for d in packed.report.dropped} | {
+        i["label"] for i in packed.report.included if i["truncated"]}
+    assert "section: Changelog" in labels
+    # Sections stay in document order
+    assert packed.readme.index("## Installation") < packed.readme.index("## Usage")
+
+
+def test_examples_hints_and_evidence_get_a_share():
+    packer = ContextPacker(budget_tokens=600)
+    examples = [{"title": "Similar: repo", "link": "https://x", "snippet": "molecule graphs " * 400}]
+    packed = packer.pack(README * 3, examples=examples, hints=["Add a license badge."],
+                         repo_context="Dependencies: torch\ntrain.py [entry point]: Training loop\n  def main()")
+    kinds = {i["kind"] for i in packed.report.included}
+    assert {"readme", "search", "hint", "evidence"} <= kinds
+    assert packed.examples[0]["title"] == "Similar: repo"
+    assert packed.examples[0]["snippet"].endswith("…")
+    assert packed.report.used <= 600
+
+
+def test_summarize_and_improve_records_report(monkeypatch):
+    for key in ("GOOGLE_API_KEY", "GROQ_API_KEY", "TAVILY_API_KEY"):
+        monkeypatch.delenv(key, raising=False)
+    tool = WebSearchTool()
+    tool.summarize_and_improve(README, [], hints=["Add tests."])
+    assert tool.last_context_report is not None
+    assert tool.last_context_report.included[0]["label"] == "section: Graph Toolkit"
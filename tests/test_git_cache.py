@@ -0,0 +1,151 @@
+# tests/test_git_cache.py
+import os
+import shutil
+import subprocess
+import threading
+
+import pytest
+
+from tools.git_cache import GitMirrorCache
+from tools.repo_parser import RepoParser
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+GIT_ID = ["-c", "user.name=test", "-c", "user.email=test@example.com"]
+
+
+def git(*args, cwd=None):
+    subprocess.check_call(["git", *GIT_ID, *args], cwd=cwd,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def make_remote(tmp_path, name="remote", files=None):
+    """Create a bare repository plus a work clone used to push new commits."""
+    work = tmp_path / f"{name}-work"
+    work.mkdir()
+    git("init", "-q", cwd=work)
+    for rel, content in (files or {"README.md": "# Remote\n"}).items():
+        (work / rel).write_text(content)
+    git("add", ".", cwd=work)
+    git("commit", "-qm", "init", cwd=work)
+    bare = tmp_path / f"{name}.git"
+    git("clone", "-q", "--bare", str(work), str(bare))
+    git("remote", "add", "bare", str(bare), cwd=work)
+    return work, "file://" + str(bare)
+
+
+def test_second_parse_fetches_incrementally(tmp_path):
+    work, url = make_remote(tmp_path)
+    cache = GitMirrorCache(root=str(tmp_path / "cache"), refresh_interval=0)
+    parser = RepoParser(git_cache=cache)
+    assert parser.parse(url)["README.md"] == "# Remote\n"
+
+    (work / "train.py").write_text("print('train')\n")
+    git("add", ".", cwd=work)
+    git("commit", "-qm", "add train", cwd=work)
+    git("push", "-q", "bare", "HEAD", cwd=work)
+
+    parsed = parser.parse(url)
+    assert parsed["files"]["train.py"] == "print('train')\n"
+    mirrors = [n for n in os.listdir(cache.root) if n.endswith(".git")]
+    assert mirrors == [os.path.basename(cache.mirror_path(url))]
+
+
+def test_concurrent_requests_share_one_clone(tmp_path):
+    _, url = make_remote(tmp_path)
+    cache = GitMirrorCache(root=str(tmp_path / "cache"))
+    clones = []
+    real_clone = cache._clone
+    cache._clone = lambda u: (clones.append(u), real_clone(u))[1]
+
+    barrier = threading.Barrier(4)
+
+    def worker():
+        barrier.wait()
+        with cache.open(url) as path:
+            assert os.path.isdir(path)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(clones) == 1
+
+
+def test_least_recently_used_mirror_is_evicted(tmp_path):
+    _, url_a = make_remote(tmp_path, "a")
+    _, url_b = make_remote(tmp_path, "b")
+    cache = GitMirrorCache(root=str(tmp_path / "cache"), max_bytes=1)
+    with cache.open(url_a):
+        pass
+    with cache.open(url_b):
+        pass
+    assert not os.path.exists(cache.mirror_path(url_a))
+    assert os.path.isdir(cache.mirror_path(url_b))
+
+
+def test_git_scan_streams_blobs_without_fetching_large_ones(tmp_path):
+    work, url = make_remote(tmp_path, files={"README.md": "# Remote\n", "model.pt": "x" * 300_000,
+                                             "big.txt": "y" * 300_000})
+    git("config", "uploadpack.allowFilter", "true", cwd=url[len("file://"):])
+    cache = GitMirrorCache(root=str(tmp_path / "cache"))
+    with RepoParser(git_cache=cache).scan(url) as view:
+        assert view.readme == "# Remote\n"
+        assert view.entries["model.pt"].kind == "model"
+        assert "big.txt" not in view.entries
+        big_sha = view.entries["model.pt"].digest
+        mirror = cache.mirror_path(url)
+        present = subprocess.run(["git", "cat-file", "-e", big_sha], cwd=mirror,
+                                 env={**os.environ, "GIT_NO_LAZY_FETCH": "1"},
+                                 stderr=subprocess.DEVNULL)
+        assert present.returncode != 0
+        assert not os.path.exists(os.path.join(mirror, "README.md"))
+
+
+def test_mirror_key_keeps_path_case(tmp_path):
+    cache = GitMirrorCache(root=str(tmp_path / "cache"))
+    assert cache.key_for("https://GitHub.com/owner/repo.git") == cache.key_for("https://github.com/owner/repo/")
+    assert cache.key_for("https://gitlab.com/Owner/Repo") != cache.key_for("https://gitlab.com/owner/repo")
+
+    _, upper = make_remote(tmp_path, name="Repo", files={"README.md": "# Upper\n"})
+    _, lower = make_remote(tmp_path, name="repo", files={"README.md": "# Lower\n"})
+    parser = RepoParser(git_cache=cache)
+    assert parser.parse(upper)["README.md"] == "# Upper\n"
+    assert parser.parse(lower)["README.md"] == "# Lower\n"
+    assert cache.mirror_path(upper) != cache.mirror_path(lower)
+
+
+def test_mirror_being_fetched_is_not_evicted(tmp_path):
+    _, url_a = make_remote(tmp_path, "a")
+    _, url_b = make_remote(tmp_path, "b")
+    cache = GitMirrorCache(root=str(tmp_path / "cache"), max_bytes=1)
+    with cache.open(url_a):
+        pass
+    # Another process fetching into mirror a holds its sync lock
+    with cache._lock(cache.key_for(url_a) + ".sync", shared=False):
+        with cache.open(url_b):
+            pass
+    assert os.path.isdir(cache.mirror_path(url_a))
+
+
+def test_failed_fetch_never_replaces_a_leased_mirror(tmp_path):
+    _, url = make_remote(tmp_path)
+    cache = GitMirrorCache(root=str(tmp_path / "cache"), refresh_interval=0)
+    real_git = cache._git
+
+    def git_without_fetch(args, cwd=None):
+        if args[0] == "fetch":
+            raise subprocess.CalledProcessError(128, "git fetch")
+        real_git(args, cwd=cwd)
+    cache._git = git_without_fetch
+
+    path, release = cache.acquire(url)
+    leased = os.stat(path).st_ino
+    with cache.open(url) as again:  # re-clone fails to swap in: the lease is kept intact
+        assert os.stat(again).st_ino == leased
+    release()
+    with cache.open(url) as fresh:
+        assert os.stat(fresh).st_ino != leased
+        assert os.path.isfile(os.path.join(fresh, "HEAD"))
+    assert not [n for n in os.listdir(cache.root) if n.startswith((".clone-", ".old-"))]
@@ -0,0 +1,42 @@
+# tests/test_ignore_rules.py
+from tools.ignore_rules import IgnoreTree, RuleSet
+from tools.repo_parser import RepoParser
+from tools.scan_policy import ScanPolicy
+
+
+def test_rule_set_follows_gitignore_semantics():
+    rules = RuleSet("", ["# comment", "*.log", "!keep.log", "build/", "/data", "docs/**/*.tmp"])
+    assert rules.match("a/b/debug.log", is_dir=False) is True
+    assert rules.match("keep.log", is_dir=False) is False
+    assert rules.match("build", is_dir=True) is True
+    assert rules.match("build", is_dir=False) is None  # dir-only rule
+    assert rules.match("data", is_dir=True) is True
+    assert rules.match("src/data", is_dir=True) is None  # anchored to the root
+    assert rules.match("docs/x/y/z.tmp", is_dir=False) is True
+
+
+def test_nested_ignore_files_and_override_precedence():
+    files = {"": "*.csv\n", "sub": "!keep.csv\n"}
+    tree = IgnoreTree(files.get, exclude_text="secret.txt\n", override_text="sub/keep.csv\n")
+    assert tree.is_path_ignored("a.csv")
+    assert not tree.is_path_ignored("sub/other.txt")
+    assert tree.is_path_ignored("secret.txt")
+    assert tree.is_path_ignored("sub/keep.csv")  # override beats the nested negation
+
+
+def test_parser_prunes_gitignored_directories(tmp_path):
+    repo = tmp_path / "repo"
+    for d in ("src", "build/lib", "data/raw", "pkg/cache", ".git/info"):
+        (repo / d).mkdir(parents=True)
+    (repo / ".gitignore").write_text("build/\ndata/\n")
+    (repo / ".git" / "info" / "exclude").write_text("local.py\n")
+    (repo / "pkg" / ".gitignore").write_text("cache/\n")
+    (repo / ".publishignore").write_text("notes.md\n")
+    for f in ("README.md", "src/main.py", "build/lib/out.py", "data/raw/x.csv",
+              "pkg/cache/blob.txt", "pkg/mod.py", "local.py", "notes.md"):
+        (repo / f).write_text(f)
+    expected = [".gitignore", ".publishignore", "README.md", "pkg/.gitignore", "pkg/mod.py", "src/main.py"]
+    for workers in (1, 4):
+        assert list(RepoParser(workers=workers).parse(str(repo))["files"]) == expected
+    unfiltered = RepoParser(policy=ScanPolicy(respect_gitignore=False)).parse(str(repo))
+    assert "build/lib/out.py" in unfiltered["files"]
@@ -0,0 +1,88 @@
+# tests/test_keyword_engine.py
+import filecmp
+import gzip
+import json
+import os
+
+from tools.keyword_engine import ASSETS_DIR, DEFAULT_IDF_PATH, IdfTable, KeywordEngine, compute_idf, phrases
+from tools.keyword_extractor import KeywordExtractor
+
+CORPUS = [
+    "# Model A\n\nThis repository provides training code. Install with pip install.",
+    "# Model B\n\nThis repository provides training scripts and a demo.",
+    "# Model C\n\nThis repository contains training utilities for speech recognition.",
+]
+
+
+def _table(tmp_path):
+    path = str(tmp_path / "idf.bin")
+    IdfTable.write(path, *compute_idf(CORPUS))
+    return IdfTable.load(path)
+
+
+def test_idf_table_round_trip(tmp_path):
+    table = _table(tmp_path)
+    assert table.n_docs == 3
+    assert table.idf("repository") is not None
+    assert table.idf("speech recognition") is None  # below min_df
+    assert table.idf("repository") < table.default_idf
+
+
+def test_phrases_break_on_stopwords_and_punctuation():
+    runs = list(phrases("Graph neural networks for molecule generation, with PyTorch."))
+    assert runs == [["graph", "neural", "networks"], ["molecule", "generation"], ["pytorch"]]
+
+
+def test_engine_prefers_distinctive_phrases(tmp_path):
+    engine = KeywordEngine(_table(tmp_path))
+    readme = ("# Protein Folding\n\nThis repository provides training code for protein folding. "
+              "Protein folding predictions use diffusion models. Diffusion models are fast. "
+              "See <img src=\"logo.png\"> and `train.py`.")
+    keywords = engine.extract(readme, file_names=["folding/diffusion_sampler.py"], top_k=10)
+    assert keywords[0] == "protein folding"
+    assert keywords.index("diffusion models") < keywords.index("repository")
+    assert not {"img", "src", "py"} & set(keywords)
+
+
+def test_extractor_heuristic_uses_file_names():
+    ke = KeywordExtractor(top_k=5)
+    keywords = ke._heuristic_extract("# Tool\n\nA small tool.", file_names=["speech_recognizer.py"])
+    assert "speech recognizer" in keywords
+
+
+def test_extractor_falls_back_when_llm_returns_nothing(monkeypatch, tmp_path):
+    from types import SimpleNamespace
+    from utils.llm_cache import LLMCache
+
+    class EmptyModels:
+        def generate_content(self, model, contents):
+            return SimpleNamespace(text="")
+
+    monkeypatch.setattr(LLMCache, "_default", LLMCache(path=None))
+    ke = KeywordExtractor(top_k=5)
+    ke.model = SimpleNamespace(models=EmptyModels())
+    text = "# Speech Recognizer\n\nA speech recognizer built on transformer encoders."
+    assert ke.extract(text) == ke._heuristic_extract(text)
+    assert ke.extract(text)  # the empty reply was not cached as "no keywords"
+
+
+def test_bundled_table_ranks_boilerplate_below_domain_terms():
+    text = ("# Retrieval Toolkit\n\nThis project provides optional tools for document retrieval. "
+            "The tools include a vector store, sentence embeddings and a cross-encoder reranker. "
+            "Install the package and see the documentation for usage examples. "
+            "Contributions are welcome under the MIT license.\n\n"
+            "The reranker scores candidate passages. Sentence embeddings are cached in the vector store.\n")
+    ranked = KeywordEngine().extract(text, top_k=30)
+    domain = [ranked.index(t) for t in ("sentence embeddings", "vector store", "reranker")]
+    boilerplate = [ranked.index(t) for t in ("optional", "tools", "project", "package", "install",
+                                              "documentation", "usage", "license") if t in ranked]
+    assert boilerplate and max(domain) < min(boilerplate)
+
+
+def test_bundled_table_is_rebuilt_from_bundled_corpus(tmp_path):
+    with gzip.open(os.path.join(ASSETS_DIR, "keyword_corpus.jsonl.gz"), "rt", encoding="utf-8") as f:
+        documents = [json.loads(line) for line in f]
+    assert all(doc["source"] and doc["text"] for doc in documents)
+    path = str(tmp_path / "idf.bin")
+    IdfTable.write(path, *compute_idf(doc["text"] for doc in documents))
+    assert filecmp.cmp(path, DEFAULT_IDF_PATH, shallow=False)
@@ -0,0 +1,78 @@
+# tests/test_llm_cache.py
+import threading
+import time
+
+from utils.llm_cache import LLMCache, cache_key
+
+
+def test_key_normalizes_whitespace_but_not_params():
+    a = cache_key("google", "gemini", "  Hello\r\nworld  \n")
+    assert a == cache_key("google", "gemini", "Hello\nworld")
+    assert a != cache_key("groq", "gemini", "Hello\nworld")
+    assert a != cache_key("google", "gemini", "Hello\nworld", {"temperature": 0.2})
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    calls = []
+    cache = LLMCache(path=path)
+    assert cache.get_or_call("google", "m", "prompt", lambda: calls.append(1) or "answer") == "answer"
+    assert cache.get_or_call("google", "m", "prompt", lambda: calls.append(1) or "other") == "answer"
+    cache.close()
+
+    reopened = LLMCache(path=path)
+    assert reopened.get_or_call("google", "m", "prompt", lambda: calls.append(1) or "other") == "answer"
+    assert len(calls) == 1
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_errors_and_empty_responses_are_not_cached(tmp_path):
+    cache = LLMCache(path=None)
+
+    def boom():
+        raise RuntimeError("rate limited")
+
+    try:
+        cache.get_or_call("google", "m", "p", boom)
+    except RuntimeError:
+        pass
+    assert cache.get_or_call("google", "m", "p", lambda: "") == ""
+    assert cache.get_or_call("google", "m", "p", lambda: "ok") == "ok"
+    assert cache.stats()["stores"] == 1
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "c.sqlite"), ttl=0.05, max_bytes=100)
+    cache.set(cache_key("p", "m", "old"), "x" * 60)
+    time.sleep(0.06)
+    assert cache.get(cache_key("p", "m", "old")) is None
+
+    cache.ttl = 3600
+    for i in range(3):
+        cache.set(cache_key("p", "m", str(i)), "y" * 40)
+    stats = cache.stats()
+    assert stats["disk_bytes"] <= 100
+    assert stats["evictions"] >= 1
+    assert cache.get(cache_key("p", "m", "2")) is not None
+
+
+def test_concurrent_callers_share_one_call(tmp_path):
+    cache = LLMCache(path=None)
+    calls, gate = [], threading.Event()
+
+    def slow():
+        calls.append(1)
+        gate.wait(1)
+        return "shared"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_call("g", "m", "p", slow)))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert results == ["shared"] * 4
+    assert len(calls) == 1
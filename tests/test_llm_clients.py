@@ -0,0 +1,96 @@
+# tests/test_llm_clients.py
+import logging
+import threading
+import time
+
+from utils import llm_clients
+from utils.llm_clients import LLMClientRegistry
+
+
+def test_client_created_once_and_shared(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "key-1")
+    created = []
+
+    def factory(api_key):
+        time.sleep(0.02)
+        created.append(api_key)
+        return object()
+
+    registry = LLMClientRegistry(factories={"google": factory})
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("google"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert created == ["key-1"]
+    assert len({id(r) for r in results}) == 1
+
+    monkeypatch.setenv("GOOGLE_API_KEY", "key-2")
+    assert registry.get("google") is not results[0]
+
+
+def test_missing_key_or_provider_returns_none(monkeypatch):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    registry = LLMClientRegistry(factories={"groq": lambda key: object()})
+    assert registry.get("groq") is None
+    assert registry.get("unknown") is None
+
+
+def test_limit_caps_concurrency():
+    registry = LLMClientRegistry(factories={}, max_concurrency={"google": 2})
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def request():
+        with registry.limit("google"):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+
+
+class _FakeGenai:
+    """Stand-in for google.genai; ``fields`` are HttpOptions' declared fields."""
+
+    def __init__(self, fields):
+        self.types = type("types", (), {"HttpOptions": type("HttpOptions", (), {"model_fields": fields})})
+        self.calls = []
+
+    def Client(self, **kwargs):
+        self.calls.append(kwargs)
+        return object()
+
+
+def test_gemini_client_is_pooled_when_sdk_supports_client_args(monkeypatch):
+    fake = _FakeGenai({"client_args": None})
+    monkeypatch.setattr(llm_clients, "genai", fake)
+    monkeypatch.setattr(llm_clients, "_pool_fallbacks", {})
+    monkeypatch.setenv("GOOGLE_API_KEY", "key-1")
+    registry = LLMClientRegistry(factories={"google": llm_clients._make_gemini})
+    assert registry.get("google") is not None
+    assert "limits" in fake.calls[0]["http_options"]["client_args"]
+    assert registry.stats()["google"] == {"client": True, "pooled": True, "pool_fallback": None}
+
+
+def test_gemini_fallback_without_client_args_is_logged_and_reported(monkeypatch, caplog):
+    fake = _FakeGenai({})
+    monkeypatch.setattr(llm_clients, "genai", fake)
+    monkeypatch.setattr(llm_clients, "_pool_fallbacks", {})
+    monkeypatch.setenv("GOOGLE_API_KEY", "key-1")
+    registry = LLMClientRegistry(factories={"google": llm_clients._make_gemini})
+    with caplog.at_level(logging.WARNING, logger="utils.llm_clients"):
+        assert registry.get("google") is not None
+    assert fake.calls == [{"api_key": "key-1"}]
+    assert any("without connection pool limits" in r.message for r in caplog.records)
+    stats = registry.stats()["google"]
+    assert stats["client"] and not stats["pooled"]
+    assert "client_args" in stats["pool_fallback"]
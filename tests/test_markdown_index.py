@@ -0,0 +1,69 @@
+# tests/test_markdown_index.py
+from tools.markdown_index import parse_markdown
+
+README = """# Project
+
+[![CI](https://img.shields.io/badge/ci-passing-green.svg)](https://ci.example.com)
+
+We propose a novel method that outperforms prior work. See [the docs](https://docs.example.com).
+
+## Getting Started
+
+```bash
+# Usage
+pip install project
+```
+
+### Running the demo
+Run it.
+
+License
+-------
+MIT
+"""
+
+
+def test_heading_tree_offsets_and_code_blocks():
+    index = parse_markdown(README)
+    assert [(s.title, s.level) for s in index.sections] == [
+        ("Project", 1), ("Getting Started", 2), ("Running the demo", 3), ("License", 2)]
+    root = index.tree[0]
+    assert [c.title for c in root.children] == ["Getting Started", "License"]
+    assert root.children[0].children[0].title == "Running the demo"
+    assert index.section_text(index.sections[3]).strip() == "MIT"
+    assert len(index.code_blocks) == 1 and index.code_blocks[0].language == "bash"
+    assert parse_markdown(README) is index
+
+
+def test_sections_match_headings_not_mentions():
+    index = parse_markdown(README)
+    # "Usage" appears only inside a code block; the alias table maps headings to sections
+    assert index.missing_sections(["Installation", "Usage", "License", "Contributing"]) == ["Contributing"]
+    assert index.find_section("Installation").title == "Getting Started"
+    assert parse_markdown("Installation is easy, see below.\n").missing_sections(["Installation"]) == ["Installation"]
+
+
+def test_links_badges_sentences_and_preamble():
+    index = parse_markdown(README)
+    assert [b.url for b in index.badges] == ["https://img.shields.io/badge/ci-passing-green.svg"]
+    assert "https://docs.example.com" in [link.url for link in index.links]
+    assert index.sentences[0] == "We propose a novel method that outperforms prior work."
+    assert index.sentences[1] == "See the docs."
+    body = README[index.preamble_end():]
+    assert body.startswith("We propose")
+
+
+def test_aliases_match_whole_words_only():
+    index = parse_markdown("# Tool\n\n## Runtime notes\n\nSlow.\n\n## Requirements\n\nPython.\n")
+    assert index.missing_sections(["Installation", "Usage"]) == ["Installation", "Usage"]
+    index = parse_markdown("# Tool\n\n## Licensing\n\n## Contributors\n\n## Install\n\n## Usage Examples\n")
+    assert index.missing_sections(["License", "Contributing", "Installation", "Usage", "Examples"]) == []
+
+
+def test_html_blocks_rules_and_badge_lines_are_not_prose():
+    text = ('<div align="center">\n  <img src="logo.png">\n  <h1>Tool</h1>\n</div>\n\n---\n\n'
+            "[![CI](https://img.shields.io/badge/ci-passing-green.svg)](https://ci.example.com)\n\n"
+            "## Summary\n\nA tool that does things. It is fast.\n\n***\n\nMore text.\n")
+    index = parse_markdown(text)
+    assert index.paragraphs == ["A tool that does things. It is fast.", "More text."]
+    assert index.sentences[0] == "A tool that does things."
@@ -0,0 +1,83 @@
+# tests/test_metadata_recommender.py
+import json
+
+import pytest
+
+from agents.metadata_recommender import MetadataRecommenderAgent, parse_metadata_json
+from tools.keyword_extractor import KeywordExtractor
+from utils.llm_cache import LLMCache
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubGemini:
+    def __init__(self, combined_reply):
+        self.combined_reply = combined_reply
+        self.prompts = []
+        self.models = self
+
+    def generate_content(self, model, contents, config=None):
+        self.prompts.append((contents, config))
+        if config:
+            return _Response(self.combined_reply)
+        if "comma-separated list of keywords" in contents:
+            return _Response("cnn, pytorch")
+        if "titles" in contents:
+            return _Response("CNN Classifier, PyTorch Vision")
+        return _Response("A PyTorch CNN.")
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch):
+    monkeypatch.setattr(LLMCache, "_default", LLMCache(path=None))
+
+
+def make_agent(mode, reply=""):
+    extractor = KeywordExtractor()
+    agent = MetadataRecommenderAgent(extractor, mode=mode)
+    stub = StubGemini(reply)
+    extractor.model = agent.model = stub
+    return agent, stub
+
+
+def test_parse_metadata_json_validates_each_field():
+    fields = parse_metadata_json('```json\n{"keywords": ["cnn", "", "cnn", 3], "titles": "oops", '
+                                 '"description": "  A   CNN.  "}\n```')
+    assert fields == {"keywords": ["cnn"], "description": "A CNN."}
+    assert parse_metadata_json("not json") == {}
+    assert parse_metadata_json("[1, 2]") == {}
+
+
+def test_combined_mode_makes_one_call():
+    reply = json.dumps({"keywords": ["cnn", "pytorch"], "titles": ["🖼️ CNN"], "description": "🖼️ A CNN."})
+    agent, stub = make_agent("combined", reply)
+    rec = agent.run("# Demo\n\nImage classification with CNN and PyTorch.", {})
+    assert len(stub.prompts) == 1
+    assert rec.tags == ["cnn", "pytorch"]
+    assert rec.title_suggestions == ["🖼️ CNN"]
+    assert rec.short_description == "🖼️ A CNN."
+
+
+def test_combined_mode_falls_back_per_field():
+    agent, stub = make_agent("combined", json.dumps({"keywords": ["cnn"], "titles": [], "description": 42}))
+    rec = agent.run("# Demo\n\nImage classification with CNN and PyTorch.", {})
+    assert rec.tags == ["cnn"]
+    assert rec.title_suggestions == ["CNN Classifier", "PyTorch Vision"]
+    assert rec.short_description == "A PyTorch CNN."
+    assert len(stub.prompts) == 3
+
+
+def test_multi_mode_keeps_separate_calls():
+    agent, stub = make_agent("multi")
+    rec = agent.run("# Demo\n\nImage classification with CNN and PyTorch.", {})
+    assert len(stub.prompts) == 3
+    assert all(config is None for _, config in stub.prompts)
+    assert rec.tags == ["cnn", "pytorch"]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        MetadataRecommenderAgent(KeywordExtractor(), mode="batch")
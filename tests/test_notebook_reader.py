@@ -0,0 +1,106 @@
+# tests/test_notebook_reader.py
+import base64
+import io
+import json
+
+from tools import notebook_reader
+from tools.notebook_reader import NotebookCell, _NotebookScanner, from_percent_script, read_cells, to_percent_script
+from tools.repo_parser import RepoParser, git_blob_digest
+
+
+def make_notebook(image_bytes: int = 0) -> dict:
+    png = base64.b64encode(b"\x89PNG" + b"\0" * image_bytes).decode()
+    return {
+        "metadata": {"kernelspec": {"name": "python3"}},
+        "nbformat": 4,
+        "cells": [
+            {"cell_type": "markdown", "metadata": {}, "source": ["# Training\n", "Fine-tune a \"ViT\" model."],
+             "attachments": {"img.png": {"image/png": png}}},
+            {"cell_type": "code", "execution_count": 1, "metadata": {"tags": []},
+             "source": "import torch\nmodel = torch.nn.Linear(2, 2)",
+             "outputs": [{"output_type": "display_data", "data": {"image/png": png, "text/plain": ["[x]"]}}]},
+            {"cell_type": "raw", "metadata": {}, "source": "ignored"},
+        ],
+    }
+
+
+def test_scanner_keeps_only_markdown_and_code_sources():
+    data = json.dumps(make_notebook(), indent=1).encode()
+    cells = read_cells(data)
+    assert [(c.cell_type, c.source) for c in cells] == [
+        ("markdown", "# Training\nFine-tune a \"ViT\" model."),
+        ("code", "import torch\nmodel = torch.nn.Linear(2, 2)"),
+    ]
+    scanned = [c for c in _NotebookScanner(data).cells() if c.cell_type != "raw"]
+    assert scanned == cells
+    assert from_percent_script(to_percent_script(cells)) == cells
+
+
+def test_large_notebook_is_indexed_as_cell_text(tmp_path):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    (repo_dir / "train.ipynb").write_text(json.dumps(make_notebook(image_bytes=2_000_000)))
+    with RepoParser().scan(str(repo_dir)) as view:
+        assert "train.ipynb" in view
+        text = view["train.ipynb"]
+        assert text.startswith("# %% [markdown]\n# # Training")
+        assert "import torch" in text and "image/png" not in text
+        assert [c.cell_type for c in view.notebook_cells("train.ipynb")] == ["markdown", "code"]
+
+
+def test_notebook_is_read_and_parsed_once_per_run(tmp_path):
+    from agents.metadata_recommender import MetadataRecommenderAgent
+    from agents.repo_analyzer import RepoAnalyzerAgent
+    from tools.keyword_extractor import KeywordExtractor
+
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    (repo_dir / "README.md").write_text("# Demo\n")
+    (repo_dir / "train.ipynb").write_text(json.dumps(make_notebook(image_bytes=2_000_000)))
+    parser = RepoParser(workers=1)
+    loads = []
+    real_scan = parser.scan
+
+    def scan(*args, **kwargs):
+        view = real_scan(*args, **kwargs)
+        loader, opener = view._loader, view._opener
+        view._loader = lambda entry: (loads.append(entry.path), loader(entry))[1]
+        view._opener = lambda entry: (loads.append(entry.path), opener(entry))[1]
+        return view
+    parser.scan = scan
+
+    analysis = RepoAnalyzerAgent(str(repo_dir), parser).run()
+    assert analysis.code_stats["notebooks"] == {"files": 1, "code_cells": 1, "markdown_cells": 1}
+    agent = MetadataRecommenderAgent(KeywordExtractor())
+    assert "Fine-tune" in agent._keyword_text(analysis.readme, analysis.files)
+    assert loads.count("train.ipynb") == 1
+
+
+def test_scanner_streams_in_chunks_with_bounded_memory(monkeypatch):
+    notebook = make_notebook(image_bytes=200_000)
+    # Escapes and quotes land on every chunk boundary somewhere in this notebook
+    notebook["cells"][1]["source"] = ['print("a\\\\"b")\n', "x = '\\\\\\\\'\n" * 40]
+    data = json.dumps(notebook).encode()
+    expected = [NotebookCell(c["cell_type"], "".join(c["source"]) if isinstance(c["source"], list) else c["source"])
+                for c in notebook["cells"][:2]]
+    for chunk_size in (1, 7, 64, 4096):
+        monkeypatch.setattr(notebook_reader, "CHUNK_SIZE", chunk_size)
+        stream = io.BytesIO(data)
+        scanner = _NotebookScanner(stream=stream)
+        peak = [0]
+        real_read = stream.read
+        stream.read = lambda n: (peak.__setitem__(0, max(peak[0], len(scanner.buf))), real_read(n))[1]
+        cells = [c for c in scanner.cells() if c.cell_type != "raw"]
+        assert cells == expected
+        assert peak[0] < chunk_size + 2_000  # never the ~270 KB of base64 outputs
+    assert read_cells(io.BytesIO(data)) == read_cells(data) == expected
+
+
+def test_streamed_notebook_records_its_digest(tmp_path):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    data = json.dumps(make_notebook()).encode()
+    (repo_dir / "train.ipynb").write_bytes(data)
+    with RepoParser().scan(str(repo_dir)) as view:
+        view.notebook_cells("train.ipynb")
+        assert view.entries["train.ipynb"].digest == git_blob_digest(data)
@@ -0,0 +1,114 @@
+# tests/test_prompt_registry.py
+import pytest
+
+from tools.prompt_registry import RenderedPrompt, get_template, render
+from tools.web_search import WebSearchTool
+from utils.context_cache import GeminiContextCache, summarize_usage
+from utils.llm_cache import LLMCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(LLMCache, "_default", LLMCache(path=None))
+    monkeypatch.setattr(GeminiContextCache, "_default", GeminiContextCache())
+
+
+def values(**overrides):
+    base = dict(style="Technical Blog", goal="Attract contributors", length="", readme="# Demo",
+                evidence="Not available.", hints="None.", examples="")
+    return {**base, **overrides}
+
+
+def test_prefix_is_static_and_request_data_comes_last():
+    a = render("readme_improve", **values())
+    b = render("readme_improve", **values(style="User Guide", readme="# Other\n\nText", goal="Teach"))
+    assert isinstance(a, RenderedPrompt) and a.template == "readme_improve"
+    assert a.prefix == b.prefix and a.suffix != b.suffix
+    assert a == a.prefix + "\n\n" + a.suffix
+    assert "Attract contributors" not in a.prefix and "# Demo" in a.suffix
+    assert a.prefix.startswith("You are an expert AI Developer Advocate") and "OUTPUT RULES" in a.prefix
+    for name in ("readme_outline", "readme_section", "readme_consistency"):
+        template = get_template(name)
+        assert template.prefix and "{style}" not in template.prefix and "{style}" in template.suffix.lower()
+
+
+class Usage:
+    def __init__(self, prompt, cached, output):
+        self.prompt_token_count, self.cached_content_token_count, self.candidates_token_count = prompt, cached, output
+
+
+class CachingGemini:
+    """genai.Client stand-in with a caches API and usage metadata."""
+
+    def __init__(self, with_caches=True, fail_create=False):
+        self.models = self
+        self.requests, self.created = [], []
+        self.fail_create = fail_create
+        if with_caches:
+            self.caches = self
+
+    def create(self, model, config):
+        if self.fail_create:
+            raise RuntimeError("cached content is too small")
+        self.created.append(config)
+        return type("Cached", (), {"name": f"cachedContents/{len(self.created)}"})()
+
+    def generate_content(self, model, contents, config=None):
+        self.requests.append((contents, config))
+        usage = Usage(2000, 1800, 400) if config and "cached_content" in config else None
+        return type("Response", (), {"text": f"# Improved\n\n{len(self.requests)}", "usage_metadata": usage})()
+
+    def generate_content_stream(self, model, contents, config=None):
+        # Routed (cancellable) requests stream; the single chunk carries the usage
+        return iter([self.generate_content(model, contents, config)])
+
+
+def make_tool(client):
+    tool = WebSearchTool.__new__(WebSearchTool)
+    tool.provider, tool.selected_model = "google", "gemini-cache-test"
+    tool.active_client = tool.gemini_client = client
+    tool.groq_client = None
+    tool.last_context_report = None
+    return tool
+
+
+def test_prefix_goes_to_a_context_cache_that_is_reused():
+    client = CachingGemini()
+    tool = make_tool(client)
+    tool.summarize_and_improve("# Demo\n\nFirst.", [])
+    tool.summarize_and_improve("# Demo\n\nSecond.", [])
+    assert len(client.created) == 1 and client.created[0]["system_instruction"].startswith("You are an expert")
+    for contents, config in client.requests:
+        assert config == {"cached_content": "cachedContents/1"}
+        assert contents.startswith("Writing Style:")
+    record = tool.last_usage[-1]
+    assert (record.input_tokens, record.cached_tokens, record.fresh_tokens) == (2000, 1800, 200)
+    assert record.context_cache and not record.estimated and record.template == "readme_improve"
+
+
+def test_fallback_sends_prefix_inline_and_estimates_usage():
+    client = CachingGemini(fail_create=True)
+    tool = make_tool(client)
+    tool.summarize_and_improve("# Demo\n\nFirst.", [])
+    tool.summarize_and_improve("# Demo\n\nSecond.", [])
+    assert all("system_instruction" in config for _, config in client.requests)
+    assert GeminiContextCache.default().stats()["create_errors"] == 1  # not retried at once
+    record = tool.last_usage[-1]
+    assert record.estimated and record.cached_tokens == 0 and record.input_tokens > 1000
+
+
+def test_response_cache_hits_are_reported_without_input_tokens():
+    tool = make_tool(CachingGemini(with_caches=False))
+    tool.summarize_and_improve("# Demo\n\nSame.", [])
+    tool.summarize_and_improve("# Demo\n\nSame.", [])
+    summary = summarize_usage(tool.last_usage)
+    assert summary["requests"] == 1 and summary["response_cache_hits"] == 1 and summary["input_tokens"] == 0
+
+
+def test_small_prefixes_are_not_cached():
+    cache = GeminiContextCache(min_tokens=1024)
+    client = CachingGemini()
+    assert cache.name_for(client, "m", "short prefix", prefix_tokens=10) is None
+    assert cache.name_for(client, "m", "x" * 8000, prefix_tokens=2000, label="t") == "cachedContents/1"
+    assert cache.name_for(client, "m", "x" * 8000, prefix_tokens=2000) == "cachedContents/1"
+    assert cache.stats() == {"created": 1, "reused": 1, "fallbacks": 1, "create_errors": 0, "active": 1}
@@ -0,0 +1,90 @@
+# tests/test_provider_router.py
+import time
+
+import pytest
+
+from utils.provider_router import Backend, Cancelled, ProviderRouter
+
+
+class Stub:
+    """Local provider with injected latency and failures."""
+
+    def __init__(self, name, latency=0.0, fail=False, chunks=None):
+        self.name, self.latency, self.fail, self.chunks = name, latency, fail, chunks
+        self.calls = 0
+        self.cancelled = False
+
+    def __call__(self, prompt, cancel, on_partial):
+        self.calls += 1
+        deadline = time.monotonic() + self.latency
+        for chunk in self.chunks or ():
+            if on_partial:
+                on_partial(chunk)
+        while time.monotonic() < deadline:
+            if cancel.wait(0.005):
+                self.cancelled = True
+                raise Cancelled()
+        if self.fail:
+            raise RuntimeError(f"{self.name} unavailable")
+        return f"answer from {self.name}"
+
+    def backend(self):
+        return Backend(self.name, "m", self)
+
+
+def warm(router, stub, n=3):
+    for _ in range(n):
+        router.call([stub.backend()], "warm-up")
+
+
+def test_failover_when_primary_errors():
+    router = ProviderRouter(hedge=False)
+    primary, secondary = Stub("gemini", fail=True), Stub("groq")
+    text, backend = router.call([primary.backend(), secondary.backend()], "p")
+    assert text == "answer from groq" and backend.provider == "groq"
+    assert router.stats()["backends"]["gemini/m"]["error_rate"] == 1.0
+
+
+def test_ranks_by_measured_p50():
+    router = ProviderRouter(hedge=False)
+    slow, fast = Stub("slow", latency=0.03), Stub("fast", latency=0.0)
+    assert [b.provider for b in router.rank([slow.backend(), fast.backend()])] == ["slow", "fast"]
+    warm(router, slow)
+    warm(router, fast)
+    assert [b.provider for b in router.rank([slow.backend(), fast.backend()])] == ["fast", "slow"]
+
+
+def test_unhealthy_backend_goes_last():
+    router = ProviderRouter(hedge=False)
+    flaky, steady = Stub("flaky", fail=True), Stub("steady")
+    for _ in range(4):
+        with pytest.raises(RuntimeError):
+            router.call([flaky.backend()], "p")
+    assert [b.provider for b in router.rank([flaky.backend(), steady.backend()])] == ["steady", "flaky"]
+
+
+def test_hedges_after_primary_p95_and_cancels_loser():
+    router = ProviderRouter(hedge=True, min_hedge_delay=0.0)
+    primary, secondary = Stub("gemini", latency=0.0), Stub("groq", latency=0.02)
+    warm(router, primary)
+    warm(router, secondary)
+    primary.latency = 2.0  # primary suddenly stalls far past its p95
+    start = time.monotonic()
+    text, backend = router.call([primary.backend(), secondary.backend()], "p")
+    assert text == "answer from groq"
+    assert time.monotonic() - start < 1.0
+    assert router.stats()["hedges"] == {"fired": 1, "won": 1}
+    time.sleep(0.05)
+    assert primary.cancelled
+
+
+def test_streaming_backend_is_not_hedged():
+    router = ProviderRouter(hedge=True, min_hedge_delay=0.05)
+    primary, secondary = Stub("gemini", latency=0.0), Stub("groq", latency=0.02)
+    warm(router, primary)
+    warm(router, secondary)
+    primary.latency, primary.chunks = 0.1, ["# Title"]
+    partials = []
+    text, backend = router.call([primary.backend(), secondary.backend()], "p", on_partial=partials.append)
+    assert backend.provider == "gemini" and partials == ["# Title"]
+    assert router.stats()["hedges"]["fired"] == 0
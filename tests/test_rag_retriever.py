@@ -0,0 +1,109 @@
+# tests/test_rag_retriever.py
+import threading
+import time
+
+import pytest
+
+from tools import rag_retriever
+from tools.rag_retriever import RAGRetriever, doc_id
+from utils.resilience import Resilience
+
+
+class FakeCollection:
+    """In-memory stand-in for a Chroma collection."""
+
+    def __init__(self):
+        self.rows = {}
+        self.upserts = 0
+
+    def get(self, ids, include=None):
+        return {"ids": [i for i in ids if i in self.rows]}
+
+    def upsert(self, ids, embeddings, documents, metadatas=None):
+        self.upserts += 1
+        for i, e, d in zip(ids, embeddings, documents):
+            self.rows[i] = (e, d)
+
+    def count(self):
+        return len(self.rows)
+
+
+class FakeEmbedder:
+    """genai.Client stand-in: one embed_content call per batch, with injected latency."""
+
+    def __init__(self, latency=0.05, fail_batches=()):
+        self.models = self
+        self.latency = latency
+        self.fail_batches = set(fail_batches)
+        self.calls = 0
+        self.sizes = []
+        self.lock = threading.Lock()
+
+    def embed_content(self, model, contents):
+        if isinstance(contents, str):
+            contents = [contents]
+        with self.lock:
+            self.calls += 1
+            n = self.calls
+            self.sizes.append(len(contents))
+        time.sleep(self.latency)
+        if n in self.fail_batches:
+            raise ValueError("embedding backend hiccup")
+        values = [type("Embedding", (), {"values": [float(len(c)), 1.0]})() for c in contents]
+        return type("Response", (), {"embeddings": values})()
+
+
+@pytest.fixture
+def rag(monkeypatch):
+    monkeypatch.setattr(Resilience, "_default", Resilience())
+    retriever = RAGRetriever(db_path="unused")  # RAG disabled by default: no Chroma
+    retriever.collection = FakeCollection()
+    retriever.is_available = True
+    return retriever
+
+
+def use_client(monkeypatch, client):
+    monkeypatch.setattr(rag_retriever.llm_clients, "get_client", lambda provider: client)
+
+
+def test_doc_id_is_content_hash():
+    assert doc_id("Add  a license.\n") == doc_id("Add a license.") != doc_id("Add a License.")
+
+
+def test_thousands_of_documents_seed_in_batches(rag, monkeypatch):
+    client = FakeEmbedder(latency=0.05)
+    use_client(monkeypatch, client)
+    docs = [f"Suggestion number {i}: document the {i}th option." for i in range(3000)]
+    start = time.monotonic()
+    assert rag.seed_knowledge_base(docs + docs[:10]) == 3000
+    assert time.monotonic() - start < 2.0  # 30 concurrent batches, not 3000 round trips
+    assert client.calls == 30 and max(client.sizes) == 100
+    assert rag.collection.count() == 3000 and rag.collection.upserts == 30
+
+
+def test_reseeding_is_idempotent_and_resumes_after_failures(rag, monkeypatch):
+    docs = [f"Tip {i}" for i in range(250)]
+    client = FakeEmbedder(latency=0.0, fail_batches={2})
+    use_client(monkeypatch, client)
+    stored = rag.seed_knowledge_base(docs, batch_size=50)
+    assert stored == 200 and rag.collection.count() == 200
+
+    client.fail_batches.clear()
+    client.calls, client.sizes = 0, []
+    assert rag.seed_knowledge_base(docs, batch_size=50) == 50
+    assert client.sizes == [50] and rag.collection.count() == 250
+
+    assert rag.seed_knowledge_base(docs, batch_size=50) == 0
+    assert client.calls == 1 and rag.collection.count() == 250
+
+
+def test_retrieve_reads_batched_embedding_response(rag, monkeypatch):
+    use_client(monkeypatch, FakeEmbedder(latency=0.0))
+    queries = []
+
+    def query(query_embeddings, n_results):
+        queries.append(query_embeddings)
+        return {"documents": [["Add a license."]]}
+    rag.collection.query = query
+    assert rag.retrieve("license please") == ["Add a license."]
+    assert queries == [[[14.0, 1.0]]]
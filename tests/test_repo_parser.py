@@ -0,0 +1,200 @@
+# tests/test_repo_parser.py
+import tarfile
+import zipfile
+
+import pytest
+
+from tools.repo_parser import RepoParser, git_blob_digest
+from tools.scan_policy import ScanPolicy
+
+
+def make_repo(tmp_path):
+    repo_dir = tmp_path / "repo"
+    (repo_dir / "docs").mkdir(parents=True)
+    (repo_dir / "README.md").write_text("# Root\n\nRoot readme.")
+    (repo_dir / "docs" / "README.md").write_text("# Docs")
+    (repo_dir / "run.py").write_text("print('hi')\n")
+    return repo_dir
+
+
+def test_scan_is_lazy_and_parse_stays_compatible(tmp_path):
+    repo_dir = make_repo(tmp_path)
+    parser = RepoParser()
+    with parser.scan(str(repo_dir)) as view:
+        assert sorted(view) == ["README.md", "docs/README.md", "run.py"]
+        assert view.entries["run.py"].size == len("print('hi')\n")
+        assert view.entries["run.py"].digest is None  # nothing read yet
+        assert view["run.py"] == "print('hi')\n"
+        assert view.digest("run.py") == git_blob_digest(b"print('hi')\n")
+        assert view.readme == "# Root\n\nRoot readme."
+
+    parsed = parser.parse(str(repo_dir))
+    assert parsed["README.md"] == "# Root\n\nRoot readme."
+    assert parsed["files"]["docs/README.md"] == "# Docs"
+
+
+def test_scan_zip_loads_members_on_demand(tmp_path):
+    zip_path = tmp_path / "repo.zip"
+    with zipfile.ZipFile(zip_path, "w") as z:
+        z.writestr("proj/README.md", "# Zipped")
+        z.writestr("proj/main.py", "x = 1\n")
+    with RepoParser().scan(str(zip_path)) as view:
+        assert view.readme == "# Zipped"
+        assert dict(view.iter_contents())["proj/main.py"] == "x = 1\n"
+
+
+def test_parallel_scan_matches_sequential(tmp_path):
+    repo_dir = make_repo(tmp_path)
+    for d in ("a/b", "a/c", "node_modules/pkg", "z"):
+        (repo_dir / d).mkdir(parents=True)
+    for f in ("a/z.py", "a/b/x.py", "a/c/y.py", "node_modules/pkg/index.js", "z/last.txt"):
+        (repo_dir / f).write_text(f)
+    sequential = RepoParser(workers=1).parse(str(repo_dir))
+    parallel = RepoParser(workers=4).parse(str(repo_dir))
+    assert list(parallel["files"].items()) == list(sequential["files"].items())
+    assert "node_modules/pkg/index.js" not in parallel["files"]
+
+
+def test_binary_files_are_indexed_but_never_read(tmp_path):
+    repo_dir = make_repo(tmp_path)
+    (repo_dir / "weights.pt").write_bytes(b"\x80\x02" + b"\x00" * 200_000)
+    (repo_dir / "blob.dat").write_bytes(b"\x00\x01\x02garbage")
+    (repo_dir / "notes.unknown").write_text("plain text with an odd extension")
+    with RepoParser().scan(str(repo_dir)) as view:
+        assert view.entries["weights.pt"].kind == "model"
+        assert view.entries["blob.dat"].kind == "binary"
+        assert "weights.pt" not in view and "blob.dat" not in view
+        assert view["notes.unknown"].startswith("plain text")
+        assert {e.path for e in view.binary_entries} == {"weights.pt", "blob.dat"}
+
+
+def test_zip_policy_filters_before_decompressing(tmp_path):
+    zip_path = tmp_path / "repo.zip"
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        z.writestr("proj/README.md", "# Zipped project\n" * 5)
+        z.writestr("proj/node_modules/lib/index.js", "module.exports = 1")
+        z.writestr("proj/bomb.txt", "\0" * 90_000)
+        z.writestr("proj/big.py", "x = 1\n" * 20_000)
+        z.writestr("proj/a.py", "a = 1\n")
+        z.writestr("proj/b.py", "b = 2\n")
+    policy = ScanPolicy(max_files=2)
+    with RepoParser(policy=policy).scan(str(zip_path)) as view:
+        assert list(view) == ["proj/README.md", "proj/a.py"]
+
+
+def test_tar_gz_is_read_in_one_streaming_pass(tmp_path):
+    src = make_repo(tmp_path)
+    (src / "model.pt").write_bytes(b"\x00" * 1000)
+    tar_path = tmp_path / "repo.tar.gz"
+    with tarfile.open(tar_path, "w:gz") as tar:
+        tar.add(src, arcname=".")
+    with RepoParser().scan(str(tar_path)) as view:
+        assert view.readme == "# Root\n\nRoot readme."
+        assert view["run.py"] == "print('hi')\n"
+        assert view.entries["model.pt"].kind == "model"
+
+
+def test_tar_charges_notebooks_their_budget_cost(tmp_path):
+    src = tmp_path / "nb"
+    src.mkdir()
+    (src / "README.md").write_text("# Notebooks\n")
+    outputs = "x" * 3000  # Dropped when cells are extracted, so not charged in full
+    (src / "demo.ipynb").write_text('{"cells": [], "outputs": "%s"}' % outputs)
+    (src / "train.py").write_text("main()\n")
+    tar_path = tmp_path / "nb.tar"
+    with tarfile.open(tar_path, "w") as tar:
+        tar.add(src, arcname=".")
+    policy = ScanPolicy(max_file_size=1000, max_total_bytes=1100)
+    with RepoParser(policy=policy).scan(str(tar_path)) as view:
+        assert sorted(view) == ["README.md", "demo.ipynb", "train.py"]
+
+
+def test_manifest_reports_changes_and_rereads_only_touched_files(tmp_path):
+    repo_dir = make_repo(tmp_path)
+    parser = RepoParser(manifest_dir=str(tmp_path / "manifests"))
+    with parser.scan(str(repo_dir), project_id="demo") as view:
+        assert view.changes.first_scan
+        assert sorted(view.changes.added) == ["README.md", "docs/README.md", "run.py"]
+
+    (repo_dir / "run.py").write_text("print('changed')\n")
+    (repo_dir / "docs" / "README.md").unlink()
+    (repo_dir / "new.py").write_text("n = 1\n")
+
+    with parser.scan(str(repo_dir), project_id="demo") as view:
+        changes = view.changes
+        assert changes.added == ["new.py"]
+        assert changes.modified == ["run.py"]
+        assert changes.removed == ["docs/README.md"]
+        assert changes.unchanged == ["README.md"]
+        # README.md kept its recorded digest, so nothing forces a re-read of it
+        assert view.entries["README.md"].digest is not None
+
+
+def test_budget_reads_informative_files_first(tmp_path):
+    repo_dir = tmp_path / "big"
+    (repo_dir / "docs").mkdir(parents=True)
+    (repo_dir / "README.md").write_text("# Big\n")
+    (repo_dir / "requirements.txt").write_text("torch\n")
+    (repo_dir / "docs" / "guide.md").write_text("guide\n")
+    (repo_dir / "train.py").write_text("main()\n")
+    for d in ("a", "b"):
+        (repo_dir / "src" / "pkg" / d).mkdir(parents=True)
+        for i in range(3):
+            (repo_dir / "src" / "pkg" / d / f"m{i}.py").write_text("x = 1\n")
+    policy = ScanPolicy(max_files=6)
+    with RepoParser(policy=policy).scan(str(repo_dir)) as view:
+        assert set(view) == {"README.md", "requirements.txt", "docs/guide.md", "train.py",
+                             "src/pkg/a/m0.py", "src/pkg/b/m0.py"}
+        skipped = {e.path for e in view.skipped_entries}
+        assert skipped == {f"src/pkg/{d}/m{i}.py" for d in "ab" for i in (1, 2)}
+        assert all(e.skipped == "budget" for e in view.skipped_entries)
+        with pytest.raises(KeyError):
+            view["src/pkg/a/m1.py"]
+
+    tar_path = tmp_path / "big.tar"
+    with tarfile.open(tar_path, "w") as tar:
+        for name in ("src/pkg/a/m0.py", "src/pkg/a/m1.py", "README.md", "requirements.txt"):
+            tar.add(repo_dir / name, arcname=name)
+    with RepoParser(policy=ScanPolicy(max_files=2)).scan(str(tar_path)) as view:
+        assert set(view) == {"README.md", "requirements.txt"}
+        assert {e.path for e in view.skipped_entries} == {"src/pkg/a/m0.py", "src/pkg/a/m1.py"}
+
+
+def test_unchanged_files_are_not_read_again(tmp_path, monkeypatch):
+    import builtins
+    import json
+    from agents.repo_analyzer import RepoAnalyzerAgent
+
+    repo_dir = make_repo(tmp_path)
+    for i in range(10):
+        (repo_dir / f"mod{i}.py").write_text(f'"""Module {i}."""\n\ndef f{i}(x):\n    return x\n')
+    (repo_dir / "demo.ipynb").write_text(json.dumps({"cells": [
+        {"cell_type": "markdown", "source": "# Demo"}, {"cell_type": "code", "source": "x = 1"}]}))
+    repo_files = {str(p) for p in repo_dir.rglob("*") if p.is_file()}
+    opens = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        if str(file) in repo_files:
+            opens.append(str(file))
+        return real_open(file, *args, **kwargs)
+    monkeypatch.setattr(builtins, "open", counting_open)
+
+    parser = RepoParser(workers=2, manifest_dir=str(tmp_path / "manifests"))
+    first = RepoAnalyzerAgent(str(repo_dir), parser, project_id="demo").run()
+    assert first.changes.first_scan
+    assert sorted(opens) == sorted(repo_files)  # hashed from the analyzer's own reads
+
+    opens.clear()
+    second = RepoAnalyzerAgent(str(repo_dir), parser, project_id="demo").run()
+    assert second.changes.unchanged and not second.changes.has_changes
+    assert opens == [str(repo_dir / "README.md")]  # the README text itself is still needed
+    assert second.code_stats == first.code_stats
+    assert second.symbols.to_prompt() == first.symbols.to_prompt()
+
+    opens.clear()
+    (repo_dir / "mod3.py").write_text('"""Changed."""\n\ndef g(y):\n    return y\n')
+    third = RepoAnalyzerAgent(str(repo_dir), parser, project_id="demo").run()
+    assert third.changes.modified == ["mod3.py"]
+    assert sorted(opens) == sorted([str(repo_dir / "README.md"), str(repo_dir / "mod3.py")])
+    assert "def g(y)" in third.symbols.to_prompt()
@@ -0,0 +1,141 @@
+# tests/test_resilience.py
+import pytest
+
+from utils.resilience import (CircuitBreaker, CircuitOpen, ProviderGuard, RateLimited, RetryPolicy,
+                              TokenBucket, is_transient)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def make_guard(**kwargs):
+    sleeps = []
+    kwargs.setdefault("retry", RetryPolicy(max_attempts=3, base=0.1, cap=0.4, budget=10))
+    guard = ProviderGuard("test", rpm=0, tpm=0, sleep=sleeps.append, **kwargs)
+    return guard, sleeps
+
+
+def flaky(failures, error=None):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error or StatusError(429)
+        return "ok"
+    return fn, calls
+
+
+def test_transient_classification():
+    assert is_transient(StatusError(429)) and is_transient(StatusError(503))
+    assert not is_transient(StatusError(400))
+    assert is_transient(RuntimeError("429 RESOURCE_EXHAUSTED"))
+    assert is_transient(TimeoutError("read timed out"))
+    assert not is_transient(ValueError("bad prompt"))
+
+
+def test_token_bucket_refills_per_minute():
+    clock = Clock()
+    bucket = TokenBucket(60, clock=clock)
+    assert bucket.take(60) and not bucket.take(1)
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    clock.now = 0.5
+    assert not bucket.take(1)
+    clock.now = 1.0
+    assert bucket.take(1)
+    assert not bucket.acquire(30, timeout=5)  # would need 30s
+
+
+def test_retries_transient_errors_with_capped_backoff():
+    guard, sleeps = make_guard()
+    fn, calls = flaky(2)
+    assert guard.call(fn) == "ok"
+    assert len(calls) == 3 and len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 0.1 and 0 <= sleeps[1] <= 0.2
+    stats = guard.stats()
+    assert stats["retries"] == 2 and stats["successes"] == 1 and stats["state"] == "closed"
+
+
+def test_does_not_retry_permanent_errors_or_vetoed_streams():
+    guard, sleeps = make_guard()
+    fn, calls = flaky(1, StatusError(400))
+    with pytest.raises(StatusError):
+        guard.call(fn)
+    fn, calls2 = flaky(1)
+    with pytest.raises(StatusError):
+        guard.call(fn, retryable=lambda: False)
+    assert len(calls) == 1 and len(calls2) == 1 and not sleeps
+    assert guard.breaker.consecutive_failures == 1  # only the 429 counts against health
+
+
+def test_retry_budget_limits_total_backoff():
+    guard, sleeps = make_guard(retry=RetryPolicy(max_attempts=10, base=1.0, cap=1.0, budget=0.0))
+    fn, calls = flaky(5)
+    with pytest.raises(StatusError):
+        guard.call(fn)
+    assert len(calls) == 1 and not sleeps
+
+
+def test_circuit_opens_fails_fast_and_recovers_after_probe():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    guard, _ = make_guard(breaker=breaker, retry=RetryPolicy(max_attempts=1))
+    fn, calls = flaky(2)
+    for _ in range(2):
+        with pytest.raises(StatusError):
+            guard.call(fn)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        guard.call(fn)
+    assert len(calls) == 2 and guard.stats()["short_circuited"] == 1
+
+    clock.now = 31
+    assert breaker.state == "half_open"
+    assert guard.call(fn) == "ok"
+    assert breaker.state == "closed" and guard.stats()["times_opened"] == 1
+
+
+def test_half_open_probe_failure_reopens():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow() and not breaker.allow()  # a single probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_rate_limited_request_fails_instead_of_blocking():
+    guard = ProviderGuard("test", rpm=1, tpm=0, max_wait=0.05)
+    assert guard.call(lambda: "first") == "first"
+    with pytest.raises(RateLimited):
+        guard.call(lambda: "second")
+    stats = guard.stats()
+    assert stats["rate_limited"] == 1 and stats["state"] == "closed"
+
+
+def test_one_request_retries_do_not_open_the_circuit():
+    guard, sleeps = make_guard(breaker=CircuitBreaker(failure_threshold=3))
+    fn, calls = flaky(3)
+    with pytest.raises(StatusError):
+        guard.call(fn)
+    assert len(calls) == 3 and len(sleeps) == 2
+    assert guard.breaker.state == "closed" and guard.breaker.consecutive_failures == 1
+    assert guard.call(lambda: "ok") == "ok"
+
+    for _ in range(3):  # three requests that each exhaust their retries do open it
+        fn, _ = flaky(3)
+        with pytest.raises(StatusError):
+            guard.call(fn)
+    assert guard.breaker.state == "open"
@@ -0,0 +1,103 @@
+# tests/test_search_query.py
+import threading
+import time
+
+import pytest
+
+from tools.search_query import SearchCache, build_search_query, normalize_query
+from tools.web_search import WebSearchTool
+
+README = """# [DeepSeg](https://example.com): Brain Tumor Segmentation <img src="badge.svg">
+
+DeepSeg segments brain tumors in MRI scans with a U-Net written in PyTorch.
+""" + "Training details and results follow. " * 40
+
+
+class StubTavily:
+    """Local stand-in for TavilySearchResults with injected latency."""
+
+    def __init__(self, latency=0.0, results=None):
+        self.latency = latency
+        self.queries = []
+        self.lock = threading.Lock()
+        self.results = results if results is not None else [
+            {"title": f"Repo {i}", "url": f"https://github.com/x/{i}", "content": f"snippet {i}"} for i in range(5)]
+
+    def invoke(self, query):
+        with self.lock:
+            self.queries.append(query)
+        time.sleep(self.latency)
+        return list(self.results)
+
+
+class StubExtractor:
+    def extract(self, text):
+        return ["brain tumor", "mri", "u-net", "pytorch", "segmentation"]
+
+
+@pytest.fixture
+def tool(monkeypatch, tmp_path):
+    monkeypatch.setattr(SearchCache, "_default", SearchCache(path=str(tmp_path / "search.sqlite")))
+    tool = WebSearchTool.__new__(WebSearchTool)
+    tool.search = StubTavily()
+    tool.keyword_extractor = StubExtractor()
+    return tool
+
+
+def test_query_is_title_plus_new_keywords():
+    query = build_search_query(README, extractor=StubExtractor())
+    assert query == "DeepSeg Brain Tumor Segmentation mri u-net pytorch github"
+    assert build_search_query(README, keywords=["PyTorch", "MRI"]) == "DeepSeg Brain Tumor Segmentation pytorch mri github"
+
+
+def test_query_without_extractor_uses_keyword_engine():
+    query = build_search_query(README)
+    assert query.startswith("DeepSeg Brain Tumor Segmentation") and len(query) < 200
+
+
+def test_normalized_queries_share_an_entry():
+    assert normalize_query("PyTorch  MRI, u-net") == normalize_query("u-net mri pytorch mri")
+
+
+def test_readme_query_is_condensed_and_cached(tool):
+    first = tool.search_similar_repos(README, top_k=3)
+    again = tool.search_similar_repos("deepseg brain tumor segmentation MRI u-net PyTorch  github", top_k=2)
+    assert [r["title"] for r in first] == ["Repo 0", "Repo 1", "Repo 2"]
+    assert again == first[:2]
+    assert tool.search.queries == ["DeepSeg Brain Tumor Segmentation mri u-net pytorch github"]
+
+
+def test_results_survive_a_restart_and_expire(tool, tmp_path):
+    tool.search_similar_repos("pytorch mri", top_k=3)
+    SearchCache._default = SearchCache(path=str(tmp_path / "search.sqlite"))
+    tool.search_similar_repos("pytorch mri", top_k=3)
+    assert len(tool.search.queries) == 1
+    SearchCache._default = SearchCache(path=str(tmp_path / "search.sqlite"), ttl=0)
+    tool.search_similar_repos("pytorch mri", top_k=3)
+    assert len(tool.search.queries) == 2
+
+
+def test_concurrent_identical_searches_share_one_call(tool):
+    tool.search = StubTavily(latency=0.2)
+    out = []
+    threads = [threading.Thread(target=lambda q=q: out.append(tool.search_similar_repos(q)))
+               for q in ["pytorch mri", "MRI pytorch", "pytorch  mri"] * 2]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(tool.search.queries) == 1
+    assert len(out) == 6 and all(r == out[0] for r in out)
+
+
+def test_empty_results_and_errors_are_not_cached(tool):
+    tool.search = StubTavily(results=[])
+    assert tool.search_similar_repos("nothing here") == []
+    assert tool.search_similar_repos("nothing here") == []
+    assert len(tool.search.queries) == 2
+
+    class Failing:
+        def invoke(self, query):
+            raise RuntimeError("boom")
+    tool.search = Failing()
+    assert tool.search_similar_repos("pytorch failing") == []
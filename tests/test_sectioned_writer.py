@@ -0,0 +1,141 @@
+# tests/test_sectioned_writer.py
+import json
+import re
+import threading
+import time
+
+import pytest
+
+from tools.sectioned_writer import (SectionedWriter, apply_terms, generation_mode, normalize_section,
+                                    parse_outline)
+from tools.web_search import WebSearchTool
+from utils.llm_cache import LLMCache
+
+README = "# Demo\n\nDemo classifies images with PyTorch.\n\n## Usage\n\nRun `python train.py`.\n"
+TITLES = ["🌍 Overview", "🌟 Features", "📝 Architecture", "🚀 Quick Start", "💡 Usage", "🤝 Contributing"]
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch):
+    monkeypatch.setattr(LLMCache, "_default", LLMCache(path=None))
+
+
+def outline_json(titles=TITLES):
+    return json.dumps({"title": "Demo", "sections": [{"title": t, "focus": "f", "words": 200} for t in titles]})
+
+
+class StubModel:
+    """Answers outline, section and consistency prompts; sections sleep ``latency[title]``."""
+
+    def __init__(self, latency=None, fail=()):
+        self.latency = latency or {}
+        self.fail = set(fail)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, prompt):
+        if "Plan a publication-ready README" in prompt:
+            kind, reply = "outline", outline_json()
+        elif "was written section by section" in prompt:
+            kind, reply = "consistency", json.dumps({"intro": "Demo in one line.", "terms": {"Pytorch": "PyTorch"}})
+        else:
+            title = re.search(r'Write ONLY section \d+: "([^"]+)"', prompt).group(1)
+            kind, reply = title, f"## {title}\n\nBuilt with Pytorch.\n\n# Details\n\nMore."
+            time.sleep(self.latency.get(title, 0.0))
+            if title in self.fail:
+                with self.lock:
+                    self.calls.append(kind)
+                raise RuntimeError(f"{title} failed")
+        with self.lock:
+            self.calls.append(kind)
+        return reply
+
+
+def test_generation_mode(monkeypatch):
+    monkeypatch.delenv("PUBLISH_ASSIST_GENERATION_MODE", raising=False)
+    assert generation_mode("Long") == "sectioned" and generation_mode("Medium") == "single"
+    monkeypatch.setenv("PUBLISH_ASSIST_GENERATION_MODE", "sectioned")
+    assert generation_mode("Short") == "sectioned"
+
+
+def test_parse_outline_validates_and_bounds():
+    parsed = parse_outline("```json\n" + outline_json(TITLES + ["🌍 Overview"]) + "\n```", max_sections=5)
+    assert parsed.title == "Demo" and [s.title for s in parsed.sections] == TITLES[:5]
+    assert parse_outline('{"sections": ["One", "Two"]}') is None
+    assert parse_outline("not json") is None
+
+
+def test_normalize_section_and_terms():
+    text = normalize_section("Usage", "# 💡 Usage\n\n# Run\n```\n# not a heading\n```\n## Flags\nuse pytorch")
+    assert text == "## 💡 Usage\n\n### Run\n```\n# not a heading\n```\n#### Flags\nuse pytorch"
+    assert apply_terms("Pytorch and `Pytorch`\n```\nPytorch\n```", {"Pytorch": "PyTorch"}) == \
+        "PyTorch and `Pytorch`\n```\nPytorch\n```"
+
+
+def test_sections_run_concurrently_and_are_stitched_in_order():
+    model = StubModel(latency={t: 0.1 for t in TITLES} | {"📝 Architecture": 0.3})
+    partials = []
+    writer = SectionedWriter(model, max_workers=6)
+    start = time.monotonic()
+    document = writer.write(README, style="Technical Blog", length="Long", on_partial=partials.append)
+    elapsed = time.monotonic() - start
+    assert elapsed < 0.6  # the slowest section (0.3s), not the sum (0.8s)
+    headings = re.findall(r"^## (.+)$", document, re.M)
+    assert headings == TITLES
+    assert document.startswith("# Demo\n\nDemo in one line.\n\n## 🌍 Overview")
+    assert "PyTorch" in document and "Pytorch" not in document and "### Details" in document
+    assert len(partials) == len(TITLES) + 2 and partials[-1] == document
+    assert writer.last_report.failed == [] and writer.last_report.outline == TITLES
+
+
+def test_unusable_outline_falls_back():
+    def complete(prompt):
+        if "Plan a publication-ready README" in prompt:
+            return "Sure! Here is an outline."
+        if "was written section by section" in prompt:
+            raise RuntimeError("down")
+        return "Some text."
+    writer = SectionedWriter(complete)
+    document = writer.write(README, length="Long")
+    assert document.startswith("# Demo\n\n## 🌍 Overview\n\nSome text.")
+    assert len(writer.last_report.outline) == 8
+
+
+class StubGemini:
+    """genai.Client stand-in for WebSearchTool backed by a StubModel."""
+
+    def __init__(self, model):
+        self.model = model
+        self.models = self
+
+    def generate_content(self, model, contents, config=None):
+        prefix = (config or {}).get("system_instruction", "")
+        return type("Response", (), {"text": self.model(f"{prefix}\n\n{contents}")})()
+
+    def generate_content_stream(self, model, contents, config=None):
+        return iter([self.generate_content(model, contents, config)])
+
+
+def make_tool(model):
+    tool = WebSearchTool.__new__(WebSearchTool)
+    tool.provider, tool.selected_model = "google", "gemini-sections"
+    tool.active_client = tool.gemini_client = StubGemini(model)
+    tool.groq_client = None
+    tool.last_context_report = None
+    return tool
+
+
+def test_failed_section_is_left_out_then_retried_alone():
+    model = StubModel(fail={"🚀 Quick Start"})
+    tool = make_tool(model)
+    first = tool.summarize_and_improve(README, [], length="Long")
+    assert "## 🚀 Quick Start" not in first and "## 💡 Usage" in first
+    assert tool.last_generation_report.failed == ["🚀 Quick Start"]
+    assert model.calls.count("🚀 Quick Start") == 2  # the in-run retry
+
+    model.calls.clear()
+    model.fail.clear()
+    second = tool.summarize_and_improve(README, [], length="Long")
+    assert "## 🚀 Quick Start" in second
+    # Outline and the other sections come from the response cache
+    assert sorted(model.calls) == sorted(["🚀 Quick Start", "consistency"])
@@ -0,0 +1,181 @@
+# tests/test_streaming.py
+import threading
+
+import pytest
+
+from orchestration.graph import Orchestrator
+from tools.web_search import WebSearchTool
+from utils.llm_cache import LLMCache
+from utils.provider_router import Cancelled
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch):
+    monkeypatch.setattr(LLMCache, "_default", LLMCache(path=None))
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class StreamingGemini:
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.models = self
+
+    def generate_content_stream(self, model, contents, config=None):
+        return (_Chunk(p) for p in self.pieces)
+
+    def generate_content(self, model, contents, config=None):
+        raise AssertionError("streaming path expected")
+
+
+def make_tool(client):
+    tool = WebSearchTool.__new__(WebSearchTool)
+    tool.provider, tool.selected_model = "google", "gemini-test"
+    tool.active_client = tool.gemini_client = client
+    tool.groq_client = None
+    tool.last_context_report = None
+    return tool
+
+
+def test_summarize_streams_partial_text_then_serves_cache():
+    tool = make_tool(StreamingGemini(["# Demo", "\n\nFast ", "and small."]))
+    partials = []
+    text = tool.summarize_and_improve("# Demo\n\nA demo.", [], on_partial=partials.append)
+    assert partials == ["# Demo", "# Demo\n\nFast ", "# Demo\n\nFast and small."]
+    assert text == partials[-1]
+
+    cached = []
+    assert tool.summarize_and_improve("# Demo\n\nA demo.", [], on_partial=cached.append) == text
+    assert cached == [text]
+
+
+def test_stream_pipeline_yields_stages_partials_and_result():
+    class Analyzer:
+        def run(self):
+            return type("Analysis", (), {"readme": "# Demo", "files": {}, "code_stats": {}})()
+
+    class Recommender:
+        def run(self, readme_text, code_files):
+            return type("Metadata", (), {"title_suggestions": ["Demo"], "tags": [], "short_description": ""})()
+
+    class Improver:
+        def run(self, readme, metadata, style="Technical Blog", goal="", on_partial=None):
+            for text in ("# De", "# Demo"):
+                on_partial(text)
+            return type("Content", (), {"improved_readme": "# Demo"})()
+
+    class Reviewer:
+        def run(self, readme, code_stats):
+            return type("Review", (), {"score": 8.0})()
+
+    class FactChecker:
+        def run(self, readme_text):
+            return type("FactCheck", (), {"flagged": []})()
+
+    agents = {"repo_analyzer": Analyzer(), "metadata_recommender": Recommender(), "content_improver": Improver(),
+              "reviewer_critic": Reviewer(), "fact_checker": FactChecker()}
+    events = list(Orchestrator().stream_pipeline(agents, "./demo"))
+    stages = [e["stage"] for e in events if e["type"] == "stage"]
+    assert stages == ["analyze_repo", "recommend_metadata", "improve_content", "review_content", "fact_check"]
+    partials = [e["text"] for e in events if e["type"] == "partial"]
+    assert partials and partials[-1] == "# Demo"
+    assert events[-1]["type"] == "result"
+    assert events[-1]["result"]["content_improvement"].improved_readme == "# Demo"
+
+
+def test_stream_pipeline_reraises_errors():
+    class Broken:
+        def run(self):
+            raise RuntimeError("clone failed")
+
+    with pytest.raises(RuntimeError, match="clone failed"):
+        list(Orchestrator().stream_pipeline({"repo_analyzer": Broken()}, "./demo"))
+
+
+def test_closing_the_stream_stops_the_pipeline():
+    import threading
+    closed, finished = threading.Event(), threading.Event()
+    ran = []
+
+    class Analyzer:
+        def run(self):
+            return type("Analysis", (), {"readme": "# Demo", "files": {}, "code_stats": {}})()
+
+    class Recommender:
+        def run(self, readme_text, code_files):
+            closed.wait(5)  # still running when the consumer goes away
+            return type("Metadata", (), {"title_suggestions": ["Demo"], "tags": [], "short_description": ""})()
+
+    class Improver:
+        def run(self, *args, **kwargs):
+            ran.append("improve")
+
+    agents = {"repo_analyzer": Analyzer(), "metadata_recommender": Recommender(), "content_improver": Improver()}
+    real_run = Orchestrator.run_pipeline
+
+    def run_pipeline(self, *args, **kwargs):
+        try:
+            return real_run(self, *args, **kwargs)
+        finally:
+            finished.set()
+
+    orch = Orchestrator()
+    orch.run_pipeline = run_pipeline.__get__(orch)
+    stream = orch.stream_pipeline(agents, "./demo")
+    assert next(stream)["stage"] == "analyze_repo"
+    stream.close()
+    closed.set()
+    assert finished.wait(5)
+    assert ran == []
+
+
+class _GroqChunk:
+    def __init__(self, text):
+        self.choices = [type("Choice", (), {"delta": type("Delta", (), {"content": text})})()]
+
+
+class LosingBackend:
+    """Stream whose hedge is won elsewhere (cancel is set) while its second chunk arrives."""
+
+    def __init__(self, cancel, chunk=_Chunk):
+        self.cancel, self.chunk = cancel, chunk
+        self.pulled = 0
+        self.closed = False
+        self.models = self.chat = self.completions = self
+
+    def _stream(self):
+        try:
+            for i in range(100):
+                self.pulled += 1
+                if i == 1:
+                    self.cancel.set()
+                yield self.chunk(f"part {i} ")
+        finally:
+            self.closed = True
+
+    def generate_content_stream(self, model, contents, config=None):
+        return self._stream()
+
+    def generate_content(self, model, contents, config=None):
+        raise AssertionError("a cancellable request must stream")
+
+    def create(self, model, messages, stream=False):
+        assert stream, "a cancellable request must stream"
+        return self._stream()
+
+
+@pytest.mark.parametrize("provider", ["google", "groq"])
+def test_losing_hedged_backend_stops_at_next_chunk(provider):
+    cancel = threading.Event()
+    if provider == "google":
+        client = LosingBackend(cancel)
+        call = lambda: WebSearchTool._gemini_text(client, "gemini-test", "losing gemini prompt", None, cancel)
+    else:
+        client = LosingBackend(cancel, chunk=_GroqChunk)
+        call = lambda: WebSearchTool._groq_text(client, "groq-test", "losing groq prompt", None, cancel)
+    with pytest.raises(Cancelled):
+        call()
+    assert client.pulled == 2 and client.closed
@@ -0,0 +1,71 @@
+# tests/test_symbol_index.py
+from tools.symbol_index import SymbolIndexBuilder, extract_symbols
+
+SOURCE = '''"""Training entry point.
+
+Longer description."""
+import argparse
+import torch
+from .local import helper
+
+
+class Trainer(Base):
+    """Runs the training loop."""
+
+    def __init__(self, model):
+        pass
+
+    def fit(self, data, *, epochs=1):
+        pass
+
+    def _private(self):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--epochs", type=int)
+    parser.add_argument("-o", "--output")
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+
+def test_extract_symbols_outline():
+    module = extract_symbols("train.py", SOURCE)
+    assert module.doc == "Training entry point."
+    assert module.entry_point
+    assert module.cli_flags == ["--epochs", "-o", "--output"]
+    assert module.imports == ["argparse", "torch"]
+    assert module.classes[0].bases == ["Base"]
+    assert module.classes[0].methods == ["__init__(model)", "fit(data, epochs)"]
+    assert [f.signature for f in module.functions] == ["main(argv)"]
+    assert extract_symbols("bad.py", "def broken(:") is None
+
+
+def test_builder_process_pool_matches_inline_and_caches_by_digest():
+    sources = [(f"pkg/mod{i}.py", SOURCE.replace("Trainer", f"Trainer{i}")) for i in range(6)]
+    inline = SymbolIndexBuilder()
+    pooled = SymbolIndexBuilder(expected_files=6, workers=2, process_threshold=1)
+    for i, (path, source) in enumerate(sources):
+        inline.add(path, source)
+        pooled.add(path, source, digest=f"digest-{i}")
+    index = pooled.build()
+    # One long-lived pool with spawned workers: the analyzer runs inside a threaded server
+    assert pooled._pool is SymbolIndexBuilder(expected_files=1, process_threshold=1)._pool
+    assert pooled._pool._mp_context.get_start_method() == "spawn"
+    assert [m.classes[0].name for m in index.modules.values()] == [f"Trainer{i}" for i in range(6)]
+    assert {p: vars(m) for p, m in inline.build().modules.items()} == \
+        {p: vars(m) for p, m in index.modules.items()}
+
+    # A cache hit never parses: the source is ignored entirely
+    cached = SymbolIndexBuilder()
+    cached.add("copy.py", "not python at all (", digest="digest-0")
+    module = cached.build().modules["copy.py"]
+    assert module.path == "copy.py" and module.classes[0].name == "Trainer0"
+
+    prompt = index.to_prompt(max_chars=400)
+    assert prompt.startswith("Dependencies: torch")
+    assert "[entry point]" in prompt and len(prompt) <= 450
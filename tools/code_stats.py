@@ -0,0 +1,232 @@
+# tools/code_stats.py
+"""
+Single-pass, per-language line statistics (code / comment / blank) for repository files.
+
+Languages are resolved from a table keyed by exact filename (Dockerfile, Makefile,
+lockfiles) and then by extension. Every language has a kind:
+  - code: programming languages; only these count toward ``total_lines``
+  - markup: HTML, CSS, LaTeX, ...
+  - data: configuration, serialized data and lockfiles
+  - prose: Markdown, reStructuredText, plain text
+Notebooks are counted from their percent-script text (see tools.notebook_reader):
+code cells are code, markdown cells and cell markers are comments.
+CodeStats only keeps per-language counters, so memory is fixed no matter how many
+files are fed to it; each file is consumed once and can be dropped immediately.
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+
+CODE, MARKUP, DATA, PROSE = "code", "markup", "data", "prose"
+
+_HASH = ("#",)
+_SLASH = ("//",)
+_C_BLOCK = (("/*", "*/"),)
+_DASH = ("--",)
+
+
+@dataclass(frozen=True)
+class Language:
+    name: str
+    kind: str
+    line_comments: Tuple[str, ...] = ()
+    block_comments: Tuple[Tuple[str, str], ...] = ()
+    # Block delimiters only open a comment at the start of a line (Python docstrings)
+    block_at_line_start: bool = False
+
+
+PYTHON = Language("Python", CODE, _HASH, (('"""', '"""'), ("'''", "'''")), block_at_line_start=True)
+C_LIKE = {name: Language(name, CODE, _SLASH, _C_BLOCK) for name in (
+    "C", "C++", "CUDA", "Java", "Kotlin", "Scala", "Go", "Rust", "JavaScript", "TypeScript",
+    "Swift", "Dart", "PHP", "Protocol Buffers", "SCSS", "Groovy", "C#",
+)}
+SHELL = Language("Shell", CODE, _HASH)
+OTHER = Language("Other", DATA)
+
+LANGUAGES: Dict[str, Language] = {
+    "py": PYTHON, "pyi": PYTHON, "pyx": Language("Cython", CODE, _HASH),
+    "c": C_LIKE["C"], "h": C_LIKE["C"], "cc": C_LIKE["C++"], "cpp": C_LIKE["C++"],
+    "cxx": C_LIKE["C++"], "hpp": C_LIKE["C++"], "cu": C_LIKE["CUDA"], "cuh": C_LIKE["CUDA"],
+    "java": C_LIKE["Java"], "kt": C_LIKE["Kotlin"], "scala": C_LIKE["Scala"], "go": C_LIKE["Go"],
+    "rs": C_LIKE["Rust"], "js": C_LIKE["JavaScript"], "jsx": C_LIKE["JavaScript"],
+    "mjs": C_LIKE["JavaScript"], "ts": C_LIKE["TypeScript"], "tsx": C_LIKE["TypeScript"],
+    "swift": C_LIKE["Swift"], "dart": C_LIKE["Dart"], "php": C_LIKE["PHP"], "cs": C_LIKE["C#"],
+    "gradle": C_LIKE["Groovy"], "proto": C_LIKE["Protocol Buffers"],
+    "rb": Language("Ruby", CODE, _HASH, (("=begin", "=end"),), block_at_line_start=True),
+    "r": Language("R", CODE, _HASH), "jl": Language("Julia", CODE, _HASH, (("#=", "=#"),)),
+    "lua": Language("Lua", CODE, _DASH, (("--[[", "]]"),)), "pl": Language("Perl", CODE, _HASH),
+    "m": Language("MATLAB", CODE, ("%",), (("%{", "%}"),)), "hs": Language("Haskell", CODE, _DASH, (("{-", "-}"),)),
+    "ex": Language("Elixir", CODE, _HASH), "exs": Language("Elixir", CODE, _HASH),
+    "sh": SHELL, "bash": SHELL, "zsh": SHELL, "ps1": Language("PowerShell", CODE, _HASH, (("<#", "#>"),)),
+    "bat": Language("Batch", CODE, ("rem ", "REM ", "::")), "sql": Language("SQL", CODE, _DASH, _C_BLOCK),
+    "cmake": Language("CMake", CODE, _HASH), "mk": Language("Makefile", CODE, _HASH),
+    "vue": Language("Vue", CODE, _SLASH, _C_BLOCK + (("<!--", "-->"),)),
+    "svelte": Language("Svelte", CODE, _SLASH, _C_BLOCK + (("<!--", "-->"),)),
+    "html": Language("HTML", MARKUP, (), (("<!--", "-->"),)), "htm": Language("HTML", MARKUP, (), (("<!--", "-->"),)),
+    "xml": Language("XML", MARKUP, (), (("<!--", "-->"),)), "css": Language("CSS", MARKUP, (), _C_BLOCK),
+    "scss": C_LIKE["SCSS"], "tex": Language("TeX", MARKUP, ("%",)), "bib": Language("BibTeX", MARKUP),
+    "json": Language("JSON", DATA), "jsonl": Language("JSON", DATA), "ipynb": Language("Jupyter Notebook", CODE, _HASH),
+    "yaml": Language("YAML", DATA, _HASH), "yml": Language("YAML", DATA, _HASH),
+    "toml": Language("TOML", DATA, _HASH), "ini": Language("INI", DATA, (";", "#")),
+    "cfg": Language("INI", DATA, (";", "#")), "env": Language("Dotenv", DATA, _HASH),
+    "csv": Language("CSV", DATA), "tsv": Language("CSV", DATA), "graphql": Language("GraphQL", DATA, _HASH),
+    "lock": Language("Lockfile", DATA),
+    "md": Language("Markdown", PROSE), "rst": Language("reStructuredText", PROSE),
+    "txt": Language("Text", PROSE),
+}
+
+# Exact (lowercased) filenames take precedence over extensions
+FILENAMES: Dict[str, Language] = {
+    "dockerfile": Language("Dockerfile", CODE, _HASH),
+    "makefile": LANGUAGES["mk"], "gnumakefile": LANGUAGES["mk"],
+    "cmakelists.txt": LANGUAGES["cmake"],
+    "jenkinsfile": C_LIKE["Groovy"], "vagrantfile": LANGUAGES["rb"], "gemfile": LANGUAGES["rb"],
+    "requirements.txt": Language("Requirements", DATA, _HASH),
+    "package-lock.json": LANGUAGES["lock"], "yarn.lock": LANGUAGES["lock"],
+    "pnpm-lock.yaml": LANGUAGES["lock"], "poetry.lock": LANGUAGES["lock"],
+    "pipfile.lock": LANGUAGES["lock"], "cargo.lock": LANGUAGES["lock"],
+    ".gitignore": Language("Ignore List", DATA, _HASH), ".dockerignore": Language("Ignore List", DATA, _HASH),
+    "license": Language("Text", PROSE), "copying": Language("Text", PROSE),
+}
+
+
+def detect_language(path: str) -> Language:
+    name = os.path.basename(path).lower()
+    language = FILENAMES.get(name)
+    if language is not None:
+        return language
+    if name.startswith("dockerfile.") or name.endswith(".dockerfile"):
+        return FILENAMES["dockerfile"]
+    if name.startswith("requirements") and name.endswith(".txt"):
+        return FILENAMES["requirements.txt"]
+    if "." not in name:
+        return OTHER
+    return LANGUAGES.get(name.rsplit(".", 1)[-1], OTHER)
+
+
+def count_lines(content: str, language: Language) -> Tuple[int, int, int]:
+    """(code, comment, blank) line counts of one file."""
+    code = comment = blank = 0
+    if not language.line_comments and not language.block_comments:
+        for line in content.splitlines():
+            if line.strip():
+                code += 1
+            else:
+                blank += 1
+        return code, comment, blank
+
+    line_comments = language.line_comments
+    blocks = language.block_comments
+    closing: Optional[str] = None  # end marker of the block comment we are inside
+    for line in content.splitlines():
+        stripped = line.strip()
+        if closing is not None:
+            end = stripped.find(closing)
+            if end == -1:
+                comment += 1
+                continue
+            rest = stripped[end + len(closing):].strip()
+            closing = None
+            if rest and not rest.startswith(line_comments or ("\0",)):
+                code += 1
+            else:
+                comment += 1
+            continue
+        if not stripped:
+            blank += 1
+            continue
+        if line_comments and stripped.startswith(line_comments):
+            comment += 1
+            continue
+        is_code = True
+        for start, end in blocks:
+            if stripped.startswith(start):
+                close = stripped.find(end, len(start))
+                if close == -1:
+                    closing = end
+                    is_code = False
+                else:
+                    rest = stripped[close + len(end):].strip()
+                    is_code = bool(rest) and not rest.startswith(line_comments or ("\0",))
+                break
+            if not language.block_at_line_start:
+                # A block opened after code on the same line and left unclosed
+                opened = stripped.find(start)
+                if opened != -1 and stripped.find(end, opened + len(start)) == -1:
+                    closing = end
+                    break
+        if is_code:
+            code += 1
+        else:
+            comment += 1
+    return code, comment, blank
+
+
+@dataclass
+class LanguageStats:
+    kind: str
+    files: int = 0
+    code: int = 0
+    comment: int = 0
+    blank: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class CodeStats:
+    """
+    Streaming accumulator: add(path, content) once per text file, add_binary() for
+    metadata-only entries, then to_dict() for the analyzer's ``code_stats``.
+    """
+    by_language: Dict[str, LanguageStats] = field(default_factory=dict)
+    binary_files: int = 0
+    binary_bytes: int = 0
+    skipped_files: int = 0
+
+    def add(self, path: str, content: str, size: Optional[int] = None) -> Tuple[int, int, int]:
+        """Count one file; returns its (code, comment, blank) lines."""
+        counts = count_lines(content, detect_language(path))
+        self.add_counts(path, *counts, size=size if size is not None
+                        else len(content.encode("utf-8", errors="ignore")))
+        return counts
+
+    def add_counts(self, path: str, code: int, comment: int, blank: int, size: int) -> None:
+        """Add a file whose lines were counted earlier (e.g. on a previous scan)."""
+        language = detect_language(path)
+        stats = self.by_language.get(language.name)
+        if stats is None:
+            stats = self.by_language[language.name] = LanguageStats(kind=language.kind)
+        stats.files += 1
+        stats.code += code
+        stats.comment += comment
+        stats.blank += blank
+        stats.bytes += size
+
+    def add_binary(self, size: int) -> None:
+        self.binary_files += 1
+        self.binary_bytes += size
+
+    def update(self, items: Iterable[Tuple[str, str]]) -> "CodeStats":
+        for path, content in items:
+            self.add(path, content)
+        return self
+
+    @property
+    def text_files(self) -> int:
+        return sum(s.files for s in self.by_language.values())
+
+    @property
+    def code_lines(self) -> int:
+        return sum(s.code for s in self.by_language.values() if s.kind == CODE)
+
+    def to_dict(self) -> Dict:
+        ordered = sorted(self.by_language.items(), key=lambda kv: (-kv[1].code, kv[0]))
+        return {
+            "file_count": self.text_files + self.binary_files,
+            "languages": {name: s.files for name, s in ordered},
+            "total_lines": self.code_lines,
+            "by_language": {name: vars(s).copy() for name, s in ordered},
+            "binary_files": self.binary_files,
+            "binary_bytes": self.binary_bytes,
+            "skipped_files": self.skipped_files,
+        }
@@ -0,0 +1,274 @@
+# tools/context_packer.py
+"""
+Token-budgeted assembly of the repository context for README generation.
+
+Instead of slicing ``readme[:4000]`` and appending every search snippet, the context
+is split into candidate items:
+  - readme: the preamble and each section (heading to next heading)
+  - evidence: per-module blocks of the symbol index outline (tools.symbol_index)
+  - hint: RAG best-practice suggestions
+  - search: web search snippets
+Each item is scored (kind prior, section importance, term overlap with the README
+title/preamble and the user's goal) and the budget is filled greedily by score; an item
+that does not fit is cut at a line boundary if enough budget remains. Selected items
+are emitted in their original order, and a PackReport records what was kept or dropped.
+Token counts are estimated per provider/model from character counts.
+"""
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from tools.keyword_engine import STOPWORDS
+from tools.markdown_index import parse_markdown
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT_TOKENS = 2500
+MIN_PARTIAL_TOKENS = 80   # below this, a truncated item is not worth including
+MAX_SNIPPET_TOKENS = 200  # a single search result never takes more than this
+
+# Average characters per token of English/Markdown text; non-ASCII characters count
+# as a token each. Model prefixes override the provider default.
+CHARS_PER_TOKEN = {"google": 4.0, "groq": 3.7}
+MODEL_CHARS_PER_TOKEN = {"gemini": 4.0, "llama": 3.7, "mixtral": 3.5, "gemma": 4.0}
+DEFAULT_CHARS_PER_TOKEN = 3.8
+
+OPENING_SCORE = 3.0  # the README's opening (preamble or first section) is always packed first
+# Budget shares filled by each kind before the global pass, so a long README cannot
+# crowd out code evidence, search examples and hints entirely
+RESERVED_SHARE = {"evidence": 0.2, "search": 0.15, "hint": 0.05}
+KIND_PRIOR = {"readme": 1.0, "evidence": 0.9, "hint": 0.8, "search": 0.7}
+# README sections readers and the model need most, and those that can go first
+IMPORTANT_SECTIONS = ("overview", "introduc", "about", "feature", "usage", "quick start", "install",
+                      "getting started", "architecture", "how it works", "model", "dataset", "result")
+MINOR_SECTIONS = ("licens", "contribut", "acknowledg", "citation", "contact", "changelog",
+                  "author", "support", "star history", "faq")
+
+_WORD = re.compile(r"[a-z][a-z0-9]+")
+
+
+def estimate_tokens(text: str, provider: str = "google", model: str = "") -> int:
+    if not text:
+        return 0
+    ratio = CHARS_PER_TOKEN.get(provider, DEFAULT_CHARS_PER_TOKEN)
+    for prefix, value in MODEL_CHARS_PER_TOKEN.items():
+        if model and model.lower().startswith(prefix):
+            ratio = value
+            break
+    non_ascii = len(text) - len(text.encode("ascii", "ignore"))
+    return math.ceil((len(text) - non_ascii) / ratio) + non_ascii
+
+
+def _terms(text: str) -> set:
+    return {w for w in _WORD.findall(text.lower()) if w not in STOPWORDS}
+
+
+def _relevance(terms: set, query: set) -> float:
+    """Share of the smaller term set found in the other (0..1)."""
+    if not terms or not query:
+        return 0.0
+    return len(terms & query) / min(len(terms), len(query))
+
+
+@dataclass
+class ContextItem:
+    kind: str
+    label: str
+    text: str
+    order: int
+    score: float = 0.0
+    tokens: int = 0
+    truncated: bool = False
+    payload: Any = None  # original object (e.g. a search result dict)
+
+
+@dataclass
+class PackReport:
+    budget: int
+    used: int = 0
+    provider: str = ""
+    model: str = ""
+    included: List[Dict[str, Any]] = field(default_factory=list)
+    dropped: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"budget": self.budget, "used": self.used, "provider": self.provider, "model": self.model,
+                "included": self.included, "dropped": self.dropped}
+
+    def summary(self) -> str:
+        truncated = sum(1 for i in self.included if i["truncated"])
+        return (f"{self.used}/{self.budget} tokens, {len(self.included)} items included "
+                f"({truncated} truncated), {len(self.dropped)} dropped")
+
+
+@dataclass
+class PackedContext:
+    readme: str
+    evidence: str
+    hints: List[str]
+    examples: List[Dict[str, Any]]
+    report: PackReport
+
+
+class ContextPacker:
+    """Fills a token budget with the most relevant README, code, hint and search content."""
+
+    def __init__(self, provider: str = "google", model: str = "", budget_tokens: Optional[int] = None):
+        self.provider = provider
+        self.model = model
+        if budget_tokens is None:
+            env = os.getenv("PUBLISH_ASSIST_CONTEXT_TOKENS")
+            budget_tokens = int(env) if env else DEFAULT_CONTEXT_TOKENS
+        self.budget_tokens = budget_tokens
+
+    def tokens(self, text: str) -> int:
+        return estimate_tokens(text, self.provider, self.model)
+
+    def pack(self, readme: str, examples: Iterable[Dict[str, Any]] = (), hints: Iterable[str] = (),
+             repo_context: str = "", goal: str = "") -> PackedContext:
+        items = self._readme_items(readme)
+        query = _terms(goal)
+        for item in items[:1]:  # Title and preamble say what the project is about
+            query |= _terms(item.text)
+        items += self._evidence_items(repo_context)
+        items += [ContextItem("hint", f"hint {i + 1}", h, i) for i, h in enumerate(hints) if h]
+        for i, example in enumerate(e for e in examples if isinstance(e, dict)):
+            text = f"{example.get('title', '')}: {example.get('snippet', '')}"
+            items.append(ContextItem("search", example.get("title", f"result {i + 1}"), text, i, payload=example))
+
+        for item in items:
+            item.score = self._score(item, query)
+            item.tokens = self.tokens(item.text)
+            if item.kind == "search" and item.tokens > MAX_SNIPPET_TOKENS:
+                self._truncate(item, MAX_SNIPPET_TOKENS)
+        if items and items[0].kind == "readme":
+            items[0].score = OPENING_SCORE
+        selected, report = self._fill(items)
+
+        def joined(kind: str, sep: str) -> str:
+            return sep.join(i.text for i in sorted(selected, key=lambda i: i.order) if i.kind == kind)
+
+        examples_out = []
+        for item in sorted((i for i in selected if i.kind == "search"), key=lambda i: -i.score):
+            prefix = len(f"{item.payload.get('title', '')}: ")
+            examples_out.append({**item.payload, "snippet": item.text[prefix:]})
+        hints_out = [i.text for i in sorted(selected, key=lambda i: i.order) if i.kind == "hint"]
+        logger.info("ContextPacker: %s", report.summary())
+        return PackedContext(readme=joined("readme", "\n").strip(), evidence=joined("evidence", "\n"),
+                             hints=hints_out, examples=examples_out, report=report)
+
+    def _readme_items(self, readme: str) -> List[ContextItem]:
+        if not readme:
+            return []
+        index = parse_markdown(readme)
+        starts = [s.start for s in index.sections]
+        items = []
+        if not starts or starts[0] > 0:
+            preamble = readme[:starts[0] if starts else len(readme)]
+            if preamble.strip():
+                items.append(ContextItem("readme", "preamble", preamble.rstrip("\n"), 0))
+        for n, section in enumerate(index.sections):
+            end = starts[n + 1] if n + 1 < len(starts) else len(readme)
+            text = readme[section.start:end].rstrip("\n")
+            if text.strip():
+                items.append(ContextItem("readme", f"section: {section.title}", text, section.start + 1,
+                                         payload=section))
+        return items
+
+    @staticmethod
+    def _evidence_items(repo_context: str) -> List[ContextItem]:
+        """One item per top-level line of the outline together with its indented lines."""
+        blocks: List[List[str]] = []
+        for line in (repo_context or "").splitlines():
+            if not line.strip():
+                continue
+            if line.startswith(" ") and blocks:
+                blocks[-1].append(line)
+            else:
+                blocks.append([line])
+        return [ContextItem("evidence", block[0].split(":", 1)[0][:80], "\n".join(block), i)
+                for i, block in enumerate(blocks)]
+
+    @staticmethod
+    def _score(item: ContextItem, query: set) -> float:
+        score = KIND_PRIOR.get(item.kind, 0.5) + 0.5 * _relevance(_terms(item.text), query)
+        if item.kind == "readme":
+            title = item.label.split(": ", 1)[-1].lower()
+            if any(k in title for k in IMPORTANT_SECTIONS):
+                score += 0.6
+            elif any(k in title for k in MINOR_SECTIONS):
+                score -= 0.6
+            level = getattr(item.payload, "level", 2)
+            score -= 0.05 * max(0, level - 2)
+        elif item.kind == "evidence":
+            if item.text.startswith("Dependencies:"):
+                score += 0.5
+            elif "[entry point]" in item.text.split("\n", 1)[0]:
+                score += 0.3
+            score -= 0.01 * item.order
+        elif item.kind == "search":
+            score += 0.3 * _relevance(_terms(item.text), query)
+        return score
+
+    def _fill(self, items: List[ContextItem]) -> Tuple[List[ContextItem], PackReport]:
+        """Opening first, then each kind's reserved share, then everything else by score."""
+        report = PackReport(budget=self.budget_tokens, provider=self.provider, model=self.model)
+        ranked = sorted(items, key=lambda i: (-i.score, i.kind, i.order))
+        selected: List[ContextItem] = []
+        remaining = [self.budget_tokens]
+
+        def take(item: ContextItem, limit: int) -> bool:
+            if item.tokens > limit and limit >= MIN_PARTIAL_TOKENS:
+                self._truncate(item, limit)
+            if not item.text or item.tokens > limit:
+                return False
+            selected.append(item)
+            remaining[0] -= item.tokens
+            report.included.append({"kind": item.kind, "label": item.label,
+                                    "tokens": item.tokens, "truncated": item.truncated})
+            return True
+
+        for item in ranked:
+            if item.score >= OPENING_SCORE:
+                take(item, remaining[0])
+        for kind, share in RESERVED_SHARE.items():
+            quota = int(self.budget_tokens * share)
+            for item in ranked:
+                if item.kind == kind and item not in selected and take(item, min(quota, remaining[0])):
+                    quota -= item.tokens
+        for item in ranked:
+            if item not in selected and not take(item, remaining[0]):
+                report.dropped.append({"kind": item.kind, "label": item.label, "tokens": item.tokens})
+        report.used = self.budget_tokens - remaining[0]
+        return selected, report
+
+    def _truncate(self, item: ContextItem, limit: int) -> None:
+        """Cut at the last line (or word) boundary that fits in ``limit`` tokens."""
+        marker = " …"
+        lines = item.text.split("\n")
+        kept: List[str] = []
+        for line in lines:
+            candidate = "\n".join(kept + [line]) + marker
+            if self.tokens(candidate) > limit:
+                break
+            kept.append(line)
+        if not kept:  # a single long line: cut on words
+            words = lines[0].split(" ")
+            lo, hi = 0, len(words)
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if self.tokens(" ".join(words[:mid]) + marker) <= limit:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            kept = [" ".join(words[:lo])] if lo else []
+        if not kept:
+            return
+        if sum(1 for line in kept if line.lstrip().startswith(("```", "~~~"))) % 2:
+            kept.append("```")  # never leave a code fence open
+        item.text = "\n".join(kept).rstrip() + marker
+        item.tokens = self.tokens(item.text)
+        item.truncated = True
@@ -0,0 +1,84 @@
+# tools/file_types.py
+"""
+Cheap text-vs-binary classification for repository files.
+Decisions are made from the extension table first and, for unknown extensions,
+from a small prefix read; file contents are never decoded here.
+"""
+import os
+from typing import Optional
+
+SNIFF_BYTES = 8192
+
+TEXT = "text"
+
+# Known text formats: never sniffed, always readable
+TEXT_EXTENSIONS = {
+    "py", "pyi", "pyx", "ipynb", "md", "rst", "txt", "cfg", "ini", "toml", "yaml", "yml",
+    "json", "jsonl", "xml", "html", "htm", "css", "scss", "js", "jsx", "ts", "tsx", "mjs",
+    "c", "h", "cc", "cpp", "hpp", "cu", "cuh", "java", "kt", "scala", "go", "rs", "rb",
+    "php", "swift", "m", "r", "jl", "lua", "pl", "sh", "bash", "zsh", "ps1", "bat",
+    "sql", "proto", "graphql", "tex", "bib", "csv", "tsv", "env", "lock", "gitignore",
+    "dockerfile", "mk", "cmake", "gradle", "vue", "svelte", "dart", "hs", "ex", "exs",
+}
+
+# Known binary formats, mapped to the type recorded in the index
+BINARY_EXTENSIONS = {
+    # images / media
+    "png": "image", "jpg": "image", "jpeg": "image", "gif": "image", "bmp": "image",
+    "ico": "image", "webp": "image", "tif": "image", "tiff": "image", "psd": "image",
+    "mp3": "media", "wav": "media", "flac": "media", "ogg": "media", "mp4": "media",
+    "avi": "media", "mov": "media", "mkv": "media", "webm": "media",
+    # model weights / checkpoints
+    "pt": "model", "pth": "model", "ckpt": "model", "safetensors": "model", "onnx": "model",
+    "h5": "model", "hdf5": "model", "pb": "model", "tflite": "model", "gguf": "model",
+    "joblib": "model", "pkl": "model", "pickle": "model", "bin": "model",
+    # datasets
+    "parquet": "data", "feather": "data", "arrow": "data", "npy": "data", "npz": "data",
+    "avro": "data", "orc": "data", "tfrecord": "data", "db": "data", "sqlite": "data",
+    "sqlite3": "data", "mat": "data",
+    # archives
+    "zip": "archive", "gz": "archive", "tgz": "archive", "bz2": "archive", "xz": "archive",
+    "zst": "archive", "7z": "archive", "rar": "archive", "tar": "archive", "whl": "archive",
+    "jar": "archive",
+    # documents / fonts / compiled artifacts
+    "pdf": "document", "doc": "document", "docx": "document", "xls": "document",
+    "xlsx": "document", "ppt": "document", "pptx": "document",
+    "ttf": "font", "otf": "font", "woff": "font", "woff2": "font", "eot": "font",
+    "so": "compiled", "dll": "compiled", "dylib": "compiled", "exe": "compiled",
+    "o": "compiled", "a": "compiled", "pyc": "compiled", "pyo": "compiled", "class": "compiled",
+    "wasm": "compiled",
+}
+
+
+def extension_of(path: str) -> str:
+    name = os.path.basename(path).lower()
+    if "." not in name:
+        return name  # Dockerfile, Makefile, ...
+    return name.rsplit(".", 1)[-1]
+
+
+def classify_extension(path: str) -> Optional[str]:
+    """Return TEXT or a binary type from the extension table, or None if unknown."""
+    ext = extension_of(path)
+    if ext in TEXT_EXTENSIONS:
+        return TEXT
+    return BINARY_EXTENSIONS.get(ext)
+
+
+def sniff(prefix: bytes) -> str:
+    """Classify a file from its first SNIFF_BYTES bytes: TEXT or "binary"."""
+    if not prefix:
+        return TEXT
+    if b"\0" in prefix:
+        return "binary"
+    try:
+        prefix.decode("utf-8")
+        return TEXT
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the prefix boundary is still text
+        if e.start >= len(prefix) - 3 and e.reason == "unexpected end of data":
+            return TEXT
+    # Not UTF-8: call it binary if control bytes are common (legacy 8-bit text is not)
+    control = sum(1 for b in prefix if b < 32 and b not in (9, 10, 12, 13))
+    return "binary" if control / len(prefix) > 0.1 else TEXT
+
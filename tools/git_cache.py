@@ -0,0 +1,253 @@
+# tools/git_cache.py
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+import logging
+
+from utils.singleflight import SingleFlight
+
+try:
+    import fcntl
+except Exception:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "publication-assistant", "git-mirrors")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+DEFAULT_REFRESH_INTERVAL = 60.0  # seconds a fresh mirror is reused without fetching
+# Partial clone: blobs above this size are never transferred
+BLOB_FILTER = "blob:limit=100k"
+
+
+class GitMirrorCache:
+    """
+    On-disk cache of shallow, partial (``--filter=blob:limit=100k``) bare mirrors,
+    keyed by remote URL.
+      - open(url): context manager yielding an up-to-date mirror path. The first
+        use clones; later uses run an incremental ``git fetch`` (skipped if the
+        mirror was refreshed within ``refresh_interval`` seconds).
+      - acquire(url): same, but returns (path, release) for leases that outlive a
+        ``with`` block, e.g. a lazy RepoView reading blobs from the mirror.
+      - Concurrent requests for the same URL in this process share one clone/fetch;
+        per-mirror file locks serialize fetches across processes and keep a
+        mirror from being evicted or replaced while it is leased or being fetched.
+      - Total size is bounded by ``max_bytes``; least-recently-used mirrors are
+        evicted first.
+    """
+
+    _default: Optional["GitMirrorCache"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.refresh_interval = refresh_interval
+        self._flight = SingleFlight()
+        self._thread_locks: Dict[str, threading.RLock] = {}
+        self._thread_locks_guard = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    @classmethod
+    def default(cls) -> "GitMirrorCache":
+        """Process-wide cache configured from PUBLISH_ASSIST_GIT_CACHE[_MAX_MB]."""
+        with cls._default_lock:
+            if cls._default is None:
+                root = os.getenv("PUBLISH_ASSIST_GIT_CACHE") or DEFAULT_CACHE_DIR
+                max_mb = os.getenv("PUBLISH_ASSIST_GIT_CACHE_MAX_MB")
+                max_bytes = int(max_mb) * 1024 ** 2 if max_mb else DEFAULT_MAX_BYTES
+                cls._default = cls(root=root, max_bytes=max_bytes)
+            return cls._default
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        """Mirror key of a remote URL. Scheme and host are case-insensitive; the path is
+        not (file:// paths and many hosts other than GitHub are case-sensitive)."""
+        normalized = url.strip().rstrip("/")
+        if normalized.endswith(".git"):
+            normalized = normalized[:-4]
+        parts = urlsplit(normalized)
+        if parts.scheme and parts.netloc:
+            normalized = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path,
+                                     parts.query, parts.fragment))
+        elif ":" in normalized and "/" not in normalized.split(":", 1)[0]:  # scp-style user@host:path
+            host, path = normalized.split(":", 1)
+            normalized = f"{host.lower()}:{path}"
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:24]
+
+    def mirror_path(self, url: str) -> str:
+        return os.path.join(self.root, self.key_for(url) + ".git")
+
+    @contextmanager
+    def open(self, url: str) -> Iterator[str]:
+        path, release = self.acquire(url)
+        try:
+            yield path
+        finally:
+            release()
+
+    def acquire(self, url: str) -> Tuple[str, Callable[[], None]]:
+        key = self.key_for(url)
+        path = self.mirror_path(url)
+        for _ in range(2):
+            self._flight.do(key, lambda: self._sync(url, key))
+            lease = self._lock(key, shared=True)
+            lease.__enter__()
+            # A concurrent eviction may have won the race between sync and lock
+            if not os.path.isdir(path):
+                lease.__exit__(None, None, None)
+                continue
+            self._write_meta(key, last_used=time.time())
+            return path, lambda: lease.__exit__(None, None, None)
+        raise RuntimeError(f"Git mirror for {url} disappeared during use")
+
+    def _sync(self, url: str, key: str) -> None:
+        path = os.path.join(self.root, key + ".git")
+        # Fetches only add objects and move refs, so they do not wait for readers;
+        # the separate sync lock keeps two processes from fetching at once and keeps
+        # eviction away from a mirror being fetched into
+        with self._lock(key + ".sync", shared=False):
+            meta = self._read_meta(key)
+            if os.path.isdir(path):
+                if time.time() - meta.get("fetched_at", 0) < self.refresh_interval:
+                    return
+                try:
+                    logger.info("Fetching updates for cached mirror of %s", url)
+                    self._git(["fetch", "--quiet", "--prune", "--depth", "1",
+                               f"--filter={BLOB_FILTER}", "origin"], cwd=path)
+                except subprocess.CalledProcessError as e:
+                    logger.warning("Fetch failed for cached mirror %s, re-cloning: %s", url, e)
+                    if not self._replace(key, path, self._clone(url)):
+                        return  # Still leased: keep serving it, retry on the next sync
+            else:
+                os.replace(self._clone(url), path)
+            self._write_meta(key, url=url, fetched_at=time.time(), last_used=time.time(),
+                             size=_dir_size(path))
+        self._evict(keep=key)
+
+    def _clone(self, url: str) -> str:
+        """Clone into a temporary directory next to the mirrors, so a crash never leaves
+        a half mirror; the caller moves it into place."""
+        logger.info("Cloning mirror of %s into cache", url)
+        tmp = tempfile.mkdtemp(dir=self.root, prefix=".clone-")
+        try:
+            self._git(["clone", "--quiet", "--mirror", "--depth", "1",
+                       f"--filter={BLOB_FILTER}", url, tmp])
+            # Never repack underneath a reader that still has the old packs open
+            self._git(["config", "gc.auto", "0"], cwd=tmp)
+        except subprocess.CalledProcessError as e:
+            shutil.rmtree(tmp, ignore_errors=True)
+            logger.error(f"Git clone failed: {e}")
+            raise RuntimeError(f"Failed to clone repository: {url}")
+        return tmp
+
+    def _replace(self, key: str, path: str, fresh: str) -> bool:
+        """Swap the clone at ``fresh`` in for the mirror at ``path``. Only done under the
+        exclusive lease lock: a mirror someone is reading is never removed, and the
+        fresh clone is discarded instead (False)."""
+        with self._lock(key, shared=False, blocking=False) as acquired:
+            if not acquired:
+                logger.warning("Cached mirror %s is in use; keeping it until the next refresh", key)
+                shutil.rmtree(fresh, ignore_errors=True)
+                return False
+            old = os.path.join(self.root, f".old-{key}-{os.getpid()}-{threading.get_ident()}")
+            os.replace(path, old)
+            os.replace(fresh, path)
+        shutil.rmtree(old, ignore_errors=True)
+        return True
+
+    def _evict(self, keep: str) -> None:
+        mirrors = []
+        for name in os.listdir(self.root):
+            if name.endswith(".git"):
+                key = name[:-4]
+                meta = self._read_meta(key)
+                mirrors.append((meta.get("last_used", 0), meta.get("size", 0), key))
+        total = sum(size for _, size, _ in mirrors)
+        for _, size, key in sorted(mirrors):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            # Skip mirrors that are being fetched or are leased (shared lock held) by someone else
+            with self._lock(key + ".sync", shared=False, blocking=False) as idle, \
+                    self._lock(key, shared=False, blocking=False) as acquired:
+                if not (idle and acquired):
+                    continue
+                logger.info("Evicting cached git mirror %s (%d bytes)", key, size)
+                shutil.rmtree(os.path.join(self.root, key + ".git"), ignore_errors=True)
+                try:
+                    os.remove(os.path.join(self.root, key + ".json"))
+                except OSError:
+                    pass
+                total -= size
+
+    @contextmanager
+    def _lock(self, name: str, shared: bool, blocking: bool = True) -> Iterator[bool]:
+        """flock on <name>.lock; each call opens its own descriptor, so it also
+        excludes other threads. Without fcntl only exclusive locks are enforced,
+        through a per-name thread lock."""
+        if fcntl is None:
+            if shared:
+                yield True
+                return
+            with self._thread_locks_guard:
+                tlock = self._thread_locks.setdefault(name, threading.RLock())
+            acquired = tlock.acquire(blocking=blocking)
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    tlock.release()
+            return
+
+        with open(os.path.join(self.root, name + ".lock"), "a") as fh:
+            mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            try:
+                fcntl.flock(fh, mode if blocking else mode | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _read_meta(self, key: str) -> Dict:
+        try:
+            with open(os.path.join(self.root, key + ".json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _write_meta(self, key: str, **updates) -> None:
+        meta = self._read_meta(key)
+        meta.update(updates)
+        tmp = os.path.join(self.root, f".{key}.{os.getpid()}.{threading.get_ident()}.json")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.root, key + ".json"))
+
+    @staticmethod
+    def _git(args: List[str], cwd: Optional[str] = None) -> None:
+        subprocess.check_call(["git", *args], cwd=cwd)
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
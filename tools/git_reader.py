@@ -0,0 +1,89 @@
+# tools/git_reader.py
+import os
+import subprocess
+import threading
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Filtered-out blobs must stay missing; never let git fetch them behind our back
+_GIT_ENV = {**os.environ, "GIT_NO_LAZY_FETCH": "1"}
+
+
+class GitBlobReader:
+    """
+    Checkout-free access to a (bare or partial) repository at one commit.
+      - list_tree() -> [(path, blob sha, size or None)]; size is None for blobs
+        the partial clone filtered out (they are larger than the filter limit)
+      - read(sha) -> bytes, served by one long-lived ``git cat-file --batch``
+    Nothing is written to disk and only blobs that are explicitly read leave the pack.
+    """
+
+    def __init__(self, git_dir: str, rev: str = "HEAD"):
+        self.git_dir = git_dir
+        # Pin the commit so a concurrent fetch into a shared mirror cannot move us
+        self.commit = self._git(["rev-parse", rev + "^{commit}"]).decode().strip()
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def list_tree(self) -> List[Tuple[str, str, Optional[int]]]:
+        # Plain `ls-tree -r` reads only trees. `ls-tree -l` (and cat-file --batch-check)
+        # would need every blob header and trigger lazy fetches in a partial clone, so
+        # sizes come from the objects that are actually present instead.
+        sizes = self._present_blob_sizes()
+        listing = []
+        for record in self._git(["ls-tree", "-r", "-z", "--full-tree", self.commit]).split(b"\0"):
+            if not record:
+                continue
+            meta, path = record.split(b"\t", 1)
+            mode, otype, sha = meta.split()
+            # Skip submodules (commit entries) and symlinks
+            if otype != b"blob" or mode == b"120000":
+                continue
+            sha = sha.decode()
+            listing.append((path.decode("utf-8", errors="replace"), sha, sizes.get(sha)))
+        return listing
+
+    def read(self, sha: str) -> bytes:
+        with self._lock:
+            proc = self._batch_process()
+            proc.stdin.write(sha.encode() + b"\n")
+            proc.stdin.flush()
+            header = proc.stdout.readline().split()
+            if len(header) != 3:
+                raise KeyError(f"blob {sha} not available in {self.git_dir}")
+            data = proc.stdout.read(int(header[2]))
+            proc.stdout.read(1)  # trailing newline
+            return data
+
+    def close(self) -> None:
+        with self._lock:
+            if self._proc is not None:
+                try:
+                    self._proc.stdin.close()
+                    self._proc.wait(timeout=5)
+                except Exception:
+                    self._proc.kill()
+                self._proc = None
+
+    def _batch_process(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch"], cwd=self.git_dir, env=_GIT_ENV,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        return self._proc
+
+    def _present_blob_sizes(self) -> Dict[str, int]:
+        out = self._git(["cat-file", "--batch-all-objects", "--unordered",
+                         "--batch-check=%(objectname) %(objecttype) %(objectsize)"])
+        sizes = {}
+        for line in out.splitlines():
+            sha, otype, size = line.split()
+            if otype == b"blob":
+                sizes[sha.decode()] = int(size)
+        return sizes
+
+    def _git(self, args: List[str]) -> bytes:
+        return subprocess.check_output(["git", *args], cwd=self.git_dir, env=_GIT_ENV,
+                                       stderr=subprocess.DEVNULL)
@@ -0,0 +1,210 @@
+# tools/ignore_rules.py
+"""
+Compiled .gitignore matching for repository scans.
+
+Each ignore file is compiled once into a single regex per target type (files,
+directories), with its rules in reverse order so the first alternative that
+matches is gitignore's "last matching rule wins". Matchers are built per
+directory and chained, so a scan can decide on every entry of a directory
+(and prune ignored subdirectories) before descending.
+
+Precedence, highest first: the project override file (.publishignore) and
+policy patterns, then the nearest .gitignore up to the root one, then
+.git/info/exclude.
+"""
+import os
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Tuple
+
+OVERRIDE_FILE = ".publishignore"
+
+
+def _translate(pattern: str) -> str:
+    """Translate one gitignore glob (without leading/trailing slash handling) to a regex."""
+    out, i, n = [], 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/") \
+                    and (i + 2 == n or pattern[i + 2] == "/"):
+                if i + 2 == n:
+                    out.append(".*")  # trailing "/**": everything inside
+                    i += 2
+                else:
+                    out.append("(?:.*/)?")  # "**/": zero or more directories
+                    i += 3
+                continue
+            while i < n and pattern[i] == "*":
+                i += 1
+            out.append("[^/]*")
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1:i + 2] in ("!", "^") else i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\").replace("[", "\\[") + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def _parse_rule(line: str) -> Optional[Tuple[str, bool, bool]]:
+    """Return (regex, negate, dir_only) for one ignore-file line, or None."""
+    line = line.rstrip("\n").rstrip("\r")
+    if not line or line.startswith("#"):
+        return None
+    # Trailing spaces are ignored unless escaped
+    stripped = line.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        stripped += " "
+    line = stripped
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    anchored = "/" in line
+    regex = _translate(line.lstrip("/"))
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    return regex, negate, dir_only
+
+
+class RuleSet:
+    """The rules of one ignore file, relative to the directory it lives in."""
+
+    def __init__(self, base: str, lines: Iterable[str]):
+        self.base = base.strip("/")
+        rules = [r for r in (_parse_rule(line) for line in lines) if r is not None]
+        self._files = self._compile([r for r in rules if not r[2]])
+        self._dirs = self._compile(rules)
+        self.empty = not rules
+
+    @staticmethod
+    def _compile(rules: List[Tuple[str, bool, bool]]) -> Optional[Tuple[Pattern, List[bool]]]:
+        if not rules:
+            return None
+        ordered = list(reversed(rules))
+        regex = "|".join(f"(?P<r{i}>{rx})" for i, (rx, _, _) in enumerate(ordered))
+        return re.compile(regex), [neg for _, neg, _ in ordered]
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """True (ignored), False (re-included by a negation) or None (no rule matched)."""
+        compiled = self._dirs if is_dir else self._files
+        if compiled is None:
+            return None
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        pattern, negations = compiled
+        m = pattern.fullmatch(rel_path)
+        if m is None:
+            return None
+        return not negations[int(m.lastgroup[1:])]
+
+
+class IgnoreMatcher:
+    """Chain of rule sets in effect inside one directory (deepest checked first)."""
+
+    def __init__(self, rule_sets: Tuple[RuleSet, ...], overrides: Optional[RuleSet] = None):
+        self.rule_sets = rule_sets
+        self.overrides = overrides
+
+    def child(self, rule_set: Optional[RuleSet]) -> "IgnoreMatcher":
+        if rule_set is None or rule_set.empty:
+            return self
+        return IgnoreMatcher(self.rule_sets + (rule_set,), self.overrides)
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        rel_path = rel_path.replace(os.sep, "/")
+        if self.overrides is not None:
+            decision = self.overrides.match(rel_path, is_dir)
+            if decision is not None:
+                return decision
+        for rule_set in reversed(self.rule_sets):
+            decision = rule_set.match(rel_path, is_dir)
+            if decision is not None:
+                return decision
+        return False
+
+
+class IgnoreTree:
+    """
+    Per-directory IgnoreMatchers for one repository, built lazily and memoized.
+    ``read_ignore_file(rel_dir)`` returns the text of <rel_dir>/.gitignore or None;
+    it is called at most once per directory.
+    """
+
+    def __init__(self, read_ignore_file: Callable[[str], Optional[str]], exclude_text: str = "",
+                 override_text: str = "", extra_patterns: Iterable[str] = ()):
+        self._read = read_ignore_file
+        override_lines = override_text.splitlines() + list(extra_patterns)
+        overrides = RuleSet("", override_lines)
+        root = IgnoreMatcher((RuleSet("", exclude_text.splitlines()),),
+                             None if overrides.empty else overrides)
+        self._root = root
+        self._matchers: Dict[str, IgnoreMatcher] = {}
+        self._dir_ignored: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_directory(cls, root: str, extra_patterns: Iterable[str] = ()) -> "IgnoreTree":
+        def read(rel_dir: str) -> Optional[str]:
+            return _read_text(os.path.join(root, rel_dir, ".gitignore"))
+
+        return cls(read,
+                   exclude_text=_read_text(os.path.join(root, ".git", "info", "exclude")) or "",
+                   override_text=_read_text(os.path.join(root, OVERRIDE_FILE)) or "",
+                   extra_patterns=extra_patterns)
+
+    def matcher(self, rel_dir: str) -> IgnoreMatcher:
+        """Matcher for entries directly inside rel_dir ("" is the repository root)."""
+        rel_dir = rel_dir.replace(os.sep, "/").strip("/")
+        cached = self._matchers.get(rel_dir)
+        if cached is not None:
+            return cached
+        parent = self._root if not rel_dir else self.matcher(rel_dir.rpartition("/")[0])
+        text = self._read(rel_dir)
+        matcher = parent.child(RuleSet(rel_dir, text.splitlines()) if text else None)
+        with self._lock:
+            return self._matchers.setdefault(rel_dir, matcher)
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Decision for an entry whose parent directories were already admitted."""
+        rel_path = rel_path.replace(os.sep, "/")
+        return self.matcher(rel_path.rpartition("/")[0]).is_ignored(rel_path, is_dir)
+
+    def is_path_ignored(self, rel_path: str) -> bool:
+        """Decision for a file from a flat listing (zip, git): checks every ancestor too."""
+        parts = rel_path.replace(os.sep, "/").split("/")
+        for depth in range(1, len(parts)):
+            rel_dir = "/".join(parts[:depth])
+            ignored = self._dir_ignored.get(rel_dir)
+            if ignored is None:
+                ignored = self._dir_ignored[rel_dir] = self.is_ignored(rel_dir, is_dir=True)
+            if ignored:
+                return True
+        return self.is_ignored("/".join(parts), is_dir=False)
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read()
+    except OSError:
+        return None
@@ -0,0 +1,265 @@
+# tools/keyword_engine.py
+"""
+Corpus-backed BM25 keyphrase scoring for KeywordExtractor's heuristic path.
+
+Candidates are 1-3 word n-grams that never cross punctuation or stopwords. Each is
+weighted by where it occurs (README headings and prose, docstrings, file names),
+saturated BM25-style, and multiplied by its IDF from a table precomputed over the
+bundled corpus of 739 open-source package READMEs (assets/keyword_corpus.jsonl.gz;
+npm, crates.io, PyPI, RubyGems and tool READMEs, each with its source recorded).
+Boilerplate such as "install", "license" or "optional" is common in that corpus
+and therefore scores low; terms it never saw get the maximum IDF.
+
+The IDF table (assets/keyword_idf.bin, rebuilt from the corpus by
+scripts/build_keyword_idf.py) is
+memory-mapped once per process and read through memoryview casts, so lookups
+are C-level binary searches and no dictionary is rebuilt per call:
+  header  b"KWIDF1\\0\\0" | uint32 n_docs | uint32 n_terms | float32 avg_doc_len
+          | float32 default_idf
+  body    n_terms sorted uint32 crc32 term hashes, then n_terms float32 IDFs
+All values are little-endian.
+"""
+import bisect
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from tools.markdown_index import parse_markdown
+
+logger = logging.getLogger(__name__)
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+DEFAULT_IDF_PATH = os.path.join(ASSETS_DIR, "keyword_idf.bin")
+MAGIC = b"KWIDF1\0\0"
+HEADER = struct.Struct("<8sIIff")
+MAX_NGRAM = 3
+
+# BM25 parameters and per-field weights
+K1, B = 1.2, 0.75
+FIELD_WEIGHTS = {"heading": 2.0, "prose": 1.0, "docstring": 0.5, "filename": 1.5}
+NGRAM_BOOST = {1: 1.0, 2: 1.35, 3: 1.5}
+
+STOPWORDS = frozenset("""
+a about above after again against all also an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers him his how i if in into is it its itself just me more
+most my no nor not now of off on once only or other our ours out over own same she should so
+some such than that the their theirs them then there these they this those through to too
+under until up very was we were what when where which while who whom why will with would you
+your yours via using use used uses based new make makes made get gets one two three first
+e.g i.e etc see please may might must need needs want like well also many much within without
+""".split())
+
+_PHRASE_BREAK = re.compile(r"[.,;:!?()\[\]{}\"'`|<>=*#/\\\n\t]+|\s-\s")
+_TOKEN = re.compile(r"[a-z][a-z0-9]*(?:[-+][a-z0-9]+)*\+*")
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+# Inline code, URLs, HTML tags and file names are not prose
+_NOISE = re.compile(r"`[^`]*`|https?://\S+|www\.\S+|<[^>]*>|\b[\w-]+\.(?:py|sh|ipynb|md|txt|json|ya?ml|toml|cfg)\b")
+
+
+def term_hash(term: str) -> int:
+    return zlib.crc32(term.encode("utf-8"))
+
+
+def phrases(text: str) -> Iterable[List[str]]:
+    """Runs of non-stopword tokens; n-grams are only formed inside a run."""
+    for chunk in _PHRASE_BREAK.split(text.lower()):
+        run: List[str] = []
+        for token in _TOKEN.findall(chunk):
+            if token in STOPWORDS or len(token) < 2:
+                if run:
+                    yield run
+                run = []
+            else:
+                run.append(token)
+        if run:
+            yield run
+
+
+def ngrams(runs: Iterable[List[str]], max_n: int = MAX_NGRAM) -> Iterable[str]:
+    for run in runs:
+        for n in range(1, max_n + 1):
+            for i in range(len(run) - n + 1):
+                yield " ".join(run[i:i + n])
+
+
+def markdown_fields(text: str) -> Tuple[List[str], List[str]]:
+    """(headings, prose sentences) of a Markdown document, code blocks excluded."""
+    index = parse_markdown(text)
+    return ([_NOISE.sub(" ", s.title) for s in index.sections],
+            [_NOISE.sub(" ", sentence) for sentence in index.sentences])
+
+
+def filename_phrases(paths: Iterable[str]) -> Iterable[List[str]]:
+    """Path components split on separators and camelCase, without extensions."""
+    seen = set()
+    for path in paths:
+        for part in path.replace("\\", "/").split("/"):
+            stem = part.rsplit(".", 1)[0] if "." in part[1:] else part
+            if not stem or stem.startswith(".") or stem in seen:
+                continue
+            seen.add(stem)
+            words = re.split(r"[_\-\s.]+", _CAMEL.sub(" ", stem))
+            yield from phrases(" ".join(words))
+
+
+class IdfTable:
+    """Memory-mapped term-hash -> IDF table (see module docstring for the layout)."""
+
+    def __init__(self, n_docs: int, avg_doc_len: float, default_idf: float,
+                 hashes: Sequence[int], idfs: Sequence[float], keepalive=None):
+        self.n_docs = n_docs
+        self.avg_doc_len = avg_doc_len
+        self.default_idf = default_idf
+        self._hashes = hashes
+        self._idfs = idfs
+        self._keepalive = keepalive  # mmap backing the memoryviews
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_IDF_PATH) -> "IdfTable":
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n_docs, n_terms, avg_len, default_idf = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a keyword IDF table")
+        start = HEADER.size
+        view = memoryview(mapped)
+        hashes_raw = view[start:start + 4 * n_terms]
+        idfs_raw = view[start + 4 * n_terms:start + 8 * n_terms]
+        if sys.byteorder == "little":
+            hashes, idfs = hashes_raw.cast("I"), idfs_raw.cast("f")
+        else:  # Rare big-endian hosts: copy and swap once
+            hashes, idfs = array("I", hashes_raw), array("f", idfs_raw)
+            hashes.byteswap()
+            idfs.byteswap()
+        return cls(n_docs, avg_len, default_idf, hashes, idfs, keepalive=mapped)
+
+    @staticmethod
+    def write(path: str, n_docs: int, avg_doc_len: float, default_idf: float,
+              table: Dict[int, float]) -> None:
+        keys = sorted(table)
+        hashes, idfs = array("I", keys), array("f", (table[k] for k in keys))
+        if sys.byteorder != "little":
+            hashes.byteswap()
+            idfs.byteswap()
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, n_docs, len(keys), avg_doc_len, default_idf))
+            f.write(hashes.tobytes())
+            f.write(idfs.tobytes())
+        os.replace(tmp, path)
+
+    def idf(self, term: str) -> Optional[float]:
+        """IDF of a term seen in the corpus, or None for unseen terms."""
+        h = term_hash(term)
+        i = bisect.bisect_left(self._hashes, h)
+        if i < len(self._hashes) and self._hashes[i] == h:
+            return self._idfs[i]
+        return None
+
+
+_default_table: Optional[IdfTable] = None
+_default_lock = threading.Lock()
+
+
+def default_table() -> Optional[IdfTable]:
+    """Process-wide bundled table, or None if the asset is missing or unreadable."""
+    global _default_table
+    with _default_lock:
+        if _default_table is None:
+            try:
+                _default_table = IdfTable.load()
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning("Keyword IDF table unavailable (%s); using uniform weights", e)
+                return None
+        return _default_table
+
+
+class KeywordEngine:
+    """Scores README, docstring and file-name n-grams against the corpus IDF table."""
+
+    def __init__(self, table: Optional[IdfTable] = None):
+        self.table = table or default_table()
+
+    def extract(self, readme: str, docstrings: Iterable[str] = (), file_names: Iterable[str] = (),
+                top_k: int = 10) -> List[str]:
+        headings, sentences = markdown_fields(readme)
+        fields = {
+            "heading": Counter(ngrams(phrases(". ".join(headings)))),
+            "prose": Counter(ngrams(phrases(" ".join(sentences)))),
+            "docstring": Counter(ngrams(phrases(". ".join(docstrings)))),
+            "filename": Counter(ngrams(filename_phrases(file_names), max_n=2)),
+        }
+        tf: Counter = Counter()
+        for name, counts in fields.items():
+            weight = FIELD_WEIGHTS[name]
+            for term, count in counts.items():
+                tf[term] += weight * count
+        if not tf:
+            return []
+        # Structural evidence (a heading or a file name) vouches for one-off phrases
+        anchored = fields["heading"].keys() | fields["filename"].keys()
+        doc_len = sum(c for t, c in fields["prose"].items() if " " not in t) or 1
+        table = self.table
+        avg_len = table.avg_doc_len if table else doc_len
+        norm = K1 * (1 - B + B * doc_len / avg_len)
+
+        scored = []
+        for term, freq in tf.items():
+            n = term.count(" ") + 1
+            idf = table.idf(term) if table else None
+            if idf is None:
+                # Unseen in the corpus: distinctive if repeated or anchored, noise otherwise
+                if freq < 2 and term not in anchored:
+                    continue
+                idf = table.default_idf if table else 1.0
+            elif n > 1 and freq < 2 and term not in anchored:
+                continue
+            scored.append((idf * freq * (K1 + 1) / (freq + norm) * NGRAM_BOOST[n], term))
+        scored.sort(key=lambda st: (-st[0], st[1]))
+        return self._select(scored, top_k)
+
+    @staticmethod
+    def _select(scored: List[Tuple[float, str]], top_k: int) -> List[str]:
+        """Greedy pick that skips phrases overlapping an already chosen one."""
+        chosen: List[str] = []
+        covered: List[set] = []
+        for _, term in scored:
+            words = set(term.split())
+            if any(words <= c or c <= words for c in covered):
+                continue
+            chosen.append(term)
+            covered.append(words)
+            if len(chosen) >= top_k:
+                break
+        return chosen
+
+
+def compute_idf(documents: Iterable[str], min_df: int = 2) -> Tuple[int, float, float, Dict[int, float]]:
+    """(n_docs, avg_doc_len, default_idf, {term hash: idf}) over Markdown documents.
+    Terms seen in fewer than min_df documents are left to default_idf."""
+    df: Counter = Counter()
+    n_docs, total_len = 0, 0
+    for text in documents:
+        headings, sentences = markdown_fields(text)
+        runs = list(phrases(". ".join(headings) + ". " + " ".join(sentences)))
+        total_len += sum(len(run) for run in runs)
+        df.update(set(ngrams(runs)))
+        n_docs += 1
+    if not n_docs:
+        raise ValueError("empty corpus")
+
+    def bm25_idf(freq: int) -> float:
+        return math.log(1 + (n_docs - freq + 0.5) / (freq + 0.5))
+
+    table = {term_hash(t): bm25_idf(f) for t, f in df.items() if f >= min_df}
+    return n_docs, total_len / n_docs, bm25_idf(0), table
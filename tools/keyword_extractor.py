@@ -1,12 +1,11 @@
 # tools/keyword_extractor.py
 import logging
-import os
-import re
-from typing import List
-try:
-    from google import genai
-except Exception:
-    genai = None
+from typing import Iterable, List
+
+from tools.context_packer import estimate_tokens
+from tools.keyword_engine import KeywordEngine
+from utils import llm_clients, resilience
+from utils.llm_cache import LLMCache
 
 logger = logging.getLogger(__name__)
 
@@ -14,19 +13,14 @@ logger = logging.getLogger(__name__)
 class KeywordExtractor:
     def __init__(self, top_k: int = 10):
         self.top_k = top_k
-        self.model = None
-        
-        # Check for API key and library presence
-        if genai is not None and os.getenv("GOOGLE_API_KEY"):
-            try:
-                self.model = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
-            except Exception as e:
-                logger.warning(f"Failed to initialize Gemini model: {e}")
-                self.model = None
+        self.engine = KeywordEngine()
+        # Shared long-lived client; None without google-genai or GOOGLE_API_KEY
+        self.model = llm_clients.get_client("google")
 
-    def extract(self, text: str) -> List[str]:
+    def extract(self, text: str, docstrings: Iterable[str] = (), file_names: Iterable[str] = ()) -> List[str]:
         """
         Extracts high-quality keywords using Gemini LLM or fallback heuristics.
+        Docstrings and file names only inform the heuristic path.
         """
         if not text:
             return []
@@ -40,32 +34,30 @@ class KeywordExtractor:
             Text:
             {text[:3000]}
             """
-            try:
-                response = self.model.models.generate_content(
+            def call():
+                # Rate limit, retries and circuit breaker; an open circuit fails fast to the heuristic
+                return resilience.call("google", lambda: self.model.models.generate_content(
                     model="gemini-flash-latest",
                     contents=prompt
-                )
-                keywords = [k.strip() for k in response.text.split(",") if k.strip()]
+                ).text, tokens=estimate_tokens(prompt))
+
+            try:
+                reply = LLMCache.default().get_or_call("google", "gemini-flash-latest", prompt, call)
+                keywords = [k.strip() for k in (reply or "").split(",") if k.strip()]
                 logger.debug("KeywordExtractor (LLM): extracted keywords: %s", keywords)
-                return keywords[:self.top_k]
+                if keywords:
+                    return keywords[:self.top_k]
+                logger.warning("Keyword extraction (LLM) returned no keywords")
             except Exception as e:
                 logger.error("Keyword extraction (LLM) error: %s", e)
         
         # Fallback Heuristic
-        return self._heuristic_extract(text)
+        return self._heuristic_extract(text, docstrings, file_names)
 
-    def _heuristic_extract(self, text: str) -> List[str]:
+    def _heuristic_extract(self, text: str, docstrings: Iterable[str] = (),
+                           file_names: Iterable[str] = ()) -> List[str]:
         """
-        Simple frequency-based keyword extraction fallback.
+        Corpus-weighted BM25 keyphrase fallback (see tools/keyword_engine.py).
         """
         logger.info("KeywordExtractor: using heuristic fallback")
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        stopwords = {"the", "and", "for", "with", "this", "that", "from", "your", "have", "are", "can", "use"}
-        
-        freq = {}
-        for w in words:
-            if w not in stopwords:
-                freq[w] = freq.get(w, 0) + 1
-        
-        sorted_words = sorted(freq.items(), key=lambda x: x[1], reverse=True)
-        return [w[0] for w in sorted_words[:self.top_k]]
+        return self.engine.extract(text, docstrings=docstrings, file_names=file_names, top_k=self.top_k)
@@ -0,0 +1,276 @@
+# tools/markdown_index.py
+"""
+One-time structural parse of a Markdown document (usually a README).
+
+parse_markdown(text) returns a MarkdownIndex with:
+  - sections: every ATX/setext heading in document order, with character offsets
+    of the heading and of the section body, arranged as a tree (``tree``)
+  - code_blocks: fenced code spans (never searched for headings, links or claims)
+  - links / badges: inline, reference and HTML image links outside code
+  - paragraphs / sentences: prose outside headings, code, HTML blocks, thematic breaks
+    and badge/image-only lines, link markup reduced to text
+Results are memoized per text, so agents that receive the same README share one parse.
+"""
+import re
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_ATX = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_SETEXT = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+_THEMATIC = re.compile(r"^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+_HTML_BLOCK = re.compile(r"^ {0,3}<(?:[A-Za-z][A-Za-z0-9-]*|/[A-Za-z]|!--)")
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})[ \t]*([^`\s]*)")
+_LINK = re.compile(r"(!?)\[((?:[^\[\]]|\[[^\]]*\])*)\]\(\s*<?([^)\s>]+)>?(?:\s+[\"'][^\"']*[\"'])?\s*\)")
+_REF_DEF = re.compile(r"^ {0,3}\[([^\]]+)\]:\s*<?(\S+?)>?(?:\s+[\"'(].*)?$", re.MULTILINE)
+_HTML_IMG = re.compile(r"<img\b[^>]*?\bsrc=[\"']([^\"']+)[\"'][^>]*>", re.IGNORECASE)
+_HTML_LINK = re.compile(r"<a\b[^>]*?\bhref=[\"']([^\"']+)[\"'][^>]*>(.*?)</a>", re.IGNORECASE | re.DOTALL)
+_BADGE_HOSTS = ("shields.io", "badgen.net", "badge.fury.io", "travis-ci", "codecov.io",
+                "circleci.com", "readthedocs.org", "colab.research.google.com/assets", "zenodo.org/badge")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Common README section names and the heading words that count as that section.
+# Aliases match whole words; a trailing "*" marks a stem that also matches longer words.
+SECTION_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "installation": ("install", "installing", "setup", "set up", "getting started"),
+    "usage": ("quick start", "quickstart", "how to use", "running"),
+    "license": ("licens*", "licenc*"),
+    "contributing": ("contribut*",),
+    "credits": ("credit", "acknowledg*", "authors", "citation", "cite", "citing"),
+    "examples": ("example", "demo", "demos", "tutorial", "tutorials"),
+}
+
+
+@dataclass
+class Section:
+    title: str
+    level: int
+    start: int       # offset of the heading line
+    body_start: int  # offset just after the heading
+    end: int         # offset where the next heading of the same or higher level starts
+    children: List["Section"] = field(default_factory=list)
+
+    @property
+    def words(self) -> List[str]:
+        return _WORD.findall(self.title.lower())
+
+
+@dataclass
+class CodeBlock:
+    start: int
+    end: int
+    language: str = ""
+
+
+@dataclass
+class Link:
+    text: str
+    url: str
+    start: int
+    is_image: bool = False
+
+    @property
+    def is_badge(self) -> bool:
+        return self.is_image and (any(h in self.url for h in _BADGE_HOSTS) or "badge" in self.url.lower())
+
+
+class MarkdownIndex:
+    """Heading tree, code spans and link inventory of one Markdown text."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.sections: List[Section] = []
+        self.code_blocks: List[CodeBlock] = []
+        self.links: List[Link] = []
+        # (start, end) spans of non-heading, non-code lines, grouped into paragraphs
+        self._paragraphs: List[Tuple[int, int]] = []
+        self._parse()
+
+    @property
+    def tree(self) -> List[Section]:
+        """Top-level sections; nested sections are in ``children``."""
+        roots, stack = [], []
+        for section in self.sections:
+            section.children = []
+            while stack and stack[-1].level >= section.level:
+                stack.pop()
+            (stack[-1].children if stack else roots).append(section)
+            stack.append(section)
+        return roots
+
+    @property
+    def title(self) -> Optional[str]:
+        return self.sections[0].title if self.sections else None
+
+    @property
+    def badges(self) -> List[Link]:
+        return [link for link in self.links if link.is_badge]
+
+    def section_text(self, section: Section) -> str:
+        return self.text[section.body_start:section.end]
+
+    def find_section(self, name: str) -> Optional[Section]:
+        """First heading containing a section name or one of its aliases as whole words."""
+        key = name.lower().strip()
+        aliases = [(tuple(_WORD.findall(a)), a.endswith("*")) for a in SECTION_ALIASES.get(key, ()) + (key,)]
+        for section in self.sections:
+            words = section.words
+            for alias, stem in aliases:
+                n = len(alias)
+                for i in range(len(words) - n + 1):
+                    if (words[i:i + n - 1] == list(alias[:-1])
+                            and (words[i + n - 1].startswith(alias[-1]) if stem else words[i + n - 1] == alias[-1])):
+                        return section
+        return None
+
+    def has_section(self, name: str) -> bool:
+        return self.find_section(name) is not None
+
+    def missing_sections(self, names: Iterable[str]) -> List[str]:
+        return [name for name in names if not self.has_section(name)]
+
+    def in_code(self, offset: int) -> bool:
+        return any(block.start <= offset < block.end for block in self.code_blocks)
+
+    @cached_property
+    def paragraphs(self) -> List[str]:
+        """Prose paragraphs (see the module docstring), whitespace collapsed and links
+        reduced to their text."""
+        out = []
+        for start, end in self._paragraphs:
+            paragraph = self.text[start:end]
+            for _ in range(2):  # twice, for images nested in links
+                paragraph = _LINK.sub(lambda m: "" if m.group(1) else m.group(2), paragraph)
+            paragraph = " ".join(paragraph.split())
+            if paragraph:
+                out.append(paragraph)
+        return out
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        """Sentences of ``paragraphs``."""
+        return [s.strip() for paragraph in self.paragraphs for s in _SENTENCE_END.split(paragraph) if s.strip()]
+
+    def preamble_end(self, labels: Iterable[str] = ()) -> int:
+        """
+        Offset of the first body line after the leading title block: headings up to
+        level 3, HTML and badge/image-only lines, ``#hashtag`` lines and any of the
+        given plain-text labels (case-insensitive).
+        """
+        labels = {label.lower() for label in labels}
+        offset = 0
+        headings = {s.start: s for s in self.sections}
+        for line in self.text.splitlines(keepends=True):
+            stripped = line.strip()
+            section = headings.get(offset)
+            if section is not None and section.level > 3:
+                break
+            skippable = (
+                not stripped or section is not None or stripped.startswith("<")
+                or stripped.lower() in labels or _SETEXT.match(line) is not None
+                or re.fullmatch(r"(?:#\w+\s*)+", stripped) is not None
+                or _image_only(stripped)
+            )
+            if not skippable:
+                break
+            offset += len(line)
+        return offset
+
+    def _parse(self) -> None:
+        text = self.text
+        fence: Optional[Tuple[str, int, int, str]] = None  # (char, length, start, language)
+        paragraph: Optional[List[int]] = None
+        prev: Optional[Tuple[int, int]] = None  # previous paragraph line (start, end), for setext
+        html = False  # inside an HTML block, which runs to the next blank line
+        offset = 0
+        for line in text.splitlines(keepends=True):
+            start, end = offset, offset + len(line)
+            offset = end
+            content = line.rstrip("\r\n")
+            if fence is not None:
+                m = _FENCE.match(content)
+                if m and m.group(1)[0] == fence[0] and len(m.group(1)) >= fence[1] and not m.group(2):
+                    self.code_blocks.append(CodeBlock(fence[2], end, fence[3]))
+                    fence = None
+                continue
+            m = _FENCE.match(content)
+            if m:
+                paragraph = self._close_paragraph(paragraph)
+                fence, prev = (m.group(1)[0], len(m.group(1)), start, m.group(2)), None
+                continue
+            m = _ATX.match(content)
+            if m:
+                paragraph = self._close_paragraph(paragraph)
+                self._add_heading((m.group(2) or "").strip(), len(m.group(1)), start, end)
+                prev = None
+                continue
+            m = _SETEXT.match(content)
+            if m and prev is not None and paragraph is not None and paragraph[0] == prev[0]:
+                # A one-line paragraph underlined with === or --- is a heading
+                self._add_heading(text[prev[0]:prev[1]].strip(), 1 if m.group(1)[0] == "=" else 2,
+                                  prev[0], end)
+                paragraph, prev = None, None
+                continue
+            if not content.strip():
+                paragraph, prev, html = self._close_paragraph(paragraph), None, False
+                continue
+            if html or (paragraph is None and _HTML_BLOCK.match(content)):
+                html = True
+                continue
+            if _THEMATIC.match(content) or _image_only(content.strip()):
+                paragraph, prev = self._close_paragraph(paragraph), None
+                continue
+            if paragraph is None:
+                paragraph = [start, end]
+            else:
+                paragraph[1] = end
+            prev = (start, end)
+        if fence is not None:
+            # Unterminated fence runs to the end of the document
+            self.code_blocks.append(CodeBlock(fence[2], len(text), fence[3]))
+        self._close_paragraph(paragraph)
+        open_sections: List[Section] = []
+        for section in self.sections:
+            while open_sections and open_sections[-1].level >= section.level:
+                open_sections.pop().end = section.start
+            open_sections.append(section)
+        for section in open_sections:
+            section.end = len(text)
+        self._collect_links()
+
+    def _add_heading(self, title: str, level: int, start: int, end: int) -> None:
+        self.sections.append(Section(title=title, level=level, start=start, body_start=end, end=end))
+
+    def _close_paragraph(self, paragraph: Optional[List[int]]) -> None:
+        """Record a finished paragraph span; returns None so callers can reset their state."""
+        if paragraph is not None:
+            self._paragraphs.append((paragraph[0], paragraph[1]))
+        return None
+
+    def _collect_links(self) -> None:
+        found = []
+        for m in _LINK.finditer(self.text):
+            found.append(Link(m.group(2), m.group(3), m.start(), is_image=bool(m.group(1))))
+            # Badges are images wrapped in links: [![alt](img)](target)
+            for inner in _LINK.finditer(m.group(2)):
+                found.append(Link(inner.group(2), inner.group(3), m.start(2) + inner.start(),
+                                  is_image=bool(inner.group(1))))
+        for m in _REF_DEF.finditer(self.text):
+            found.append(Link(m.group(1), m.group(2), m.start()))
+        for m in _HTML_IMG.finditer(self.text):
+            found.append(Link("", m.group(1), m.start(), is_image=True))
+        for m in _HTML_LINK.finditer(self.text):
+            found.append(Link(re.sub(r"<[^>]+>", "", m.group(2)).strip(), m.group(1), m.start()))
+        self.links = sorted((link for link in found if not self.in_code(link.start)),
+                            key=lambda link: link.start)
+
+
+def _image_only(line: str) -> bool:
+    """A line of nothing but images or badges (possibly wrapped in links)."""
+    return line.startswith(("!", "[!")) and _LINK.sub("", line).strip() == ""
+
+
+@lru_cache(maxsize=64)
+def parse_markdown(text: str) -> MarkdownIndex:
+    return MarkdownIndex(text or "")
@@ -0,0 +1,256 @@
+# tools/notebook_reader.py
+"""
+Streaming extraction of Jupyter notebook cells.
+
+Only the ``cell_type`` and ``source`` of markdown and code cells are kept. Outputs,
+attachments and metadata (base64 images, widget state, ...) are skipped without being
+decoded or built into Python objects: a small scanner reads the raw bytes in chunks
+and jumps over unwanted values with C-level searches (bytes.find, regex), dropping
+each chunk once it is consumed. Memory stays around CHUNK_SIZE plus the longest kept
+source string, whatever the notebook size.
+Cells are rendered in the "percent" script format (``# %%`` / ``# %% [markdown]``),
+so downstream consumers see compact, Python-like text instead of raw JSON.
+"""
+import json
+import re
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+KEPT_CELL_TYPES = ("markdown", "code")
+CODE_MARKER = "# %%"
+MARKDOWN_MARKER = "# %% [markdown]"
+CHUNK_SIZE = 1 << 16
+
+_WS = re.compile(rb"[ \t\r\n]*")
+_STRUCTURAL = re.compile(rb'["\[\]{}]')
+_SCALAR_END = re.compile(rb"[,}\] \t\r\n]")
+
+
+@dataclass
+class NotebookCell:
+    cell_type: str  # "markdown" or "code"
+    source: str
+
+
+def is_notebook(path: str) -> bool:
+    return path.lower().endswith(".ipynb")
+
+
+def read_cells(source: Union[bytes, BinaryIO]) -> List[NotebookCell]:
+    """Markdown and code cells of a notebook, in order, from its bytes or from a binary
+    file object (read in chunks). Malformed notebooks yield []."""
+    try:
+        if isinstance(source, (bytes, bytearray)):
+            scanner = _NotebookScanner(bytes(source))
+        else:
+            scanner = _NotebookScanner(stream=source)
+        cells = list(scanner.cells())
+    except Exception as e:
+        logger.warning("Failed to parse notebook: %s", e)
+        return []
+    return [c for c in cells if c.cell_type in KEPT_CELL_TYPES]
+
+
+def to_percent_script(cells: List[NotebookCell]) -> str:
+    """Render cells as a percent-format script; markdown becomes comment lines."""
+    parts = []
+    for cell in cells:
+        source = cell.source.rstrip("\n")
+        if cell.cell_type == "markdown":
+            lines = ("# " + line if line else "#" for line in source.splitlines())
+            parts.append(MARKDOWN_MARKER + "\n" + "\n".join(lines))
+        else:
+            parts.append(CODE_MARKER + "\n" + source)
+    return "\n\n".join(parts) + "\n" if parts else ""
+
+
+def from_percent_script(text: str) -> List[NotebookCell]:
+    """Inverse of to_percent_script, for consumers that only hold the rendered text."""
+    cells: List[NotebookCell] = []
+    cell_type: Optional[str] = None
+    lines: List[str] = []
+
+    def flush() -> None:
+        if cell_type is not None:
+            cells.append(NotebookCell(cell_type, "\n".join(lines).strip("\n")))
+
+    for line in text.splitlines():
+        if line == MARKDOWN_MARKER or line == CODE_MARKER:
+            flush()
+            cell_type, lines = ("markdown" if line == MARKDOWN_MARKER else "code"), []
+        elif cell_type == "markdown":
+            lines.append(line[2:] if line.startswith("# ") else line.lstrip("#"))
+        else:
+            lines.append(line)
+    flush()
+    return cells
+
+
+class _NotebookScanner:
+    """
+    Minimal pull scanner over notebook JSON that decodes only what it keeps.
+    ``buf`` holds the unconsumed input; more is read from ``stream`` as needed, and
+    bytes before the current position are dropped on each refill. A kept string stays
+    buffered until its closing quote; a skipped one is dropped as it is searched.
+    """
+
+    def __init__(self, data: bytes = b"", stream: Optional[BinaryIO] = None):
+        self.buf = data
+        self.pos = 0
+        self.stream = stream
+
+    def cells(self) -> Iterator[NotebookCell]:
+        for key in self._object_keys():
+            if key != "cells":
+                self._skip_value()
+                continue
+            for _ in self._array_items():
+                cell_type, source = "", ""
+                for cell_key in self._object_keys():
+                    if cell_key == "cell_type":
+                        cell_type = self._string()
+                    elif cell_key == "source":
+                        source = self._source()
+                    else:
+                        self._skip_value()  # outputs, attachments, metadata, ...
+                yield NotebookCell(cell_type, source)
+
+    def _source(self) -> str:
+        if self._peek() == b"[":
+            parts = []
+            for _ in self._array_items():
+                parts.append(self._string())
+            return "".join(parts)
+        return self._string()
+
+    def _more(self, drop: int) -> bool:
+        """Discard buf[:drop] and append the next chunk; False at the end of input."""
+        chunk = self.stream.read(CHUNK_SIZE) if self.stream is not None else b""
+        if not chunk:
+            return False
+        self.buf = self.buf[drop:] + chunk
+        self.pos -= drop
+        return True
+
+    def _peek(self) -> bytes:
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._more(self.pos):
+                return self.buf[self.pos:self.pos + 1]
+
+    def _expect(self, token: bytes) -> None:
+        if self._peek() != token:
+            raise ValueError(f"expected {token!r} at offset {self.pos}")
+        self.pos += 1
+
+    def _object_keys(self) -> Iterator[str]:
+        self._expect(b"{")
+        if self._peek() == b"}":
+            self.pos += 1
+            return
+        while True:
+            key = self._string()
+            self._expect(b":")
+            yield key  # the caller consumes or skips the value
+            if self._peek() == b",":
+                self.pos += 1
+                continue
+            self._expect(b"}")
+            return
+
+    def _array_items(self) -> Iterator[None]:
+        self._expect(b"[")
+        if self._peek() == b"]":
+            self.pos += 1
+            return
+        while True:
+            yield None  # the caller consumes the item
+            if self._peek() == b",":
+                self.pos += 1
+                continue
+            self._expect(b"]")
+            return
+
+    def _string_span(self, keep: bool = True) -> Tuple[int, int]:
+        """Consume a string; its (start, end) in buf, quotes included. Unless ``keep``,
+        the part already searched is dropped on refills (and start is meaningless)."""
+        self._expect(b'"')
+        start = self.pos - 1
+        body = search = self.pos
+        while True:
+            end = _string_end(self.buf, search, body)
+            if end != -1:
+                self.pos = end
+                return start, end
+            tail = len(self.buf)
+            if keep:
+                drop = start
+            else:
+                # Keep a trailing run of backslashes and the byte before it, so an
+                # escaped quote at the start of the next chunk is still recognized
+                run = tail
+                while run > body and self.buf[run - 1] == 0x5C:
+                    run -= 1
+                drop = max(body, run - 1)
+            if not self._more(drop):
+                raise ValueError("unterminated string")
+            start, body, search = start - drop, max(body - drop, 0), tail - drop
+
+    def _string(self) -> str:
+        if self._peek() != b'"':
+            self._skip_value()  # null or another non-string value
+            return ""
+        start, end = self._string_span()
+        raw = self.buf[start + 1:end - 1]
+        return json.loads(self.buf[start:end]) if b"\\" in raw else raw.decode("utf-8", errors="replace")
+
+    def _skip_value(self) -> None:
+        token = self._peek()
+        if token == b'"':
+            self._string_span(keep=False)
+        elif token in (b"{", b"["):
+            depth = 0
+            while True:
+                m = _STRUCTURAL.search(self.buf, self.pos)
+                if m is None:
+                    self.pos = len(self.buf)
+                    if not self._more(self.pos):
+                        raise ValueError("unterminated container")
+                    continue
+                char = m.group()
+                if char == b'"':
+                    self.pos = m.start()
+                    self._string_span(keep=False)
+                    continue
+                depth += 1 if char in (b"{", b"[") else -1
+                self.pos = m.end()
+                if depth == 0:
+                    return
+        else:
+            while True:
+                m = _SCALAR_END.search(self.buf, self.pos)
+                if m is not None:
+                    self.pos = m.start()
+                    return
+                if not self._more(self.pos):
+                    self.pos = len(self.buf)
+                    return
+
+
+def _string_end(data: bytes, pos: int, body: int) -> int:
+    """Offset just past the first unescaped quote at or after pos, or -1 if there is
+    none yet. Escaping backslashes are counted back to body, the string's first byte."""
+    while True:
+        quote = data.find(b'"', pos)
+        if quote == -1:
+            return -1
+        backslashes, i = 0, quote - 1
+        while i >= body and data[i] == 0x5C:
+            backslashes += 1
+            i -= 1
+        if backslashes % 2 == 0:
+            return quote + 1
+        pos = quote + 1
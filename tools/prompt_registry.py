@@ -0,0 +1,435 @@
+# tools/prompt_registry.py
+"""
+Prompt templates split into a static prefix and a small per-request suffix.
+
+Providers cache prompt prefixes (Gemini context caches and implicit caching, Groq
+prompt caching), but only if the leading text is byte-identical across requests.
+Every template therefore keeps its instructions in ``prefix``, which never contains
+request data, and formats the request's values into ``suffix``, which comes last:
+  - get_template(name) / render(name, **values) -> RenderedPrompt
+  - RenderedPrompt is the full prompt text (a str, so caches, routers and token
+    estimates treat it like any prompt) that also carries ``prefix``, ``suffix``
+    and ``template``, so provider calls can send the prefix as a cacheable system
+    instruction
+  - register(template) adds or replaces a template
+"""
+import hashlib
+import textwrap
+from dataclasses import dataclass
+from typing import Dict
+
+DEFAULT_GOAL = "Improve the repository for public sharing, discoverability, and technical clarity."
+
+
+class RenderedPrompt(str):
+    """Prompt text (prefix, blank line, suffix) that remembers its parts."""
+
+    prefix: str
+    suffix: str
+    template: str
+
+    def __new__(cls, prefix: str, suffix: str, template: str = ""):
+        text = f"{prefix}\n\n{suffix}" if prefix else suffix
+        prompt = super().__new__(cls, text)
+        prompt.prefix, prompt.suffix, prompt.template = prefix, suffix, template
+        return prompt
+
+    @property
+    def prefix_hash(self) -> str:
+        return hashlib.sha256(self.prefix.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    prefix: str  # static instructions, identical for every request
+    suffix: str  # str.format template for the request's values
+
+    def render(self, **values) -> RenderedPrompt:
+        return RenderedPrompt(self.prefix, self.suffix.format(**values).strip(), self.name)
+
+
+_TEMPLATES: Dict[str, PromptTemplate] = {}
+
+
+def register(template: PromptTemplate) -> PromptTemplate:
+    _TEMPLATES[template.name] = template
+    return template
+
+
+def get_template(name: str) -> PromptTemplate:
+    try:
+        return _TEMPLATES[name]
+    except KeyError:
+        raise KeyError(f"Unknown prompt template: {name}") from None
+
+
+def render(name: str, **values) -> RenderedPrompt:
+    return get_template(name).render(**values)
+
+
+def _text(block: str) -> str:
+    return textwrap.dedent(block).strip()
+
+
+# --- README generation (tools.web_search.WebSearchTool.summarize_and_improve) ---
+
+_README_INSTRUCTIONS = """
+OBJECTIVE
+
+Analyze the repository and generate an improved README that accurately represents the project.
+
+Do NOT use generic templates.
+
+Instead, infer the repository's purpose, architecture, workflow, users, technologies, and strengths from the provided repository information.
+
+Every recommendation must be grounded in available repository evidence. If information cannot be confirmed, clearly indicate uncertainty rather than inventing details.
+
+CONTENT REQUIREMENTS
+
+Your generated README should include appropriate sections based on the repository.
+
+Possible sections include (only include when relevant):
+- Project Title
+- Short Project Summary
+- Overview
+- Why This Project Matters
+- Problem Statement
+- Key Features
+- Repository Highlights
+- Architecture
+- System Workflow
+- Project Structure
+- Installation
+- Requirements
+- Quick Start
+- Usage Examples
+- Configuration
+- Technologies Used
+- Model(s)
+- Dataset Information
+- API Reference
+- Evaluation
+- Results
+- Benchmarks
+- Performance
+- Screenshots Placeholders
+- Examples
+- Testing
+- Deployment
+- Contributing
+- Roadmap
+- FAQ
+- License
+- Citation
+- Acknowledgements
+
+Choose sections dynamically.
+
+Never include irrelevant sections.
+
+ESSENTIAL README ELEMENTS
+
+Whenever relevant, include the following repository-specific details:
+- a clear project name and one-line value proposition
+- the problem the project solves
+- the core solution or approach
+- how the system works or is used
+- prerequisites and installation steps
+- quick-start examples
+- architecture or workflow explanation
+- key technical components and dependencies
+- evaluation, benchmarks, or results when available
+- limitations, assumptions, or known issues
+- contribution and support guidance
+- license, citation, or acknowledgements when appropriate
+
+For AI/ML repositories, also include relevant details about models, datasets, training strategy, evaluation metrics, and reproducibility when supported by the repository evidence.
+
+REPOSITORY ANALYSIS
+
+Before writing, analyze:
+- repository purpose
+- target users
+- major features
+- technologies
+- architecture
+- workflow
+- installation process
+- strengths
+- weaknesses
+- missing documentation
+- missing developer information
+- discoverability
+- readability
+
+Use these findings throughout the README.
+
+DOCUMENTATION IMPROVEMENTS
+
+Improve:
+- clarity
+- organization
+- readability
+- navigation
+- consistency
+- completeness
+- developer experience
+
+Rewrite weak sections.
+
+Expand incomplete sections.
+
+Keep strong existing content.
+
+DISCOVERABILITY
+
+Improve discoverability by naturally optimizing:
+- repository title
+- summary
+- headings
+- keywords
+- terminology
+- GitHub search relevance
+
+Do NOT create a keyword list.
+
+Instead integrate keywords naturally.
+
+TECHNICAL ACCURACY
+
+Never invent:
+- features
+- benchmarks
+- datasets
+- APIs
+- models
+- integrations
+- metrics
+- architecture
+
+If something appears incomplete or uncertain:
+- explicitly state that additional repository information would be needed.
+
+VISUAL PRESENTATION
+
+Produce a visually engaging README.
+
+Use:
+- emojis for headings
+- markdown tables
+- checklists
+- blockquotes
+- collapsible sections where useful
+- code blocks
+- callouts
+- horizontal rules
+
+When appropriate, generate Mermaid diagrams for:
+- architecture
+- workflow
+- pipeline
+- component interaction
+
+Only generate diagrams when enough information exists.
+
+EXAMPLES
+
+If enough information exists, generate:
+- installation example
+- usage example
+- CLI example
+- API example
+- expected output example
+
+Otherwise omit them.
+
+AUDIENCE ADAPTATION
+
+Infer the primary audience.
+
+Examples include:
+- AI researchers
+- ML engineers
+- developers
+- students
+- contributors
+- end users
+
+Adjust tone and explanations accordingly.
+
+README QUALITY
+
+Ensure the README is:
+- technically accurate
+- easy to scan
+- beginner friendly
+- professional
+- publication ready
+- visually engaging
+- repository specific
+
+OUTPUT RULES
+
+Output ONLY the improved README in Markdown.
+
+Do NOT explain your reasoning.
+
+Do NOT mention these instructions.
+
+Do NOT use placeholder text unless repository information is genuinely unavailable.
+
+Do NOT produce a generic README template.
+
+Generate documentation that feels uniquely written for this repository and fully aligned with the user's stated goal.
+ADDITIONAL REQUIREMENTS
+
+- Rewrite the README specifically for this repository, not as a generic template.
+- Extract the actual project purpose, main workflow, and standout capabilities from the supplied README and repository context.
+- Highlight project-specific details such as the problem solved, target users, core features, architecture, and expected outcomes.
+- Recommend a better project title or summary only if it improves clarity for the repository.
+- Suggest relevant tags or categories,
+- Identify missing sections or unclear parts of the README and add them in a polished way.
+- Propose visual or structural enhancements such as diagrams, tables, callouts, code blocks, and step-by-step examples.
+- Make the README more discoverable, clear, complete, and publication-ready.
+- Tailor the content to the most likely audience: developers, researchers, contributors, or end users.
+- If the repository is an AI/ML or agentic project, emphasize architecture, tooling, workflows, and practical value clearly.
+- Avoid inventing features; if something is uncertain, describe it cautiously and accurately.
+
+STRICT CONSTRAINTS
+
+1. Use relevant emojis for EVERY header and for key feature points.
+2. Use bullet points, checklists, and callouts extensively. Avoid long paragraphs (no "passages").
+3. Include clear, attractive sections like:
+    - 🌍 Introduction
+    - 🎯 **Value Proposition** (Address the user's specific goal if provided)
+    - 🚀 **Quick Start**
+    - 🛠️ **Tech Stack** (Use a bulleted list with emojis)
+    - 📝 **Architecture & Structure** (Deep dive into the project's logic)
+    - 🌟 **Key Features**
+    - 👥 **Who Should Use This**
+    - ✅ **Success Criteria**
+4. Make the tone professional but high-energy and visually engaging.
+5. Use Markdown tables where appropriate for technical specs or comparisons.
+6. Use interactive elements where possible (e.g., checklists, collapsible sections, callouts, or code blocks for demos).
+7. DO NOT output a passage or essay. Output must be a visually engaging, sectioned, and interactive-ready article.
+8. If the user specified a goal, make sure that goal is prominently addressed in the text.
+9. Output ONLY the improved README markdown, using Markdown and HTML for visual effects.
+"""
+
+README_IMPROVE = register(PromptTemplate(
+    name="readme_improve",
+    prefix=_text("""
+        You are an expert AI Developer Advocate, Technical Writer, and Open Source Documentation Specialist.
+
+        Your task is to transform the provided GitHub repository into a publication-ready, highly engaging, technically accurate README.
+
+        The request at the end gives the writing style, the user's goal, the target length when one is set,
+        the most relevant README sections, the code structure, best-practice suggestions and relevant examples.
+        """) + "\n\n" + _README_INSTRUCTIONS.strip(),
+    suffix="""
+Writing Style:
+{style}
+
+User Goal:
+{goal}
+{length}
+Repository README (most relevant sections):
+{readme}
+
+Code structure (modules, classes, public functions, entry points, CLI flags, dependencies):
+{evidence}
+
+Best-practice suggestions:
+{hints}
+
+Relevant examples and external references:
+{examples}
+
+Write the improved README now, following the instructions above.
+""",
+))
+
+
+# --- Section-parallel generation (tools.sectioned_writer) ---
+
+README_OUTLINE = register(PromptTemplate(
+    name="readme_outline",
+    prefix=_text("""
+        Plan a publication-ready README for the repository described in the request.
+
+        Return ONLY JSON: {"title": "<project title>", "sections": [{"title": "<emoji> <heading>",
+        "focus": "<what this section covers, one sentence>", "words": <target words>}]}
+        with the requested number of sections, in reading order, fitting this repository.
+        Only plan sections the repository evidence can support; do not include a table of contents.
+        """),
+    suffix="""
+Writing style: {style}
+User goal: {goal}
+Total length: {length}
+Number of sections: {low}-{high}
+
+README:
+{readme}
+
+Code structure:
+{evidence}
+""",
+))
+
+README_SECTION = register(PromptTemplate(
+    name="readme_section",
+    prefix=_text("""
+        You are an expert technical writer producing ONE section of a README. The other sections
+        are written separately; do not repeat their content or write an introduction.
+
+        Start with the section's heading as "## <heading>" and use ### for subheadings. Use emojis,
+        bullet points, tables, code blocks and callouts where they help; avoid long paragraphs.
+        Never invent features, benchmarks, datasets, APIs or results; say when information is
+        not available. Output ONLY the section's Markdown.
+        """),
+    suffix="""
+README title: "{title}"
+
+Document plan:
+{plan}
+
+Write ONLY section {number}: "{heading}"
+Focus: {focus}
+Target length: about {words} words
+Writing style: {style}
+User goal: {goal}
+
+Repository README (relevant parts):
+{readme}
+
+Code structure:
+{evidence}
+
+Best-practice suggestions:
+{hints}
+
+Relevant examples:
+{examples}
+""",
+))
+
+README_CONSISTENCY = register(PromptTemplate(
+    name="readme_consistency",
+    prefix=_text("""
+        A README was written section by section. Given its title and each section's heading and
+        opening, return ONLY JSON: {"intro": "<2-3 sentence introduction with a one-line value
+        proposition, in the requested style and addressing the goal if one is given>",
+        "terms": {"<variant spelling used in some sections>": "<canonical spelling>"}}
+        List in "terms" only names of the project, tools or concepts that the sections spell
+        inconsistently (at most 10); use an empty object if they are consistent.
+        """),
+    suffix="""
+README title: "{title}"
+Style: {style}
+Goal: {goal}
+
+Section headings and openings:
+{digest}
+""",
+))
@@ -3,20 +3,38 @@ import logging
 import os
 import re
 import shutil
-import uuid
-from typing import List
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from hashlib import sha256
+from typing import Any, Dict, Iterable, List, Optional
 
 try:
     import chromadb
 except Exception:
     chromadb = None
-try:
-    from google import genai
-except Exception:
-    genai = None
+from utils import llm_clients, resilience
 
 logger = logging.getLogger(__name__)
 
+EMBED_BATCH_SIZE = 100    # documents per embed_content call (the Gemini API maximum)
+EMBED_WORKERS = 4         # batches in flight (the provider's concurrency limit also applies)
+LOOKUP_BATCH_SIZE = 1000  # ids per collection lookup
+
+
+def doc_id(text: str) -> str:
+    """Deterministic id of a document: hash of its whitespace-normalized text."""
+    return sha256(" ".join(text.split()).encode("utf-8")).hexdigest()[:32]
+
+
+def embedding_vectors(response: Any) -> List[List[float]]:
+    """Vectors of an embed_content response (google-genai ``embeddings[].values``,
+    or a single legacy ``embedding``)."""
+    embeddings = getattr(response, "embeddings", None)
+    if embeddings is not None:
+        return [list(getattr(e, "values", e)) for e in embeddings]
+    single = getattr(response, "embedding", None)
+    return [list(single)] if single is not None else []
+
 
 class RAGRetriever:
     def __init__(self, db_path: str = "./chroma_db"):
@@ -47,8 +65,8 @@ class RAGRetriever:
                 "project_suggestions")
             self.is_available = True
 
-            if self.collection.count() == 0:
-                self.seed_knowledge_base()
+            # Idempotent: stores only what a previous (possibly interrupted) seed missed
+            self.seed_knowledge_base()
         except BaseException as e:
             logger.warning(
                 "Failed to initialize ChromaDB-backed RAG system: %s", e)
@@ -78,30 +96,82 @@ class RAGRetriever:
             "List all dependencies clearly in requirements.txt or pyproject.toml."
         ]
 
-    def seed_knowledge_base(self):
+    def seed_knowledge_base(self, documents: Optional[Iterable[str]] = None,
+                            batch_size: Optional[int] = None) -> int:
+        """
+        Store ``documents`` (default: the built-in suggestions) in the collection; returns
+        how many were newly stored.
+          - ids are content hashes (doc_id), so reseeding never duplicates a document
+          - documents whose id is already stored are skipped, so a seed interrupted by
+            an error resumes where it stopped
+          - missing documents are embedded ``batch_size`` at a time (one embed_content
+            call per batch, a few batches in flight) and each batch is upserted as soon
+            as its embeddings arrive
+        """
         if self.collection is None:
-            return
+            return 0
 
-        if genai is None or not os.getenv("GOOGLE_API_KEY"):
+        client = llm_clients.get_client("google")
+        if client is None:
             logger.warning("RAG seed skipped: missing genai or API key.")
-            return
+            return 0
+
+        if batch_size is None:
+            env = os.getenv("PUBLISH_ASSIST_RAG_BATCH_SIZE")
+            batch_size = int(env) if env else EMBED_BATCH_SIZE
+        batch_size = max(1, min(batch_size, EMBED_BATCH_SIZE))
+        started = time.monotonic()
+        unique: Dict[str, str] = {}
+        for doc in (self._fallback_documents if documents is None else documents):
+            if doc and doc.strip():
+                unique.setdefault(doc_id(doc), doc)
 
         try:
-            client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
-            for doc in self._fallback_documents:
-                embedding = client.models.embed_content(
-                    model=self.embed_model,
-                    contents=doc
-                ).embedding
-                self.collection.add(
-                    ids=[str(uuid.uuid4())],
-                    embeddings=[embedding],
-                    documents=[doc]
-                )
-            logger.info("Seeded RAG knowledge base with %d items.",
-                        len(self._fallback_documents))
+            missing = self._missing_ids(list(unique))
         except Exception as e:
             logger.error("Error seeding RAG: %s", e)
+            return 0
+        if not missing:
+            logger.info("RAG knowledge base already holds all %d documents.", len(unique))
+            return 0
+
+        batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+        stored = failed = 0
+        with ThreadPoolExecutor(max_workers=min(EMBED_WORKERS, len(batches)),
+                                thread_name_prefix="rag-embed") as pool:
+            futures = {pool.submit(self._embed_batch, client, [unique[i] for i in ids]): ids for ids in batches}
+            for future in as_completed(futures):
+                ids = futures[future]
+                try:
+                    embeddings = future.result()
+                    # Upsert from this thread only; each finished batch is durable on its own
+                    self.collection.upsert(ids=ids, embeddings=embeddings, documents=[unique[i] for i in ids],
+                                           metadatas=[{"source": "seed"} for _ in ids])
+                    stored += len(ids)
+                except Exception as e:
+                    failed += len(ids)
+                    logger.error("Error seeding RAG batch of %d documents: %s", len(ids), e)
+        logger.info("Seeded RAG knowledge base with %d items in %.2fs (%d already stored, %d failed).",
+                    stored, time.monotonic() - started, len(unique) - len(missing), failed)
+        return stored
+
+    def _missing_ids(self, ids: List[str]) -> List[str]:
+        """The subset of ``ids`` not yet in the collection, in input order."""
+        present = set()
+        for i in range(0, len(ids), LOOKUP_BATCH_SIZE):
+            found = self.collection.get(ids=ids[i:i + LOOKUP_BATCH_SIZE], include=[])
+            present.update(found.get("ids") or [])
+        return [i for i in ids if i not in present]
+
+    def _embed_batch(self, client, docs: List[str]) -> List[List[float]]:
+        response = resilience.call("google", lambda: client.models.embed_content(
+            model=self.embed_model,
+            contents=docs
+        ))
+        vectors = embedding_vectors(response)
+        if len(vectors) != len(docs):
+            raise ValueError(f"expected {len(docs)} embeddings, got {len(vectors)}")
+        return vectors
 
     def retrieve(self, text: str, top_k: int = 3) -> List[str]:
         """Retrieve relevant suggestions using ChromaDB when available, otherwise a local fallback."""
@@ -109,17 +179,18 @@ class RAGRetriever:
             return []
 
         if self.collection is not None and self.is_available:
-            if genai is None or not os.getenv("GOOGLE_API_KEY"):
+            client = llm_clients.get_client("google")
+            if client is None:
                 logger.warning(
                     "RAG retrieve skipped: missing genai or API key.")
                 return self._fallback_retrieve(text, top_k)
 
             try:
-                client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
-                query_embedding = client.models.embed_content(
+                # Same quota and breaker as generation; an open circuit falls back locally
+                query_embedding = embedding_vectors(resilience.call("google", lambda: client.models.embed_content(
                     model=self.embed_model,
                     contents=text[:1000]
-                ).embedding
+                )))[0]
 
                 results = self.collection.query(
                     query_embeddings=[query_embedding],
@@ -0,0 +1,114 @@
+# tools/repo_manifest.py
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Manifests live next to projects.json, one file per project
+DEFAULT_MANIFEST_DIR = "manifests"
+
+
+@dataclass
+class ChangeSet:
+    """Difference between the current scan and the previous manifest of a project."""
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    first_scan: bool = False
+
+    @property
+    def changed(self) -> List[str]:
+        return self.added + self.modified
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+
+class RepoManifest:
+    """
+    Per-project record of path -> {size, mtime, digest, analysis} from the last scan.
+    A file whose size and mtime still match keeps its recorded digest without
+    being read; everything else is re-hashed and compared by content.
+    ``analysis`` holds the analyzer's per-file results (line counts, notebook cells,
+    symbols), which stay valid for as long as the digest does.
+    """
+
+    def __init__(self, path: str, files: Optional[Dict[str, Dict]] = None):
+        self.path = path
+        self.files: Dict[str, Dict] = files or {}
+
+    @classmethod
+    def for_project(cls, project_id: str, manifest_dir: str = DEFAULT_MANIFEST_DIR) -> "RepoManifest":
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]+", "-", project_id).strip("-") or "project"
+        return cls.load(os.path.join(manifest_dir, safe_id + ".json"))
+
+    @classmethod
+    def load(cls, path: str) -> "RepoManifest":
+        if not os.path.exists(path):
+            return cls(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(path, json.load(f).get("files", {}))
+        except Exception as e:
+            logger.warning("Ignoring unreadable manifest %s: %s", path, e)
+            return cls(path)
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files}, f)
+        os.replace(tmp, self.path)
+
+    def known_digest(self, path: str, size: int, mtime: Optional[float]) -> Optional[str]:
+        """The recorded digest if the file's size and mtime are unchanged."""
+        record = self.files.get(path)
+        if record and mtime is not None and record.get("size") == size and record.get("mtime") == mtime:
+            return record.get("digest")
+        return None
+
+    def analysis(self, path: str, digest: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Per-file results recorded for this exact content, if any."""
+        record = self.files.get(path)
+        if digest is None or not record or record.get("digest") != digest:
+            return None
+        return record.get("analysis")
+
+    def diff(self, entries: List) -> ChangeSet:
+        """Compare FileEntry records (with digests filled in where available)."""
+        changes = ChangeSet(first_scan=not self.files)
+        seen = set()
+        for entry in entries:
+            seen.add(entry.path)
+            record = self.files.get(entry.path)
+            if record is None:
+                changes.added.append(entry.path)
+            elif entry.digest is not None and record.get("digest") is not None:
+                same = entry.digest == record["digest"]
+                (changes.unchanged if same else changes.modified).append(entry.path)
+            elif record.get("size") == entry.size and record.get("mtime") == entry.mtime:
+                # Binary metadata without a digest: fall back to size and mtime
+                changes.unchanged.append(entry.path)
+            else:
+                changes.modified.append(entry.path)
+        changes.removed = sorted(p for p in self.files if p not in seen)
+        return changes
+
+    def update(self, entries: List, analysis: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        """Record the scanned entries; ``analysis`` replaces per-file results, and files
+        without new results keep their old ones while their digest is unchanged."""
+        analysis = analysis or {}
+        files = {}
+        for e in entries:
+            record = {"size": e.size, "mtime": e.mtime, "digest": e.digest}
+            results = analysis.get(e.path) or self.analysis(e.path, e.digest)
+            if results is not None:
+                record["analysis"] = results
+            files[e.path] = record
+        self.files = files
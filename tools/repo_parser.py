@@ -1,87 +1,730 @@
 # tools/repo_parser.py
+import hashlib
+import heapq
+import io
 import os
+import tarfile
+import threading
+import time
+import weakref
 import zipfile
 import shutil
 import subprocess
 import tempfile
-from typing import Dict, Any
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Any, Callable, Iterator, List, Optional, Tuple
 import logging
+from tools.file_types import TEXT, SNIFF_BYTES
+from tools.git_cache import BLOB_FILTER, GitMirrorCache
+from tools.git_reader import GitBlobReader
+from tools.ignore_rules import OVERRIDE_FILE, IgnoreTree
+from tools.notebook_reader import NotebookCell, is_notebook, read_cells, to_percent_script
+from tools.repo_manifest import DEFAULT_MANIFEST_DIR, ChangeSet, RepoManifest
+from tools.scan_policy import ScanPolicy, file_priority
+
+try:
+    import zstandard
+except Exception:
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_WORKERS = 8  # I/O-bound threads; 1 selects the sequential os.walk path
+READ_BATCH_SIZE = 64  # files per pool task in RepoView.iter_contents
+READ_CHUNK_SIZE = 1 << 16  # bytes per read when draining a streamed file
+GIT_URL_PREFIXES = ("http", "git@", "ssh://", "git://", "file://")
+# Streaming tarfile modes by archive suffix; zstd goes through the optional zstandard package
+TAR_MODES = {".tar": "r|", ".tar.gz": "r|gz", ".tgz": "r|gz", ".tar.bz2": "r|bz2",
+             ".tar.xz": "r|xz", ".tar.zst": "zst", ".tar.zstd": "zst"}
+
+
+def git_blob_digest(data: bytes) -> str:
+    """Hash content the way git hashes blobs, so every source type agrees."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+@dataclass
+class FileEntry:
+    """Index record for one repository file. Content is loaded on demand."""
+    path: str
+    size: int
+    digest: Optional[str] = None
+    # "text", or the binary type from tools.file_types ("image", "model", "data", ...)
+    kind: str = TEXT
+    mtime: Optional[float] = None
+    # Why a text file is indexed but not read (e.g. "budget"); None if it is readable
+    skipped: Optional[str] = None
+
+    @property
+    def is_text(self) -> bool:
+        return self.kind == TEXT
+
+    @property
+    def is_readable(self) -> bool:
+        return self.kind == TEXT and self.skipped is None
+
+
+class _DigestingReader:
+    """Pass-through reader that hashes what it reads. On close, the rest of the file is
+    read and the git blob digest is recorded on the entry, if its size is as indexed."""
+
+    def __init__(self, raw: BinaryIO, entry: FileEntry):
+        self._raw = raw
+        self._entry = entry
+        self._sha = hashlib.sha1(b"blob %d\0" % entry.size)
+        self._read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size)
+        self._sha.update(data)
+        self._read += len(data)
+        return data
+
+    def close(self) -> None:
+        try:
+            while self.read(READ_CHUNK_SIZE):
+                pass
+            if self._read == self._entry.size and self._entry.digest is None:
+                self._entry.digest = self._sha.hexdigest()
+        finally:
+            self._raw.close()
+
+    def __enter__(self) -> "_DigestingReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _read_prefix(full: str) -> bytes:
+    with open(full, "rb") as f:
+        return f.read(SNIFF_BYTES)
+
+
+def _read_member_prefix(z: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    with z.open(info) as f:
+        return f.read(SNIFF_BYTES)
+
+
+def _tar_mode(path: str) -> Optional[str]:
+    lower = path.lower()
+    for suffix, mode in TAR_MODES.items():
+        if lower.endswith(suffix):
+            return mode
+    return None
+
+
+class RepoView(Mapping):
+    """
+    Lazy, read-only view over a parsed repository.
+    It behaves like the legacy ``files`` dict (path -> content), but a file is only
+    read when it is accessed, so the index can travel through the pipeline cheaply.
+    Only text files are exposed through the mapping; binaries and text files left
+    out by the scan budget are kept in ``entries`` as metadata and are never read.
+      - entries: ordered index of FileEntry (path, size, digest, kind, skipped)
+      - binary_entries / skipped_entries: the metadata-only part of the index
+      - read_bytes / read_text: load one file on demand; the text of a notebook is
+        its markdown and code cells in percent-script form, never the raw JSON
+      - open(path): binary file object over one file, for consumers that read in
+        chunks; the file's digest is recorded once it has been read to the end
+      - notebook_cells(path): cell-level access to one notebook; each notebook is
+        scanned from open() once per view and its cells (sources only) are kept
+      - iter_contents(paths=None): generator over (path, content) pairs, read through
+        a bounded thread pool when workers > 1 but always yielded in index order
+      - readme: content of the top-most README, loaded once
+    When scanned with a project_id, the view also carries the project's manifest:
+      - cached_analysis(path) / store_analysis(path, results): per-file analysis
+        results kept in the manifest, valid while the file's content is unchanged,
+        so an unchanged file never needs to be read
+      - changes: ChangeSet against the previous manifest (None without a project_id).
+        Digests come from the bytes the consumer already read; on first access, any
+        touched file not read yet is hashed, then the manifest is updated and saved
+    """
+
+    def __init__(self, entries: List[FileEntry], loader: Callable[[FileEntry], bytes],
+                 cleanup: Optional[Callable[[], None]] = None, workers: int = 1,
+                 opener: Optional[Callable[[FileEntry], BinaryIO]] = None):
+        self.entries: Dict[str, FileEntry] = {e.path: e for e in entries}
+        self._text_paths = [e.path for e in entries if e.is_readable]
+        self._loader = loader
+        # Sources whose content is already in memory (tar, git blobs) have no opener
+        self._opener = opener
+        self.workers = max(1, workers)
+        self._finalizer = weakref.finalize(self, cleanup) if cleanup else None
+        self._readme: Optional[str] = None
+        self._cells: Dict[str, List[NotebookCell]] = {}
+        self.readme_path = self._find_readme()
+        self.manifest: Optional[RepoManifest] = None
+        self._changes: Optional[ChangeSet] = None
+        self._analysis: Dict[str, Dict[str, Any]] = {}
+
+    def __getitem__(self, path: str) -> str:
+        entry = self.entries.get(path)
+        if entry is None or not entry.is_readable:
+            raise KeyError(path)
+        return self.read_text(path)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._text_paths)
+
+    def __len__(self) -> int:
+        return len(self._text_paths)
+
+    @property
+    def binary_entries(self) -> List[FileEntry]:
+        return [e for e in self.entries.values() if not e.is_text]
+
+    @property
+    def skipped_entries(self) -> List[FileEntry]:
+        return [e for e in self.entries.values() if e.skipped is not None]
+
+    def read_bytes(self, path: str) -> bytes:
+        entry = self.entries[path]
+        data = self._loader(entry)
+        if entry.digest is None:
+            entry.digest = git_blob_digest(data)
+        return data
+
+    def read_text(self, path: str) -> str:
+        if is_notebook(path):
+            return to_percent_script(self.notebook_cells(path))
+        return self.read_bytes(path).decode("utf-8", errors="ignore")
+
+    def open(self, path: str) -> BinaryIO:
+        entry = self.entries[path]
+        if self._opener is None:
+            return io.BytesIO(self.read_bytes(path))
+        stream = self._opener(entry)
+        return stream if entry.digest is not None else _DigestingReader(stream, entry)
+
+    def notebook_cells(self, path: str) -> List[NotebookCell]:
+        cells = self._cells.get(path)
+        if cells is None:
+            with self.open(path) as stream:
+                cells = self._cells[path] = read_cells(stream)
+        return cells
+
+    @property
+    def notebook_paths(self) -> List[str]:
+        return [p for p in self._text_paths if is_notebook(p)]
+
+    def digest(self, path: str) -> str:
+        entry = self.entries[path]
+        if entry.digest is None:
+            self.read_bytes(path)
+        return entry.digest
+
+    def compute_digests(self, paths: List[str]) -> None:
+        """Fill in missing digests, reading the given files through the thread pool."""
+        def fill(path: str) -> None:
+            try:
+                self.digest(path)
+            except Exception as e:
+                logger.warning("Failed to hash file %s: %s", path, e)
+
+        if self.workers == 1 or len(paths) < 2:
+            for path in paths:
+                fill(path)
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(fill, paths))
+
+    def iter_contents(self, paths: Optional[List[str]] = None) -> Iterator[Tuple[str, str]]:
+        """Yield (path, content) one file at a time (all text files, or ``paths`` in the
+        given order); nothing is retained."""
+        paths = self._text_paths if paths is None else paths
+        if self.workers == 1:
+            for path in paths:
+                try:
+                    yield path, self.read_text(path)
+                except Exception as e:
+                    logger.warning("Failed to read file %s: %s", path, e)
+            return
+
+        def read_batch(batch: List[str]) -> List[Tuple[str, Optional[str], Optional[Exception]]]:
+            out = []
+            for path in batch:
+                try:
+                    out.append((path, self.read_text(path), None))
+                except Exception as e:
+                    out.append((path, None, e))
+            return out
+
+        # Files are read in small batches to amortize pool overhead, with at most
+        # 2 * workers batches in flight so memory stays bounded
+        batches = (paths[i:i + READ_BATCH_SIZE] for i in range(0, len(paths), READ_BATCH_SIZE))
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append(pool.submit(read_batch, batch))
+                if len(pending) >= self.workers * 2:
+                    break
+            while pending:
+                future = pending.popleft()
+                batch = next(batches, None)
+                if batch is not None:
+                    pending.append(pool.submit(read_batch, batch))
+                for path, content, error in future.result():
+                    if error is not None:
+                        logger.warning("Failed to read file %s: %s", path, error)
+                    else:
+                        yield path, content
+
+    @property
+    def readme(self) -> str:
+        if self._readme is None:
+            self._readme = self.read_text(self.readme_path) if self.readme_path else ""
+        return self._readme
+
+    def cached_analysis(self, path: str) -> Optional[Dict[str, Any]]:
+        """Per-file results stored by an earlier scan of the same content, or None."""
+        if self.manifest is None:
+            return None
+        return self.manifest.analysis(path, self.entries[path].digest)
+
+    def store_analysis(self, path: str, results: Dict[str, Any]) -> None:
+        """Keep per-file results for the next scan (saved when ``changes`` is computed)."""
+        if self.manifest is not None:
+            self._analysis[path] = results
+
+    @property
+    def changes(self) -> Optional[ChangeSet]:
+        if self._changes is None and self.manifest is not None:
+            self._changes = self._finish_manifest()
+        return self._changes
+
+    def _finish_manifest(self) -> ChangeSet:
+        entries = list(self.entries.values())
+        # Files read by the consumer already have digests; only touched, unread files are read here
+        self.compute_digests([e.path for e in entries if e.digest is None and e.is_readable])
+        changes = self.manifest.diff(entries)
+        self.manifest.update(entries, self._analysis)
+        try:
+            self.manifest.save()
+        except OSError as e:
+            logger.warning("Manifest update failed for %s: %s", self.manifest.path, e)
+        logger.info("Manifest %s: %d added, %d modified, %d removed, %d unchanged",
+                    self.manifest.path, len(changes.added), len(changes.modified),
+                    len(changes.removed), len(changes.unchanged))
+        return changes
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the legacy parse() result: {"files": {...}, "README.md": str}."""
+        return {"files": dict(self.iter_contents()), "README.md": self.readme}
+
+    def close(self) -> None:
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def __enter__(self) -> "RepoView":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _find_readme(self) -> Optional[str]:
+        # Prefer the shallowest README so a nested docs/README never shadows the root one
+        candidates = [p for p in self._text_paths
+                      if os.path.basename(p).lower().startswith("readme")]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda p: p.replace("\\", "/").count("/"))
+
+
 class RepoParser:
     """
     Parse a local repository path, a zipped repository, or a remote git URL.
     Methods:
+      - scan(repo_source: str) -> RepoView (lazy index; content loaded on demand)
       - parse(repo_source: str) -> dict with keys: files (dict fname->content), README.md if present
     Supports:
       - local directory path
       - zip file path
-      - remote git URL
+      - tar archive (.tar, .tar.gz/.tgz, .tar.bz2, .tar.xz, .tar.zst), read in streaming mode
+      - remote git URL (http(s), ssh, git@ or file://)
+    Every source is filtered by the same ScanPolicy (ignored dirs, per-file cap,
+    compression-ratio guard for archives, and a total file/byte budget that reads
+    READMEs, manifests, docs and entry points first; see ``view.skipped_entries``).
+    ``workers`` bounds the thread pool used for directory traversal and file reads;
+    workers=1 keeps the original single-threaded os.walk behavior.
+    With a ``project_id``, scan() attaches the project's manifest
+    (``manifest_dir``/<project_id>.json): files whose size and mtime are unchanged keep
+    their recorded digest and analysis results, and ``view.changes`` reports the diff.
+    Git sources go through ``git_cache`` (the process-wide GitMirrorCache by default),
+    so repeated parses of one repo only fetch what changed. Set
+    PUBLISH_ASSIST_DISABLE_GIT_CACHE=1 to clone into a throwaway directory instead.
     """
-    def parse(self, repo_source: str) -> Dict[str, Any]:
+    def __init__(self, workers: int = DEFAULT_WORKERS, git_cache: Optional[GitMirrorCache] = None,
+                 policy: Optional[ScanPolicy] = None, manifest_dir: str = DEFAULT_MANIFEST_DIR):
+        self.workers = max(1, workers)
+        self.git_cache = git_cache
+        self.policy = policy or ScanPolicy()
+        self.manifest_dir = manifest_dir
+
+    def scan(self, repo_source: str, project_id: Optional[str] = None) -> RepoView:
+        view = self._scan_source(repo_source)
+        if project_id:
+            self._apply_manifest(view, project_id)
+        return view
+
+    def _scan_source(self, repo_source: str) -> RepoView:
         if os.path.exists(repo_source):
             if os.path.isdir(repo_source):
-                return self._parse_dir(repo_source)
-            elif repo_source.endswith(".zip"):
-                return self._parse_zip(repo_source)
-        elif repo_source.startswith("http") or repo_source.startswith("git@"):
-            return self._parse_git(repo_source)
-        
-        raise ValueError(f"Invalid repo_source: {repo_source}. Must be a local path, zip file, or git URL.")
-
-    def _parse_dir(self, path: str) -> Dict[str, Any]:
-        files = {}
-        readme = ""
-        # Ignore common heavy directories
-        ignore_dirs = {".git", ".venv", "venv", "__pycache__", "node_modules", ".idea", ".vscode"}
-        
+                return self._scan_dir(repo_source)
+            elif repo_source.lower().endswith(".zip"):
+                return self._scan_zip(repo_source)
+            elif _tar_mode(repo_source):
+                return self._scan_tar(repo_source)
+        elif repo_source.startswith(GIT_URL_PREFIXES):
+            return self._scan_git(repo_source)
+
+        raise ValueError(f"Invalid repo_source: {repo_source}. Must be a local path, zip/tar archive, or git URL.")
+
+    def parse(self, repo_source: str) -> Dict[str, Any]:
+        """Compatibility wrapper: materialize the lazy view into the legacy dict."""
+        with self.scan(repo_source) as view:
+            return view.to_dict()
+
+    def _apply_manifest(self, view: RepoView, project_id: str) -> None:
+        # Nothing is read here: untouched files reuse their digest, the rest are
+        # hashed from the bytes the consumer reads (see RepoView.changes)
+        manifest = RepoManifest.for_project(project_id, self.manifest_dir)
+        for entry in view.entries.values():
+            if entry.digest is None:
+                entry.digest = manifest.known_digest(entry.path, entry.size, entry.mtime)
+        view.manifest = manifest
+
+    def _scan_dir(self, path: str) -> RepoView:
+        if self.workers > 1:
+            entries = self._walk_parallel(path)
+        else:
+            entries = self._walk(path)
+        entries = self.policy.apply_budget(entries)
+
+        def load(entry: FileEntry) -> bytes:
+            with open(os.path.join(path, entry.path), "rb") as f:
+                return f.read()
+
+        def open_entry(entry: FileEntry) -> BinaryIO:
+            return open(os.path.join(path, entry.path), "rb")
+
+        return RepoView(entries, load, workers=self.workers, opener=open_entry)
+
+    def _ignore_tree(self, path: str) -> Optional[IgnoreTree]:
+        if not self.policy.respect_gitignore:
+            return None
+        return IgnoreTree.for_directory(path, self.policy.ignore_patterns)
+
+    def _flat_ignore_tree(self, names: set, read: Callable[[str], bytes],
+                          nested: bool = True) -> Optional[IgnoreTree]:
+        """IgnoreTree for flat listings (archives, git trees) whose ignore files are members."""
+        if not self.policy.respect_gitignore:
+            return None
+
+        def read_text(name: str) -> Optional[str]:
+            if name not in names:
+                return None
+            try:
+                return read(name).decode("utf-8", errors="ignore")
+            except Exception as e:
+                logger.warning("Failed to read ignore file %s: %s", name, e)
+                return None
+
+        def read_ignore(rel_dir: str) -> Optional[str]:
+            return read_text(f"{rel_dir}/.gitignore" if rel_dir else ".gitignore") if nested else None
+
+        return IgnoreTree(read_ignore, override_text=read_text(OVERRIDE_FILE) or "",
+                          extra_patterns=self.policy.ignore_patterns)
+
+    def _walk(self, path: str) -> List[FileEntry]:
+        entries = []
+        ignore = self._ignore_tree(path)
         for root, dirs, filenames in os.walk(path):
-            # Modify dirs in-place to prune traversal
-            dirs[:] = [d for d in dirs if d not in ignore_dirs]
-            
-            for fname in filenames:
+            rel_root = os.path.relpath(root, path)
+            rel_root = "" if rel_root == "." else rel_root
+            # Ignore rules are resolved once per directory, before descending
+            matcher = ignore.matcher(rel_root) if ignore else None
+            # Modify dirs in-place to prune traversal; sort for a deterministic index
+            dirs[:] = sorted(
+                d for d in dirs if d not in self.policy.ignore_dirs
+                and not (matcher and matcher.is_ignored(os.path.join(rel_root, d), is_dir=True)))
+
+            for fname in sorted(filenames):
                 full = os.path.join(root, fname)
                 rel = os.path.relpath(full, path)
+                if matcher and matcher.is_ignored(rel, is_dir=False):
+                    continue
                 try:
-                    # Skip binary or very large files
-                    if os.path.getsize(full) > 100_000: # 100KB limit for analysis
+                    st = os.stat(full)
+                    kind = self.policy.admit(rel, st.st_size, lambda: _read_prefix(full))
+                    if kind is None:
                         continue
-                        
-                    with open(full, "r", encoding="utf-8", errors="ignore") as f:
-                        content = f.read()
-                    files[rel] = content
-                    if fname.lower().startswith("readme"):
-                        readme = content
-                except Exception as e:
-                    logger.warning("Failed to read file %s: %s", full, e)
-        return {"files": files, "README.md": readme}
-
-    def _parse_zip(self, zip_path: str) -> Dict[str, Any]:
-        files = {}
-        readme = ""
-        with zipfile.ZipFile(zip_path, "r") as z:
-            for info in z.infolist():
-                if info.is_dir():
-                    continue
-                with z.open(info) as f:
-                    try:
-                        content = f.read().decode("utf-8", errors="ignore")
-                        files[info.filename] = content
-                        if os.path.basename(info.filename).lower().startswith("readme"):
-                            readme = content
-                    except Exception as e:
-                        logger.warning("Failed to decode %s: %s", info.filename, e)
-        return {"files": files, "README.md": readme}
-
-    def _parse_git(self, git_url: str) -> Dict[str, Any]:
-        temp_dir = tempfile.mkdtemp()
-        logger.info(f"Cloning {git_url} to {temp_dir}")
+                    entries.append(FileEntry(path=rel, size=st.st_size, kind=kind, mtime=st.st_mtime))
+                except OSError as e:
+                    logger.warning("Failed to stat file %s: %s", full, e)
+        return entries
+
+    def _walk_parallel(self, path: str) -> List[FileEntry]:
+        """
+        Level-by-level os.scandir traversal with one scandir+stat job per directory.
+        The per-directory results are stitched back in the same top-down, sorted
+        order as _walk(), so the index is identical to the sequential one.
+        """
+        listings: Dict[str, Tuple[List[FileEntry], List[str]]] = {}
+        ignore = self._ignore_tree(path)
+
+        def list_dir(rel_dir: str) -> Tuple[str, List[FileEntry], List[str]]:
+            files, subdirs = [], []
+            full_dir = os.path.join(path, rel_dir) if rel_dir else path
+            matcher = ignore.matcher(rel_dir) if ignore else None
+            try:
+                with os.scandir(full_dir) as it:
+                    dir_entries = sorted(it, key=lambda e: e.name)
+            except OSError as e:
+                logger.warning("Failed to list directory %s: %s", full_dir, e)
+                return rel_dir, files, subdirs
+            for entry in dir_entries:
+                rel = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                try:
+                    if entry.is_dir():
+                        # Like os.walk(followlinks=False): never descend into symlinked dirs
+                        if entry.name not in self.policy.ignore_dirs and not entry.is_symlink() \
+                                and not (matcher and matcher.is_ignored(rel, is_dir=True)):
+                            subdirs.append(rel)
+                        continue
+                    if matcher and matcher.is_ignored(rel, is_dir=False):
+                        continue
+                    st = entry.stat()
+                    kind = self.policy.admit(rel, st.st_size, lambda: _read_prefix(entry.path))
+                    if kind is None:
+                        continue
+                    files.append(FileEntry(path=rel, size=st.st_size, kind=kind, mtime=st.st_mtime))
+                except OSError as e:
+                    logger.warning("Failed to stat file %s: %s", entry.path, e)
+            return rel_dir, files, subdirs
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            frontier = [""]
+            while frontier:
+                next_frontier = []
+                for rel_dir, files, subdirs in pool.map(list_dir, frontier):
+                    listings[rel_dir] = (files, subdirs)
+                    next_frontier.extend(subdirs)
+                frontier = next_frontier
+
+        entries: List[FileEntry] = []
+        stack = [""]
+        while stack:
+            files, subdirs = listings[stack.pop()]
+            entries.extend(files)
+            stack.extend(reversed(subdirs))
+        return entries
+
+    def _scan_zip(self, zip_path: str) -> RepoView:
+        """
+        Index a zip archive from its central directory only. Sizes come from
+        ZipInfo.file_size, so oversized, ignored, encrypted and over-compressed
+        members are rejected before a single byte is decompressed. Members are
+        read on demand through one ZipFile handle per thread.
+        """
+        policy = self.policy
+        z = zipfile.ZipFile(zip_path, "r")
+        ignore = self._flat_ignore_tree(set(z.namelist()), z.read)
+        entries = []
+        for info in z.infolist():
+            if info.is_dir() or policy.is_ignored(info.filename):
+                continue
+            if ignore and ignore.is_path_ignored(info.filename):
+                continue
+            if info.flag_bits & 0x1:
+                logger.warning("Skipping encrypted zip member %s", info.filename)
+                continue
+            ratio = info.file_size / max(info.compress_size, 1)
+            if ratio > policy.max_compression_ratio:
+                logger.warning("Skipping zip member %s: compression ratio %.0f exceeds %.0f",
+                               info.filename, ratio, policy.max_compression_ratio)
+                continue
+            kind = policy.admit(info.filename, info.file_size, lambda: _read_member_prefix(z, info))
+            if kind is None:
+                continue
+            entries.append(FileEntry(path=info.filename, size=info.file_size, kind=kind,
+                                     mtime=time.mktime(info.date_time + (0, 0, -1))))
+        entries = policy.apply_budget(entries)
+
+        handles = [z]
+        local = threading.local()
+        handles_lock = threading.Lock()
+
+        def handle() -> zipfile.ZipFile:
+            z = getattr(local, "zip", None)
+            if z is None:
+                z = local.zip = zipfile.ZipFile(zip_path, "r")
+                with handles_lock:
+                    handles.append(z)
+            return z
+
+        def load(entry: FileEntry) -> bytes:
+            # ZipExtFile never returns more than the declared file_size
+            return handle().read(entry.path)
+
+        def open_entry(entry: FileEntry) -> BinaryIO:
+            return handle().open(entry.path)
+
+        def cleanup() -> None:
+            for handle in handles:
+                handle.close()
+
+        return RepoView(entries, load, cleanup=cleanup, workers=self.workers, opener=open_entry)
+
+    def _scan_tar(self, tar_path: str) -> RepoView:
+        """
+        Index a tar archive in a single streaming pass (no random access, no
+        extraction to disk). Admitted text members are kept in memory, bounded by
+        the policy budget; binaries are recorded as metadata and skipped over.
+        The stream cannot be sorted up front, so when the budget is full a
+        higher-priority member (see ScanPolicy.schedule) evicts the lowest-priority
+        ones already held.
+        """
+        policy = self.policy
+        mode = _tar_mode(tar_path)
+        held_bytes = 0
+        # Max-heap of held text members by (tier, arrival): the root is evicted first.
+        # Each entry carries its budget cost, so eviction refunds what admission charged
+        held: List[Tuple[int, int, str, int]] = []
+        ignore_files: Dict[str, bytes] = {}
+        # Decompression-bomb guard: stop once the stream expands too far
+        max_expanded = os.path.getsize(tar_path) * policy.max_compression_ratio
+        entries: List[FileEntry] = []
+        blobs: Dict[str, bytes] = {}
+        expanded = 0
+        with open(tar_path, "rb") as raw:
+            if mode == "zst":
+                if zstandard is None:
+                    raise ValueError(f"Reading {tar_path} requires the optional 'zstandard' package.")
+                stream = zstandard.ZstdDecompressor().stream_reader(raw)
+                archive = tarfile.open(fileobj=stream, mode="r|")
+            else:
+                archive = tarfile.open(fileobj=raw, mode=mode)
+            with archive:
+                for member in archive:
+                    expanded += member.size
+                    if expanded > max_expanded:
+                        logger.warning("Stopping tar scan of %s: expansion exceeds %.0fx",
+                                       tar_path, policy.max_compression_ratio)
+                        break
+                    name = member.name[2:] if member.name.startswith("./") else member.name
+                    if not member.isfile() or policy.is_ignored(name):
+                        continue
+                    cache: Dict[str, bytes] = {}
+
+                    def read_member() -> bytes:
+                        if "data" not in cache:
+                            fh = archive.extractfile(member)
+                            cache["data"] = fh.read(policy.size_limit(name) + 1) if fh else b""
+                        return cache["data"]
+
+                    kind = policy.admit(name, member.size, lambda: read_member()[:SNIFF_BYTES])
+                    if kind is None:
+                        continue
+                    if kind == TEXT:
+                        data = read_member()[:member.size]
+                        if os.path.basename(name) in (".gitignore", OVERRIDE_FILE):
+                            ignore_files[name] = data
+                        rank = (-file_priority(name), -len(entries))
+                        cost = policy.budget_cost(name, len(data))
+                        while held and (len(held) + 1 > policy.max_files
+                                        or held_bytes + cost > policy.max_total_bytes) \
+                                and held[0][:2] < rank:
+                            _, _, evicted, evicted_cost = heapq.heappop(held)
+                            del blobs[evicted]
+                            held_bytes -= evicted_cost
+                        if len(held) + 1 <= policy.max_files and held_bytes + cost <= policy.max_total_bytes:
+                            heapq.heappush(held, (*rank, name, cost))
+                            held_bytes += cost
+                            blobs[name] = data
+                    entries.append(FileEntry(path=name, size=member.size, kind=kind,
+                                             mtime=float(member.mtime)))
+
+        skipped = 0
+        for entry in entries:
+            if entry.is_text and entry.path not in blobs:
+                entry.skipped = "budget"
+                skipped += 1
+        if skipped:
+            logger.warning("Scan budget reached for %s; skipped %d lower-priority files", tar_path, skipped)
+        # A stream cannot be pruned ahead of time (ignore files may come last), so filter after
+        ignore = self._flat_ignore_tree(set(ignore_files), ignore_files.__getitem__)
+        if ignore:
+            entries = [e for e in entries if not ignore.is_path_ignored(e.path)]
+        return RepoView(entries, lambda entry: blobs[entry.path], workers=self.workers)
+
+    def _scan_git(self, git_url: str) -> RepoView:
+        """
+        Index a remote repository without a working tree: the listing comes from the
+        (cached) partial mirror's trees and only selected blobs are streamed through
+        ``git cat-file --batch`` when read. Large blobs are never transferred.
+        """
+        cache = self._resolve_git_cache()
+        temp_dir = None
+        release = None
         try:
-            subprocess.check_call(["git", "clone", "--depth", "1", git_url, temp_dir])
-            return self._parse_dir(temp_dir)
-        except subprocess.CalledProcessError as e:
+            if cache is None:
+                temp_dir = tempfile.mkdtemp()
+                logger.info(f"Cloning {git_url} to {temp_dir}")
+                subprocess.check_call(["git", "clone", "--quiet", "--bare", "--depth", "1",
+                                       f"--filter={BLOB_FILTER}", git_url, temp_dir])
+                git_dir = temp_dir
+            else:
+                git_dir, release = cache.acquire(git_url)
+            reader = GitBlobReader(git_dir)
+            listing = reader.list_tree()
+        except (subprocess.CalledProcessError, RuntimeError) as e:
+            if release is not None:
+                release()
+            if temp_dir is not None:
+                shutil.rmtree(temp_dir, ignore_errors=True)
             logger.error(f"Git clone failed: {e}")
             raise RuntimeError(f"Failed to clone repository: {git_url}")
-        finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        # Tracked files were published on purpose, so only the override file and policy
+        # patterns apply here, not the repository's own .gitignore files
+        shas = {path: sha for path, sha, _ in listing}
+        ignore = self._flat_ignore_tree(set(shas), lambda name: reader.read(shas[name]), nested=False)
+        entries = []
+        for path, sha, size in listing:
+            if self.policy.is_ignored(path) or (ignore and ignore.is_path_ignored(path)):
+                continue
+            # size is None when the partial clone filtered the blob out, i.e. it is too large
+            size = self.policy.size_limit(path) + 1 if size is None else size
+            kind = self.policy.admit(path, size, lambda: reader.read(sha)[:SNIFF_BYTES])
+            if kind is None:
+                continue
+            entries.append(FileEntry(path=path, size=size, digest=sha, kind=kind))
+        entries = self.policy.apply_budget(entries)
+
+        def load(entry: FileEntry) -> bytes:
+            # digest is the blob sha from ls-tree
+            return reader.read(entry.digest)
+
+        def cleanup() -> None:
+            reader.close()
+            if release is not None:
+                release()
+            if temp_dir is not None:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+        return RepoView(entries, load, cleanup=cleanup, workers=self.workers)
+
+    def _resolve_git_cache(self) -> Optional[GitMirrorCache]:
+        if self.git_cache is not None:
+            return self.git_cache
+        if os.getenv("PUBLISH_ASSIST_DISABLE_GIT_CACHE", "").lower() in {"1", "true", "yes"}:
+            return None
+        try:
+            return GitMirrorCache.default()
+        except OSError as e:
+            logger.warning("Git mirror cache unavailable, cloning without it: %s", e)
+            return None
@@ -0,0 +1,150 @@
+# tools/scan_policy.py
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, FrozenSet, List, Optional, Tuple
+import logging
+
+from tools.file_types import TEXT, classify_extension, sniff
+
+logger = logging.getLogger(__name__)
+
+MAX_FILE_SIZE = 100_000  # 100KB limit for analysis
+# Notebooks are mostly embedded outputs; only their cell sources are extracted
+MAX_NOTEBOOK_SIZE = 20_000_000
+IGNORE_DIRS = frozenset({
+    ".git", ".venv", "venv", "__pycache__", "node_modules", ".idea", ".vscode",
+    # caches and run artifacts that are never worth reading
+    ".mypy_cache", ".pytest_cache", ".ruff_cache", ".tox", ".nox", ".eggs",
+    ".ipynb_checkpoints", "wandb", "mlruns",
+})
+
+# Files that describe how a project is built, installed or run
+MANIFEST_FILES = frozenset({
+    "requirements.txt", "requirements-dev.txt", "pyproject.toml", "setup.py", "setup.cfg",
+    "environment.yml", "environment.yaml", "pipfile", "package.json", "cargo.toml", "go.mod",
+    "dockerfile", "docker-compose.yml", "makefile", "license", "license.md", "citation.cff",
+    "mkdocs.yml",
+})
+ENTRY_POINTS = frozenset({
+    "main.py", "app.py", "run.py", "cli.py", "__main__.py", "train.py", "inference.py",
+    "predict.py", "evaluate.py", "serve.py", "server.py", "manage.py", "demo.py",
+})
+DOC_EXTENSIONS = (".md", ".rst", ".txt")
+
+# Read order tiers: README, manifests, docs, entry points, top-level modules, the rest
+TIER_README, TIER_MANIFEST, TIER_DOCS, TIER_ENTRY, TIER_TOP_LEVEL, TIER_REST = range(6)
+
+
+def file_priority(rel_path: str) -> int:
+    """Read-order tier of a file; lower tiers carry more evidence per byte."""
+    name = os.path.basename(rel_path).lower()
+    depth = rel_path.count("/")
+    if name.startswith("readme"):
+        return TIER_README
+    if name in MANIFEST_FILES or (name.startswith("requirements") and name.endswith(".txt")):
+        return TIER_MANIFEST
+    if name.endswith(DOC_EXTENSIONS) and (depth == 0 or rel_path.lower().startswith(("docs/", "doc/"))):
+        return TIER_DOCS
+    if name in ENTRY_POINTS and depth <= 2:
+        return TIER_ENTRY
+    if depth <= 1:
+        return TIER_TOP_LEVEL
+    return TIER_REST
+
+
+@dataclass
+class ScanPolicy:
+    """
+    Admission rules shared by every source type (directory, zip, tar, git).
+      - ignore_dirs: directory names that are never entered
+      - respect_gitignore: honor nested .gitignore files, .git/info/exclude and the
+        .publishignore override file (see tools.ignore_rules)
+      - ignore_patterns: extra gitignore-style patterns with override precedence
+      - max_file_size: per-file cap for text, checked from metadata before any read
+      - max_notebook_size: larger cap for .ipynb files, whose outputs are dropped
+        when the cells are extracted; they count as at most max_file_size toward
+        the byte budget
+      - max_total_bytes / max_files: budget for text files that will be read. Files
+        are admitted by priority (README, manifests, docs, entry points, top-level
+        modules) and the rest is sampled round-robin across directories; anything
+        over budget stays in the index marked ``skipped="budget"``
+      - max_compression_ratio: archive members that expand more than this are
+        treated as zip bombs and skipped
+    """
+    ignore_dirs: FrozenSet[str] = field(default_factory=lambda: IGNORE_DIRS)
+    respect_gitignore: bool = True
+    ignore_patterns: Tuple[str, ...] = ()
+    max_file_size: int = MAX_FILE_SIZE
+    max_notebook_size: int = MAX_NOTEBOOK_SIZE
+    max_total_bytes: int = 25_000_000
+    max_files: int = 5_000
+    max_compression_ratio: float = 100.0
+
+    def is_ignored(self, rel_path: str) -> bool:
+        """True if any directory component of a '/'-separated path is ignored."""
+        return any(part in self.ignore_dirs for part in rel_path.split("/")[:-1])
+
+    def admit(self, rel_path: str, size: int, read_prefix: Callable[[], bytes]) -> Optional[str]:
+        """
+        Decide how a file enters the index: returns its kind, or None to leave it out.
+        Binaries known by extension are always recorded as metadata, whatever their size;
+        text (or unknown) files over max_file_size are skipped; unknown extensions are
+        classified from a prefix read.
+        """
+        kind = classify_extension(rel_path)
+        if kind is not None and kind != TEXT:
+            return kind
+        if size > self.size_limit(rel_path):
+            return None
+        return kind or sniff(read_prefix())
+
+    def size_limit(self, rel_path: str) -> int:
+        return self.max_notebook_size if rel_path.lower().endswith(".ipynb") else self.max_file_size
+
+    def budget_cost(self, rel_path: str, size: int) -> int:
+        """Bytes a file is charged against max_total_bytes."""
+        return min(size, self.max_file_size) if rel_path.lower().endswith(".ipynb") else size
+
+    def schedule(self, entries: List) -> List:
+        """Text entries in read order: by tier, then deeper tiers sampled fairly."""
+        tiers = defaultdict(list)
+        for entry in entries:
+            if entry.is_text:
+                tiers[file_priority(entry.path)].append(entry)
+        ordered = []
+        for tier in sorted(tiers):
+            group = sorted(tiers[tier], key=lambda e: (e.path.count("/"), e.path))
+            ordered.extend(_round_robin(group) if tier == TIER_REST else group)
+        return ordered
+
+    def apply_budget(self, entries: List) -> List:
+        """Mark text entries that do not fit the file/byte budget as skipped.
+        Index order is preserved; binary entries are metadata only and unaffected."""
+        files, total, skipped = 0, 0, 0
+        for entry in self.schedule(entries):
+            cost = self.budget_cost(entry.path, entry.size)
+            if files + 1 > self.max_files or total + cost > self.max_total_bytes:
+                entry.skipped = "budget"
+                skipped += 1
+                continue
+            files += 1
+            total += cost
+        if skipped:
+            logger.warning("Scan budget reached (%d files / %d bytes); skipped %d lower-priority files",
+                           files, total, skipped)
+        return entries
+
+
+def _round_robin(entries: List) -> List:
+    """Interleave files by parent directory so every directory gets sampled early."""
+    by_dir = defaultdict(list)
+    for entry in entries:
+        by_dir[entry.path.rpartition("/")[0]].append(entry)
+    queues = [by_dir[d] for d in sorted(by_dir)]
+    ordered, index = [], 0
+    while queues:
+        queues = [q for q in queues if len(q) > index]
+        ordered.extend(q[index] for q in queues)
+        index += 1
+    return ordered
@@ -0,0 +1,122 @@
+# tools/search_query.py
+"""
+Compact web-search queries and a cache of their results.
+
+Sending a whole README to Tavily is slow, costly and never reused. Instead:
+  - build_search_query(readme, keywords): the README's title plus its top keywords
+    (from KeywordExtractor, the metadata tags it already produced, or the corpus
+    keyword engine when neither is available), a few words long
+  - normalize_query(query): case, punctuation, word order and duplicates removed, so
+    equivalent queries share one cache entry
+  - SearchCache: LLMCache (memory LRU + SQLite, TTL, coalesced in-flight calls) holding
+    JSON result lists, with its own file and a shorter default TTL
+"""
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import logging
+
+from tools.keyword_engine import KeywordEngine
+from tools.markdown_index import parse_markdown
+from utils.llm_cache import LLMCache
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERY_TERMS = 6     # keywords after the title
+MAX_QUERY_CHARS = 200   # Tavily accepts up to 400; short queries are faster and reusable
+MAX_TITLE_WORDS = 6
+QUERY_SUFFIX = "github"
+SEARCH_BACKEND = "tavily"
+
+DEFAULT_SEARCH_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "publication-assistant",
+                                         "search-cache.sqlite")
+DEFAULT_SEARCH_TTL = 24 * 3600.0
+
+_TITLE_NOISE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)|<[^>]*>|[`*_#:|]")
+_QUERY_WORD = re.compile(r"[a-z0-9][a-z0-9+#.-]*")
+
+
+def readme_title(readme: str) -> str:
+    """Text of the first heading, without links, badges or emphasis."""
+    sections = parse_markdown(readme or "").sections
+    if not sections:
+        return ""
+    title = _TITLE_NOISE.sub(lambda m: m.group(1) or " ", sections[0].title)
+    return " ".join(title.split()[:MAX_TITLE_WORDS])
+
+
+def build_search_query(readme: str, keywords: Optional[Iterable[str]] = None,
+                       extractor: Any = None, max_terms: int = MAX_QUERY_TERMS) -> str:
+    """
+    Short keyword query for similar-repository search.
+    ``keywords`` (e.g. metadata tags) are used when given; otherwise ``extractor``
+    (a KeywordExtractor) condenses the README, or the corpus keyword engine without one.
+    Keywords already in the title are skipped.
+    """
+    if keywords is None:
+        if extractor is not None:
+            keywords = extractor.extract(readme)
+        else:
+            keywords = KeywordEngine().extract(readme, top_k=max_terms)
+    title = readme_title(readme)
+    seen = set(_QUERY_WORD.findall(title.lower()))
+    parts = [title] if title else []
+    for keyword in keywords:
+        words = _QUERY_WORD.findall(str(keyword).lower())
+        if not words or set(words) <= seen:
+            continue
+        parts.append(" ".join(words))
+        seen.update(words)
+        if len(parts) - (1 if title else 0) >= max_terms:
+            break
+    if not parts:  # nothing to condense: fall back to the README's opening words
+        parts = [" ".join((readme or "").split()[:12])]
+    parts.append(QUERY_SUFFIX)
+    query = " ".join(p for p in parts if p)
+    if len(query) > MAX_QUERY_CHARS:
+        query = query[:MAX_QUERY_CHARS].rsplit(" ", 1)[0]
+    return query
+
+
+def normalize_query(query: str) -> str:
+    """Cache identity of a query: lower-cased, de-punctuated, de-duplicated, sorted words."""
+    return " ".join(sorted(set(_QUERY_WORD.findall((query or "").lower()))))
+
+
+class SearchCache(LLMCache):
+    """
+    Web search results by normalized query (see LLMCache for tiers, TTL and coalescing).
+    Configured from PUBLISH_ASSIST_SEARCH_CACHE[_TTL_HOURS]; "off" keeps results in memory.
+    """
+
+    _default: Optional["SearchCache"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = DEFAULT_SEARCH_CACHE_PATH, ttl: float = DEFAULT_SEARCH_TTL, **kwargs):
+        super().__init__(path=path, ttl=ttl, **kwargs)
+
+    @classmethod
+    def default(cls) -> "SearchCache":
+        with cls._default_lock:
+            if cls._default is None:
+                path = os.path.expanduser(os.getenv("PUBLISH_ASSIST_SEARCH_CACHE") or DEFAULT_SEARCH_CACHE_PATH)
+                if path.lower() in {"0", "off", "false", "no"}:
+                    path = None
+                ttl_hours = os.getenv("PUBLISH_ASSIST_SEARCH_CACHE_TTL_HOURS")
+                cls._default = cls(path=path, ttl=float(ttl_hours) * 3600 if ttl_hours else DEFAULT_SEARCH_TTL)
+            return cls._default
+
+    def results(self, query: str, search: Callable[[str], List[Dict[str, Any]]],
+                params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Cached results for ``query``, or ``search(query)`` run once for all concurrent
+        callers of the same normalized query. Empty results and errors are not stored.
+        """
+        def call() -> Optional[str]:
+            found = search(query)
+            return json.dumps(found) if found else None
+
+        text = self.get_or_call(SEARCH_BACKEND, "search", normalize_query(query), call, params=params)
+        return json.loads(text) if text else []
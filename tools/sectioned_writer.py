@@ -0,0 +1,347 @@
+# tools/sectioned_writer.py
+"""
+Map-reduce README generation for long outputs.
+
+One long completion produces the whole document serially, so its wall-clock time is
+the sum of all sections. For long articles the writer instead runs three steps:
+  - outline: one short JSON call for the title and 3-8 sections, each with a focus
+    and a word target (falls back to a fixed outline if the reply is unusable)
+  - map: every section is generated concurrently (bounded by max_workers) from its
+    own prompt, which carries only the context packed for that section's topic
+  - reduce: sections are stitched in outline order under normalized headings, and a
+    short JSON consistency pass supplies the introduction and canonical spellings of
+    terms that the sections wrote differently
+Wall-clock time is then roughly outline + slowest section + consistency pass.
+Prompts are the readme_outline/readme_section/readme_consistency templates of
+tools.prompt_registry, so all sections share one static, provider-cacheable prefix.
+Every prompt is deterministic for the same inputs, so through the response cache a
+rerun only regenerates sections that failed; a section that still fails is left out
+and listed in the report.
+"""
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+from tools.context_packer import ContextPacker
+from tools.prompt_registry import DEFAULT_GOAL, render as render_prompt
+from tools.search_query import readme_title
+
+logger = logging.getLogger(__name__)
+
+# "auto": sectioned for the "Long" length, one call otherwise
+GENERATION_MODES = ("auto", "single", "sectioned")
+LENGTH_GUIDE = {
+    "Short": "about 500-800 words",
+    "Medium": "about 1000-1600 words",
+    "Long": "about 2200-3500 words",
+}
+SECTION_RANGE = {"Short": (3, 4), "Medium": (4, 6), "Long": (6, 8)}
+DEFAULT_SECTION_WORKERS = 6
+SECTION_CONTEXT_TOKENS = 1200
+MIN_SECTION_WORDS, MAX_SECTION_WORDS = 120, 700
+
+FALLBACK_OUTLINE = [
+    ("🌍 Overview", "what the project is, the problem it solves and who it is for"),
+    ("🌟 Key Features", "the main capabilities, grounded in the code and README"),
+    ("📝 Architecture & Structure", "components, modules, data flow and how they interact"),
+    ("🛠️ Tech Stack", "languages, frameworks, models and key dependencies"),
+    ("🚀 Quick Start", "prerequisites, installation and a first run"),
+    ("💡 Usage Examples", "typical commands, API calls or UI workflows with expected output"),
+    ("📊 Results & Evaluation", "metrics, benchmarks or outcomes the repository reports, if any"),
+    ("🤝 Contributing & License", "how to contribute, support, license and citation"),
+]
+
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+def generation_mode(length: Optional[str] = None) -> str:
+    """Effective mode from PUBLISH_ASSIST_GENERATION_MODE and the requested length."""
+    mode = (os.getenv("PUBLISH_ASSIST_GENERATION_MODE") or "auto").lower()
+    if mode not in GENERATION_MODES:
+        logger.warning("Unknown PUBLISH_ASSIST_GENERATION_MODE=%r; using auto", mode)
+        mode = "auto"
+    if mode == "auto":
+        return "sectioned" if (length or "").capitalize() == "Long" else "single"
+    return mode
+
+
+@dataclass
+class OutlineSection:
+    title: str
+    focus: str = ""
+    words: int = 300
+
+
+@dataclass
+class Outline:
+    title: str
+    sections: List[OutlineSection]
+
+
+@dataclass
+class SectionReport:
+    outline: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    seconds: Dict[str, float] = field(default_factory=dict)
+    section_seconds: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"outline": self.outline, "failed": self.failed, "seconds": self.seconds,
+                "section_seconds": self.section_seconds}
+
+
+def _load_json(text: str) -> Any:
+    return json.loads(_JSON_FENCE.sub("", (text or "").strip()))
+
+
+def parse_outline(text: str, min_sections: int = 3, max_sections: int = 8) -> Optional[Outline]:
+    """Outline from the model's JSON, or None if it has too few usable sections."""
+    try:
+        data = _load_json(text)
+    except ValueError:
+        return None
+    items = data.get("sections") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return None
+    sections, seen = [], set()
+    for item in items:
+        if isinstance(item, str):
+            item = {"title": item}
+        if not isinstance(item, dict) or not str(item.get("title", "")).strip():
+            continue
+        title = str(item["title"]).strip().lstrip("#").strip()
+        if title.lower() in seen:
+            continue
+        seen.add(title.lower())
+        try:
+            words = int(item.get("words") or 300)
+        except (TypeError, ValueError):
+            words = 300
+        sections.append(OutlineSection(title, str(item.get("focus", "")).strip(),
+                                       max(MIN_SECTION_WORDS, min(MAX_SECTION_WORDS, words))))
+    if len(sections) < min_sections:
+        return None
+    title = str(data.get("title", "")).strip() if isinstance(data, dict) else ""
+    return Outline(title=title, sections=sections[:max_sections])
+
+
+def normalize_section(title: str, text: str) -> str:
+    """Section text under one "## title" heading, its own headings nested below it.
+    Headings inside code fences are left alone."""
+    lines = (text or "").strip().split("\n")
+    in_fence = False
+    headings = []
+    for n, line in enumerate(lines):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence and _HEADING.match(line):
+            headings.append(n)
+    if headings and headings[0] == 0:
+        first = _HEADING.match(lines[0])
+        title = first.group(2).strip() or title
+        lines = lines[1:]
+        headings = [n - 1 for n in headings[1:]]
+    if headings:  # shift so the shallowest remaining heading becomes ###
+        top = min(len(_HEADING.match(lines[n]).group(1)) for n in headings)
+        for n in headings:
+            hashes, rest = _HEADING.match(lines[n]).groups()
+            lines[n] = "#" * min(6, len(hashes) - top + 3) + " " + rest
+    body = "\n".join(lines).strip()
+    return f"## {title}\n\n{body}" if body else f"## {title}"
+
+
+def apply_terms(text: str, terms: Dict[str, str]) -> str:
+    """Replace variant spellings with canonical ones outside code fences and inline code."""
+    if not terms:
+        return text
+    pairs = sorted(((k, v) for k, v in terms.items() if k and v and k != v), key=lambda kv: -len(kv[0]))
+    if not pairs:
+        return text
+    pattern = re.compile("|".join(r"(?<![\w-])" + re.escape(k) + r"(?![\w-])" for k, _ in pairs))
+    mapping = dict(pairs)
+    out, in_fence = [], False
+    for line in text.split("\n"):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            parts = line.split("`")
+            parts[::2] = [pattern.sub(lambda m: mapping[m.group(0)], p) for p in parts[::2]]
+            line = "`".join(parts)
+        out.append(line)
+    return "\n".join(out)
+
+
+class SectionedWriter:
+    """
+    Outline -> concurrent sections -> consistency pass (see module docstring).
+    ``complete(prompt)`` returns the model's text (cached and routed by the caller)
+    and raises on failure.
+    """
+
+    def __init__(self, complete: Callable[[str], str], provider: str = "google", model: str = "",
+                 max_workers: Optional[int] = None, context_tokens: int = SECTION_CONTEXT_TOKENS):
+        self.complete = complete
+        self.provider = provider
+        self.model = model
+        if max_workers is None:
+            env = os.getenv("PUBLISH_ASSIST_SECTION_WORKERS")
+            max_workers = int(env) if env else DEFAULT_SECTION_WORKERS
+        self.max_workers = max(1, max_workers)
+        self.context_tokens = context_tokens
+        self.last_report: Optional[SectionReport] = None
+
+    def write(self, readme: str, examples: List[Dict[str, Any]] = (), hints: List[str] = (),
+              repo_context: str = "", style: str = "Technical Blog", goal: str = "", length: str = "Long",
+              on_partial: Optional[Callable[[str], None]] = None) -> str:
+        report = self.last_report = SectionReport()
+        started = time.monotonic()
+        outline = self.outline(readme, repo_context, style, goal, length)
+        report.outline = [s.title for s in outline.sections]
+        report.seconds["outline"] = round(time.monotonic() - started, 3)
+
+        texts: Dict[int, str] = {}
+
+        def emit() -> None:
+            if on_partial is not None:
+                on_partial(self._stitch(outline.title, "", [texts[i] for i in sorted(texts)]))
+
+        emit()
+        mapped = time.monotonic()
+        pending = list(range(len(outline.sections)))
+        for attempt in range(2):  # a failed section is retried once, on its own
+            if not pending:
+                break
+            pending = self._map(outline, pending, readme, examples, hints, repo_context, style, goal,
+                                texts, emit, report)
+            if pending and attempt == 0:
+                logger.warning("SectionedWriter: retrying %d failed section(s)", len(pending))
+        report.failed = [outline.sections[i].title for i in pending]
+        report.seconds["sections"] = round(time.monotonic() - mapped, 3)
+        if not texts:
+            raise RuntimeError("every section failed")
+
+        reduced = time.monotonic()
+        sections = [texts[i] for i in sorted(texts)]
+        intro, terms = self.consistency(outline, sections, style, goal)
+        document = apply_terms(self._stitch(outline.title, intro, sections), terms)
+        report.seconds["consistency"] = round(time.monotonic() - reduced, 3)
+        report.seconds["total"] = round(time.monotonic() - started, 3)
+        logger.info("SectionedWriter: %d/%d sections in %.2fs (%s)", len(texts), len(outline.sections),
+                    report.seconds["total"], report.seconds)
+        if on_partial is not None:
+            on_partial(document)
+        return document
+
+    def outline(self, readme: str, repo_context: str, style: str, goal: str, length: str) -> Outline:
+        low, high = SECTION_RANGE.get((length or "Long").capitalize(), SECTION_RANGE["Long"])
+        packed = ContextPacker(self.provider, self.model, self.context_tokens).pack(
+            readme, repo_context=repo_context, goal=goal)
+        prompt = render_prompt(
+            "readme_outline",
+            style=style,
+            goal=goal or DEFAULT_GOAL,
+            length=LENGTH_GUIDE.get((length or "Long").capitalize(), LENGTH_GUIDE["Long"]),
+            low=low,
+            high=high,
+            readme=packed.readme,
+            evidence=packed.evidence or "Not available.",
+        )
+        try:
+            parsed = parse_outline(self.complete(prompt), min_sections=low, max_sections=high)
+        except Exception as e:
+            logger.warning("SectionedWriter: outline call failed: %s", e)
+            parsed = None
+        if parsed is None:
+            logger.info("SectionedWriter: using the fallback outline")
+            per_section = 2800 // len(FALLBACK_OUTLINE)
+            parsed = Outline("", [OutlineSection(t, f, per_section) for t, f in FALLBACK_OUTLINE])
+        if not parsed.title:
+            parsed.title = readme_title(readme) or "Project"
+        return parsed
+
+    def _map(self, outline: Outline, indices: List[int], readme, examples, hints, repo_context,
+             style, goal, texts: Dict[int, str], emit: Callable[[], None], report: SectionReport) -> List[int]:
+        """Generate ``indices`` concurrently; returns the ones that failed."""
+        failed = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(indices)),
+                                thread_name_prefix="readme-section") as pool:
+            futures = {pool.submit(self._section, outline, i, readme, examples, hints, repo_context,
+                                   style, goal): i for i in indices}
+            for future in as_completed(futures):
+                i = futures[future]
+                title = outline.sections[i].title
+                try:
+                    text, seconds = future.result()
+                except Exception as e:
+                    logger.warning("SectionedWriter: section %r failed: %s", title, e)
+                    failed.append(i)
+                    continue
+                texts[i] = normalize_section(title, text)
+                report.section_seconds[title] = round(seconds, 3)
+                emit()
+        return sorted(failed)
+
+    def _section(self, outline: Outline, i: int, readme, examples, hints, repo_context, style, goal):
+        started = time.monotonic()
+        section = outline.sections[i]
+        # Only the README parts, code evidence, hints and examples relevant to this section
+        packed = ContextPacker(self.provider, self.model, self.context_tokens).pack(
+            readme, examples or [], hints or [], repo_context, goal=f"{section.title} {section.focus} {goal}")
+        plan = "\n".join(f"{n + 1}. {s.title}" for n, s in enumerate(outline.sections))
+        example_text = "\n".join(f"- {e.get('title', 'Untitled')}: {e.get('snippet', '')}" for e in packed.examples)
+        hint_text = "\n".join(f"- {h}" for h in packed.hints)
+        prompt = render_prompt(
+            "readme_section",
+            title=outline.title,
+            plan=plan,
+            number=i + 1,
+            heading=section.title,
+            focus=section.focus or "as the heading suggests",
+            words=section.words,
+            style=style,
+            goal=goal or DEFAULT_GOAL,
+            readme=packed.readme,
+            evidence=packed.evidence or "Not available.",
+            hints=hint_text or "None.",
+            examples=example_text or "None.",
+        )
+        text = self.complete(prompt)
+        if not text or not text.strip():
+            raise ValueError("empty section")
+        return text, time.monotonic() - started
+
+    def consistency(self, outline: Outline, sections: List[str], style: str, goal: str):
+        """(introduction, {variant: canonical term}) from a short JSON call; ("", {}) on failure."""
+        digest = []
+        for text in sections:
+            heading, _, body = text.partition("\n")
+            first = " ".join(body.split())[:300]
+            digest.append(f"{heading}\n{first}")
+        prompt = render_prompt("readme_consistency", title=outline.title, style=style, goal=goal or "None.",
+                               digest="\n\n".join(digest))
+        try:
+            data = _load_json(self.complete(prompt))
+        except Exception as e:
+            logger.warning("SectionedWriter: consistency pass failed: %s", e)
+            return "", {}
+        if not isinstance(data, dict):
+            return "", {}
+        intro = data.get("intro") if isinstance(data.get("intro"), str) else ""
+        terms = data.get("terms") if isinstance(data.get("terms"), dict) else {}
+        terms = {str(k): str(v) for k, v in list(terms.items())[:10] if isinstance(v, str)}
+        return intro.strip(), terms
+
+    @staticmethod
+    def _stitch(title: str, intro: str, sections: List[str]) -> str:
+        parts = [f"# {title}"] if title else []
+        if intro:
+            parts.append(intro)
+        parts.extend(sections)
+        return "\n\n".join(parts).strip() + "\n"
@@ -0,0 +1,306 @@
+# tools/symbol_index.py
+"""
+Compact, AST-derived index of a repository's Python code, sized for prompts.
+
+Per module it records the docstring summary, classes (bases, public methods), public
+functions with their signatures, imported top-level packages, argparse flags and
+whether the file is an entry point (``if __name__ == "__main__"``).
+  - extract_symbols(path, source): parse one file (pure function, runs in workers)
+  - SymbolIndexBuilder: feed (path, source, digest) while streaming a RepoView;
+    large repos are parsed in a shared ProcessPoolExecutor, and results are cached
+    process-wide by content digest so unchanged files are never re-parsed
+    (add_symbols takes symbols kept from an earlier run, e.g. in a project manifest)
+  - SymbolIndex.to_prompt(max_chars): entry points and CLI first, then modules
+"""
+import ast
+import multiprocessing
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROCESS_THRESHOLD = 200  # Python files below this are parsed in-process
+PARSE_BATCH_SIZE = 64
+CACHE_MAX_ENTRIES = 50_000
+DOC_CHARS = 160
+STDLIB = frozenset(getattr(sys, "stdlib_module_names", ()))
+
+
+@dataclass
+class FunctionSymbol:
+    name: str
+    signature: str
+    doc: str = ""
+
+
+@dataclass
+class ClassSymbol:
+    name: str
+    bases: List[str] = field(default_factory=list)
+    doc: str = ""
+    methods: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ModuleSymbols:
+    path: str
+    doc: str = ""
+    classes: List[ClassSymbol] = field(default_factory=list)
+    functions: List[FunctionSymbol] = field(default_factory=list)
+    imports: List[str] = field(default_factory=list)
+    cli_flags: List[str] = field(default_factory=list)
+    entry_point: bool = False
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ModuleSymbols":
+        return cls(**{**data, "classes": [ClassSymbol(**c) for c in data.get("classes", [])],
+                      "functions": [FunctionSymbol(**f) for f in data.get("functions", [])]})
+
+
+def _summary(doc: Optional[str]) -> str:
+    """First paragraph of a docstring, on one line and truncated."""
+    if not doc:
+        return ""
+    first = " ".join(doc.strip().split("\n\n", 1)[0].split())
+    return first if len(first) <= DOC_CHARS else first[:DOC_CHARS - 3] + "..."
+
+
+def _signature(node: ast.AST) -> str:
+    args = node.args
+    names = [a.arg for a in args.posonlyargs + args.args if a.arg not in ("self", "cls")]
+    if args.vararg:
+        names.append("*" + args.vararg.arg)
+    names.extend(a.arg for a in args.kwonlyargs)
+    if args.kwarg:
+        names.append("**" + args.kwarg.arg)
+    prefix = "async " if isinstance(node, ast.AsyncFunctionDef) else ""
+    return f"{prefix}{node.name}({', '.join(names)})"
+
+
+def _is_main_guard(node: ast.AST) -> bool:
+    if not isinstance(node, ast.If) or not isinstance(node.test, ast.Compare):
+        return False
+    parts = [node.test.left, *node.test.comparators]
+    return any(isinstance(p, ast.Name) and p.id == "__name__" for p in parts) and \
+        any(isinstance(p, ast.Constant) and p.value == "__main__" for p in parts)
+
+
+def extract_symbols(path: str, source: str) -> Optional[ModuleSymbols]:
+    """Symbols of one Python source file, or None if it does not parse."""
+    try:
+        tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError):
+        return None
+    module = ModuleSymbols(path=path, doc=_summary(ast.get_docstring(tree)))
+    imports = set()
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and not node.name.startswith("_"):
+            methods = [_signature(n) for n in node.body
+                       if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
+                       and (not n.name.startswith("_") or n.name == "__init__")]
+            module.classes.append(ClassSymbol(node.name, [ast.unparse(b) for b in node.bases],
+                                              _summary(ast.get_docstring(node)), methods))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and not node.name.startswith("_"):
+            module.functions.append(FunctionSymbol(node.name, _signature(node), _summary(ast.get_docstring(node))))
+        elif _is_main_guard(node):
+            module.entry_point = True
+    # Imports may be nested in functions, try blocks or main guards, but never in expressions
+    for node in _iter_statements(tree.body):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            imports.add(node.module.split(".")[0])
+    module.imports = sorted(imports)
+    # A full walk visits every expression node; only pay for it in argparse files
+    if "add_argument" in source:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) \
+                    and node.func.attr == "add_argument":
+                module.cli_flags.extend(a.value for a in node.args
+                                        if isinstance(a, ast.Constant) and isinstance(a.value, str))
+    return module
+
+
+def _iter_statements(body: List[ast.stmt]) -> Iterator[ast.stmt]:
+    """Every statement in a block, including nested blocks, skipping expression trees."""
+    stack = [body]
+    while stack:
+        for node in stack.pop():
+            yield node
+            for name in ("body", "orelse", "finalbody"):
+                block = getattr(node, name, None)
+                if isinstance(block, list):
+                    stack.append(block)
+            for handler in getattr(node, "handlers", ()):
+                stack.append(handler.body)
+            for case in getattr(node, "cases", ()):
+                stack.append(case.body)
+
+
+def _extract_batch(batch: List[Tuple[str, str]]) -> List[Optional[ModuleSymbols]]:
+    return [extract_symbols(path, source) for path, source in batch]
+
+
+class SymbolIndex:
+    """Symbols of every parsed Python module, keyed by path (index order)."""
+
+    def __init__(self, modules: Dict[str, ModuleSymbols]):
+        self.modules = modules
+
+    def __len__(self) -> int:
+        return len(self.modules)
+
+    @property
+    def entry_points(self) -> List[str]:
+        return [m.path for m in self.modules.values() if m.entry_point]
+
+    def third_party_imports(self) -> List[str]:
+        """Imported top-level packages that are neither stdlib nor the repo's own modules."""
+        local = set()
+        for path in self.modules:
+            parts = path.replace("\\", "/").split("/")
+            local.update(p[:-3] if p.endswith(".py") else p for p in parts)
+        counts: Dict[str, int] = {}
+        for module in self.modules.values():
+            for name in module.imports:
+                if name not in STDLIB and name not in local:
+                    counts[name] = counts.get(name, 0) + 1
+        return sorted(counts, key=lambda n: (-counts[n], n))
+
+    def to_prompt(self, max_chars: int = 4000) -> str:
+        """Plain-text outline, most informative modules first, cut at max_chars."""
+        if not self.modules:
+            return ""
+        lines = []
+        deps = self.third_party_imports()
+        if deps:
+            lines.append("Dependencies: " + ", ".join(deps[:25]))
+        ordered = sorted(self.modules.values(),
+                         key=lambda m: (not m.entry_point, m.path.count("/"), m.path))
+        for module in ordered:
+            block = [f"{module.path}{' [entry point]' if module.entry_point else ''}"
+                     + (f": {module.doc}" if module.doc else "")]
+            if module.cli_flags:
+                block.append("  cli: " + " ".join(module.cli_flags[:15]))
+            for cls in module.classes:
+                bases = f"({', '.join(cls.bases)})" if cls.bases else ""
+                block.append(f"  class {cls.name}{bases}" + (f": {cls.doc}" if cls.doc else ""))
+                if cls.methods:
+                    block.append("    " + ", ".join(cls.methods[:10]))
+            for fn in module.functions:
+                block.append(f"  def {fn.signature}" + (f": {fn.doc}" if fn.doc else ""))
+            lines.extend(block)
+        text, size = [], 0
+        for line in lines:
+            if size + len(line) + 1 > max_chars:
+                text.append(f"... ({len(self.modules)} modules in total)")
+                break
+            text.append(line)
+            size += len(line) + 1
+        return "\n".join(text)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _process_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """One long-lived pool per process. Workers are spawned rather than forked: the
+    server calling this is threaded, and a fork could copy a lock held by another
+    thread into the child. ``workers`` only applies when the pool is first created."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1),
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+class SymbolIndexBuilder:
+    """
+    Incremental builder fed while the repository is streamed once.
+    With ``expected_files`` at or above ``process_threshold`` the parsing runs in the
+    shared process pool, in batches submitted as sources arrive; smaller repos are
+    parsed inline, where shipping sources to workers would cost more than it saves.
+    """
+
+    _cache: "OrderedDict[str, Optional[ModuleSymbols]]" = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, expected_files: int = 0, workers: Optional[int] = None,
+                 process_threshold: int = PROCESS_THRESHOLD):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if expected_files >= process_threshold:
+            self._pool = _process_pool(workers)
+        self._order: List[str] = []
+        self._results: Dict[str, Optional[ModuleSymbols]] = {}
+        self._batch: List[Tuple[str, str, Optional[str]]] = []
+        self._futures: List[Tuple[List[Tuple[str, str, Optional[str]]], Future]] = []
+
+    def add(self, path: str, source: str, digest: Optional[str] = None) -> None:
+        self._order.append(path)
+        cached = self._cache_get(digest)
+        if cached is not False:
+            self._results[path] = _relocate(cached, path)
+            return
+        if self._pool is None:
+            self._store(path, digest, extract_symbols(path, source))
+            return
+        self._batch.append((path, source, digest))
+        if len(self._batch) >= PARSE_BATCH_SIZE:
+            self._submit()
+
+    def add_symbols(self, path: str, symbols: Optional[ModuleSymbols], digest: Optional[str] = None) -> None:
+        """Add a file parsed earlier (e.g. symbols kept in a project manifest)."""
+        self._order.append(path)
+        self._store(path, digest, _relocate(symbols, path))
+
+    def build(self) -> SymbolIndex:
+        self._submit()
+        for batch, future in self._futures:
+            for (path, _, digest), symbols in zip(batch, future.result()):
+                self._store(path, digest, symbols)
+        modules = {p: self._results[p] for p in self._order if self._results.get(p) is not None}
+        return SymbolIndex(modules)
+
+    def _submit(self) -> None:
+        if self._batch:
+            batch, self._batch = self._batch, []
+            self._futures.append((batch, self._pool.submit(_extract_batch, [(p, s) for p, s, _ in batch])))
+
+    def _store(self, path: str, digest: Optional[str], symbols: Optional[ModuleSymbols]) -> None:
+        self._results[path] = symbols
+        if digest is None:
+            return
+        with self._cache_lock:
+            self._cache[digest] = symbols
+            self._cache.move_to_end(digest)
+            while len(self._cache) > CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+
+    def _cache_get(self, digest: Optional[str]):
+        """Cached symbols (possibly None for unparsable files), or False on a miss."""
+        if digest is None:
+            return False
+        with self._cache_lock:
+            if digest not in self._cache:
+                return False
+            self._cache.move_to_end(digest)
+            return self._cache[digest]
+
+
+def _relocate(symbols: Optional[ModuleSymbols], path: str) -> Optional[ModuleSymbols]:
+    """Identical content may live at another path (copies, renames)."""
+    if symbols is None or symbols.path == path:
+        return symbols
+    return ModuleSymbols(path, symbols.doc, symbols.classes, symbols.functions,
+                         symbols.imports, symbols.cli_flags, symbols.entry_point)
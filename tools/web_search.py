@@ -1,28 +1,36 @@
 # tools/web_search.py
 import os
 import logging
-from typing import List, Dict, Any
+from typing import Callable, Iterable, List, Dict, Any, Optional
 try:
     from langchain_community.tools.tavily_search import TavilySearchResults
 except Exception:
     TavilySearchResults = None
 
-try:
-    from google import genai
-except Exception:
-    genai = None
+from tools.context_packer import ContextPacker, estimate_tokens
+from tools.prompt_registry import DEFAULT_GOAL, RenderedPrompt, render as render_prompt
+from tools.search_query import MAX_QUERY_CHARS, SearchCache, build_search_query
+from tools.sectioned_writer import LENGTH_GUIDE, SectionedWriter, generation_mode
+from utils import llm_clients, resilience
+from utils.context_cache import GeminiContextCache, PromptUsage, gemini_usage, groq_usage
+from utils.llm_cache import LLMCache, cache_key
+from utils.provider_router import Backend, Cancelled, ProviderRouter
 
 logger = logging.getLogger(__name__)
 
+GROQ_FALLBACK_MODEL = "llama-3.1-8b-instant"
+GEMINI_FALLBACK_MODEL = "gemini-1.5-flash-latest"
+TAVILY_MAX_RESULTS = 5
+
 
 class WebSearchTool:
-    def __init__(self, selected_model: str = None, provider: str = None):
+    def __init__(self, selected_model: str = None, provider: str = None, keyword_extractor=None):
         # graceful fallbacks if dependencies missing
         self.search = None
         tavily_key = os.getenv("TAVILY_API_KEY")
         if TavilySearchResults is not None and tavily_key:
             try:
-                self.search = TavilySearchResults(max_results=5)
+                self.search = TavilySearchResults(max_results=TAVILY_MAX_RESULTS)
                 logger.info("WebSearchTool: Tavily search tool initialized.")
             except Exception as e:
                 logger.error(
@@ -32,36 +40,18 @@ class WebSearchTool:
             logger.warning(
                 f"WebSearchTool: Tavily tool NOT initialized. Key missing: {not tavily_key}")
 
+        # Condenses README-sized search queries (tools.search_query.build_search_query)
+        self.keyword_extractor = keyword_extractor
         self.model = None
         self.selected_model = selected_model or "gemini-1.5-flash"
         self.provider = provider or "google"
-        self.gemini_client = None
-        self.groq_client = None
         self.active_client = None
-        # Try to initialize both clients if possible
-        google_api_key = os.getenv("GOOGLE_API_KEY")
-        groq_api_key = os.getenv("GROQ_API_KEY")
-        # Gemini (Google)
-        if genai is not None and google_api_key:
-            try:
-                self.gemini_client = genai.Client(api_key=google_api_key)
-                logger.info(
-                    "WebSearchTool: Gemini client successfully initialized.")
-            except Exception as e:
-                logger.error(
-                    f"WebSearchTool: Gemini client initialization failed: {e}")
-                self.gemini_client = None
-        # Groq (Llama)
-        try:
-            from groq import Groq
-            if groq_api_key:
-                self.groq_client = Groq(api_key=groq_api_key)
-                logger.info(
-                    "WebSearchTool: Groq client successfully initialized.")
-        except Exception as e:
-            logger.warning(
-                f"WebSearchTool: Groq client initialization failed: {e}")
-            self.groq_client = None
+        self.last_context_report = None
+        self.last_generation_report = None
+        self.last_usage: List[PromptUsage] = []
+        # Long-lived clients shared process-wide (None if the SDK or key is missing)
+        self.gemini_client = llm_clients.get_client("google")
+        self.groq_client = llm_clients.get_client("groq")
 
         # Set active client based on provider, fallback if needed
         if self.provider == "google":
@@ -74,321 +64,109 @@ class WebSearchTool:
     def search_similar_repos(self, query: str, top_k: int = 3) -> List[Dict]:
         """
         Searches for similar repositories or articles using Tavily.
+        Results are cached by normalized query and concurrent identical searches share
+        one request; a README-sized query is first condensed to title + keywords.
         """
+        if self.search is None:
+            logger.warning(
+                "Tavily search tool unavailable; returning empty results.")
+            return []
+        if len(query or "") > MAX_QUERY_CHARS:
+            query = build_search_query(query, extractor=self.keyword_extractor)
         logger.info(f"Searching web with Tavily for: {query}")
         try:
-            if self.search is None:
-                logger.warning(
-                    "Tavily search tool unavailable; returning empty results.")
-                return []
+            results = SearchCache.default().results(query, self._tavily_search,
+                                                    params={"max_results": TAVILY_MAX_RESULTS})
+        except Exception as e:
+            logger.error(f"Tavily search error: {e}")
+            return []
+        return results[:top_k]
 
-            # TavilySearchResults.run returns a list of dictionaries
-            # We use invoke which is standard for LangChain tools
-            results = self.search.invoke(query)
+    def _tavily_search(self, query: str) -> List[Dict]:
+        """One Tavily request, standardized; errors propagate so they are never cached."""
+        # TavilySearchResults.run returns a list of dictionaries
+        # We use invoke which is standard for LangChain tools
+        results = self.search.invoke(query)
 
-            # Ensure results is a list of dicts
-            if isinstance(results, str):
-                logger.warning(
-                    f"Tavily returned a string instead of a list: {results[:100]}...")
-                return []
+        # Ensure results is a list of dicts
+        if isinstance(results, str):
+            logger.warning(
+                f"Tavily returned a string instead of a list: {results[:100]}...")
+            return []
 
-            if not isinstance(results, list):
-                logger.warning(
-                    f"Tavily returned unexpected type: {type(results)}")
-                return []
-
-            # Standardize output
-            clean_results = []
-            for res in results[:top_k]:
-                if not isinstance(res, dict):
-                    continue
-                clean_results.append({
-                    "title": res.get("title", "No Title"),
-                    "link": res.get("url", ""),  # Tavily uses 'url'
-                    "snippet": res.get("content", "")  # Tavily uses 'content'
-                })
-            return clean_results
-        except Exception as e:
-            logger.error(f"Tavily search error: {e}")
+        if not isinstance(results, list):
+            logger.warning(
+                f"Tavily returned unexpected type: {type(results)}")
             return []
 
-    def summarize_and_improve(self, readme: str, examples: List[Dict], style: str = "Technical Blog", goal: str = "") -> str:
+        # Standardize output
+        clean_results = []
+        for res in results:
+            if not isinstance(res, dict):
+                continue
+            clean_results.append({
+                "title": res.get("title", "No Title"),
+                "link": res.get("url", ""),  # Tavily uses 'url'
+                "snippet": res.get("content", "")  # Tavily uses 'content'
+            })
+        return clean_results
+
+    def summarize_and_improve(self, readme: str, examples: List[Dict], style: str = "Technical Blog", goal: str = "",
+                              repo_context: str = "", hints: Optional[List[str]] = None,
+                              on_partial: Optional[Callable[[str], None]] = None, length: Optional[str] = None) -> str:
         """
         Uses Gemini to suggest improvements based on the current README, found examples, and user goal.
+        ``repo_context`` is the symbol index outline of the code (tools.symbol_index) and
+        ``hints`` are RAG best-practice suggestions. README sections, code evidence, hints
+        and examples are packed into a token budget (tools.context_packer); the report
+        of what was included is kept in ``last_context_report``.
+        With ``on_partial``, the provider's streaming API is used and the callback receives
+        the text generated so far after every chunk (a fallback provider starts over).
+        ``length`` ("Short", "Medium", "Long") sets the target length; long articles are
+        written section by section in parallel (tools.sectioned_writer), and the report of
+        that run is kept in ``last_generation_report``.
+        Prompts come from tools.prompt_registry with a static, cacheable prefix; the
+        cached and fresh input tokens of every request are kept in ``last_usage``.
         """
-        logger.info(f"summarize_and_improve: Style={style}, Goal={goal}")
-
-        example_text = ""
-        if examples:
-            example_text = "\n\n".join(
-                [f"Example ({e['title']}): {e['snippet']}" for e in examples if isinstance(e, dict)])
-
-        prompt = f"""
-        You are an expert AI Developer Advocate, Technical Writer, and Open Source Documentation Specialist.
-
-        Your task is to transform the provided GitHub repository into a publication-ready, highly engaging, technically accurate README.
-
-        Writing Style:
-        {style}
-
-        User Goal:
-        {goal if goal else "Improve the repository for public sharing, discoverability, and technical clarity."}
-
-        Repository README:
-        {readme[:4000]}
-
-        Relevant examples and external references:
-        {example_text}
-
-        OBJECTIVE
-
-        Analyze the repository and generate an improved README that accurately represents the project.
-
-        Do NOT use generic templates.
-
-        Instead, infer the repository's purpose, architecture, workflow, users, technologies, and strengths from the provided repository information.
-
-        Every recommendation must be grounded in available repository evidence. If information cannot be confirmed, clearly indicate uncertainty rather than inventing details.
-
-        CONTENT REQUIREMENTS
-
-        Your generated README should include appropriate sections based on the repository.
-
-        Possible sections include (only include when relevant):
-        - Project Title
-        - Short Project Summary
-        - Overview
-        - Why This Project Matters
-        - Problem Statement
-        - Key Features
-        - Repository Highlights
-        - Architecture
-        - System Workflow
-        - Project Structure
-        - Installation
-        - Requirements
-        - Quick Start
-        - Usage Examples
-        - Configuration
-        - Technologies Used
-        - Model(s)
-        - Dataset Information
-        - API Reference
-        - Evaluation
-        - Results
-        - Benchmarks
-        - Performance
-        - Screenshots Placeholders
-        - Examples
-        - Testing
-        - Deployment
-        - Contributing
-        - Roadmap
-        - FAQ
-        - License
-        - Citation
-        - Acknowledgements
-
-        Choose sections dynamically.
-
-        Never include irrelevant sections.
-
-        ESSENTIAL README ELEMENTS
-
-        Whenever relevant, include the following repository-specific details:
-        - a clear project name and one-line value proposition
-        - the problem the project solves
-        - the core solution or approach
-        - how the system works or is used
-        - prerequisites and installation steps
-        - quick-start examples
-        - architecture or workflow explanation
-        - key technical components and dependencies
-        - evaluation, benchmarks, or results when available
-        - limitations, assumptions, or known issues
-        - contribution and support guidance
-        - license, citation, or acknowledgements when appropriate
-
-        For AI/ML repositories, also include relevant details about models, datasets, training strategy, evaluation metrics, and reproducibility when supported by the repository evidence.
-
-        REPOSITORY ANALYSIS
-
-        Before writing, analyze:
-        - repository purpose
-        - target users
-        - major features
-        - technologies
-        - architecture
-        - workflow
-        - installation process
-        - strengths
-        - weaknesses
-        - missing documentation
-        - missing developer information
-        - discoverability
-        - readability
-
-        Use these findings throughout the README.
-
-        DOCUMENTATION IMPROVEMENTS
-
-        Improve:
-        - clarity
-        - organization
-        - readability
-        - navigation
-        - consistency
-        - completeness
-        - developer experience
-
-        Rewrite weak sections.
-
-        Expand incomplete sections.
-
-        Keep strong existing content.
-
-        DISCOVERABILITY
-
-        Improve discoverability by naturally optimizing:
-        - repository title
-        - summary
-        - headings
-        - keywords
-        - terminology
-        - GitHub search relevance
-
-        Do NOT create a keyword list.
-
-        Instead integrate keywords naturally.
-
-        TECHNICAL ACCURACY
-
-        Never invent:
-        - features
-        - benchmarks
-        - datasets
-        - APIs
-        - models
-        - integrations
-        - metrics
-        - architecture
-
-        If something appears incomplete or uncertain:
-        - explicitly state that additional repository information would be needed.
-
-        VISUAL PRESENTATION
-
-        Produce a visually engaging README.
-
-        Use:
-        - emojis for headings
-        - markdown tables
-        - checklists
-        - blockquotes
-        - collapsible sections where useful
-        - code blocks
-        - callouts
-        - horizontal rules
-
-        When appropriate, generate Mermaid diagrams for:
-        - architecture
-        - workflow
-        - pipeline
-        - component interaction
-
-        Only generate diagrams when enough information exists.
-
-        EXAMPLES
-
-        If enough information exists, generate:
-        - installation example
-        - usage example
-        - CLI example
-        - API example
-        - expected output example
-
-        Otherwise omit them.
-
-        AUDIENCE ADAPTATION
-
-        Infer the primary audience.
-
-        Examples include:
-        - AI researchers
-        - ML engineers
-        - developers
-        - students
-        - contributors
-        - end users
-
-        Adjust tone and explanations accordingly.
-
-        README QUALITY
-
-        Ensure the README is:
-        - technically accurate
-        - easy to scan
-        - beginner friendly
-        - professional
-        - publication ready
-        - visually engaging
-        - repository specific
+        logger.info(f"summarize_and_improve: Style={style}, Goal={goal}, Length={length}")
+        self.last_generation_report = None
+        self.last_usage = []
 
-        OUTPUT RULES
-
-        Output ONLY the improved README in Markdown.
-
-        Do NOT explain your reasoning.
-
-        Do NOT mention these instructions.
-
-        Do NOT use placeholder text unless repository information is genuinely unavailable.
-
-        Do NOT produce a generic README template.
-
-        Generate documentation that feels uniquely written for this repository and fully aligned with the user's stated goal.
-        ADDITIONAL REQUIREMENTS
-
-        - Rewrite the README specifically for this repository, not as a generic template.
-        - Extract the actual project purpose, main workflow, and standout capabilities from the supplied README and repository context.
-        - Highlight project-specific details such as the problem solved, target users, core features, architecture, and expected outcomes.
-        - Recommend a better project title or summary only if it improves clarity for the repository.
-        - Suggest relevant tags or categories,
-        - Identify missing sections or unclear parts of the README and add them in a polished way.
-        - Propose visual or structural enhancements such as diagrams, tables, callouts, code blocks, and step-by-step examples.
-        - Make the README more discoverable, clear, complete, and publication-ready.
-        - Tailor the content to the most likely audience: developers, researchers, contributors, or end users.
-        - If the repository is an AI/ML or agentic project, emphasize architecture, tooling, workflows, and practical value clearly.
-        - Avoid inventing features; if something is uncertain, describe it cautiously and accurately.
-
-        STRICT CONSTRAINTS
-
-        1. Use relevant emojis for EVERY header and for key feature points.
-        2. Use bullet points, checklists, and callouts extensively. Avoid long paragraphs (no "passages").
-        3. Include clear, attractive sections like:
-            - 🌍 Introduction
-            - 🎯 **Value Proposition** (Address the user's specific goal if provided)
-            - 🚀 **Quick Start**
-            - 🛠️ **Tech Stack** (Use a bulleted list with emojis)
-            - 📝 **Architecture & Structure** (Deep dive into the project's logic)
-            - 🌟 **Key Features**
-            - 👥 **Who Should Use This**
-            - ✅ **Success Criteria**
-        4. Make the tone professional but high-energy and visually engaging.
-        5. Use Markdown tables where appropriate for technical specs or comparisons.
-        6. Use interactive elements where possible (e.g., checklists, collapsible sections, callouts, or code blocks for demos).
-        7. DO NOT output a passage or essay. Output must be a visually engaging, sectioned, and interactive-ready article.
-        8. If the user specified a goal, make sure that goal is prominently addressed in the text.
-        9. Output ONLY the improved README markdown, using Markdown and HTML for visual effects.
-
-
-
-        """
+        if self.active_client is not None and generation_mode(length) == "sectioned":
+            writer = SectionedWriter(self._complete, provider=self.provider, model=self.selected_model)
+            try:
+                text = writer.write(readme, examples or [], hints or [], repo_context, style=style, goal=goal,
+                                    length=length or "Long", on_partial=on_partial)
+                self.last_generation_report = writer.last_report
+                return text
+            except Exception as e:
+                logger.warning("Sectioned generation failed (%s); falling back to a single call", e)
+
+        packer = ContextPacker(provider=self.provider, model=self.selected_model)
+        packed = packer.pack(readme, examples or [], hints or [], repo_context, goal)
+        self.last_context_report = packed.report
+        example_text = "\n\n".join(
+            [f"Example ({e.get('title', 'Untitled')}): {e.get('snippet', '')}" for e in packed.examples])
+        hint_text = "\n".join(f"- {h}" for h in packed.hints)
+        length_text = f"\nTarget Length:\n{LENGTH_GUIDE[length]}\n" if length in LENGTH_GUIDE else ""
+
+        # Static instructions first (provider-cacheable prefix), request data last
+        prompt = render_prompt(
+            "readme_improve",
+            style=style,
+            goal=goal or DEFAULT_GOAL,
+            length=length_text,
+            readme=packed.readme,
+            evidence=packed.evidence if packed.evidence else "Not available.",
+            hints=hint_text if hint_text else "None.",
+            examples=example_text,
+        )
+
+        logger.info("summarize_and_improve: prompt ~%d tokens, %d in the static prefix (context %s)",
+                    packer.tokens(prompt), packer.tokens(prompt.prefix), packed.report.summary())
 
         try:
-            # Use the correct client and model based on provider
             client = self.active_client
-            model = self.selected_model
             if client is None:
                 logger.warning(
                     "No LLM client available in summarize_and_improve; returning simple heuristic improvement.")
@@ -396,67 +174,228 @@ class WebSearchTool:
                 title = lines[0] if lines else "Project"
                 return f"# {title}\n\nImproved summary: This project implements X. Add Installation and Usage sections."
 
-            # Google Gemini
-            if self.provider == "google" and hasattr(client, "models"):
+            if not self._backends():
+                logger.error("No valid LLM provider or client found.")
+                return "Error: No valid LLM provider or client found."
+            return self._complete(prompt, on_partial=on_partial)
+        except Exception as e:
+            logger.error(f"LLM generation failed: {e}")
+            return f"Error generating improvement suggestions: {str(e)}"
+
+    def _complete(self, prompt: str, on_partial: Optional[Callable[[str], None]] = None) -> str:
+        """Completion from the response cache or, on a miss, the routed backends; raises on failure."""
+        backends = self._backends()
+        if not backends:
+            raise RuntimeError("No valid LLM provider or client found.")
+
+        # A cached answer from any candidate backend needs no routing at all
+        cache = LLMCache.default()
+        for backend in backends:
+            cached = cache.get(cache_key(backend.provider, backend.model, prompt))
+            if cached:
+                _record_usage(getattr(self, "last_usage", None), backend.provider, backend.model, prompt,
+                              response_cache=True)
+                if on_partial is not None:
+                    on_partial(cached)
+                return cached
+
+        # Fastest healthy backend first; the other takes over on failure or, when
+        # hedging, once the first runs past its p95 latency
+        text, backend = ProviderRouter.default().call(backends, prompt, on_partial=on_partial)
+        logger.info("LLM completion answered by %s", backend.key)
+        return text
+
+    def _backends(self) -> List[Backend]:
+        """Selected provider/model first, then the other provider with its fallback model.
+        Providers whose circuit breaker is open are dropped while another remains."""
+        gemini = self.gemini_client if self.gemini_client is not None and hasattr(self.gemini_client, "models") else None
+        groq = self.groq_client if self.groq_client is not None and hasattr(self.groq_client, "chat") else None
+
+        def gemini_backend(model: str) -> Backend:
+            return Backend("google", model, lambda prompt, cancel, on_partial: self._gemini_text(
+                gemini, model, prompt, on_partial, cancel, usage=getattr(self, "last_usage", None)))
+
+        def groq_backend(model: str) -> Backend:
+            return Backend("groq", model, lambda prompt, cancel, on_partial: self._groq_text(
+                groq, model, prompt, on_partial, cancel, usage=getattr(self, "last_usage", None)))
+
+        backends = []
+        if self.provider == "google":
+            if gemini is not None:
+                backends.append(gemini_backend(self.selected_model))
+            if groq is not None:
+                # Always use a valid Groq model for fallback
+                backends.append(groq_backend(GROQ_FALLBACK_MODEL))
+        elif self.provider == "groq":
+            if groq is not None:
+                backends.append(groq_backend(self.selected_model))
+            if gemini is not None:
+                # Always use a valid Gemini model for fallback
+                backends.append(gemini_backend(GEMINI_FALLBACK_MODEL))
+        # Providers with an open circuit fail fast; leave them out while another is usable
+        available = [b for b in backends if resilience.is_available(b.provider)]
+        return available or backends
+
+    @staticmethod
+    def _gemini_text(client, model: str, prompt: str, on_partial: Optional[Callable[[str], None]] = None,
+                     cancel=None, usage: Optional[List[PromptUsage]] = None) -> str:
+        """Gemini completion through the shared response cache ("" if empty).
+        A RenderedPrompt's static prefix is sent as a context cache when one can be
+        created, otherwise as a system instruction."""
+        def send(notify, request, cache_name):
+            # With a cancel event the reply is streamed even if nobody watches it, so a
+            # losing hedged request stops at its next chunk instead of running to the end
+            if notify is None and cancel is None:
+                response = client.models.generate_content(model=model, **request)
+                text = response.text if response else None
+                _record_usage(usage, "google", model, prompt, gemini_usage(getattr(response, "usage_metadata", None)),
+                              context_cache=cache_name is not None, output=text)
+                return text
+            last: List[Any] = []
+            chunks = client.models.generate_content_stream(model=model, **request)
+            text = _collect_stream(chunks, lambda chunk: chunk.text, notify or _ignore, cancel, last=last)
+            _record_usage(usage, "google", model, prompt,
+                          gemini_usage(getattr(last[0], "usage_metadata", None) if last else None),
+                          context_cache=cache_name is not None, output=text)
+            return text
+
+        def call(notify):
+            def attempt(notify):
+                request, cache_name = _gemini_request(client, model, prompt)
                 try:
-                    response = client.models.generate_content(
-                        model=model,
-                        contents=prompt
-                    )
-                    if not response or not response.text:
-                        logger.error("Gemini returned empty response")
-                        return "Error: AI generated an empty response."
-                    return response.text
+                    return send(notify, request, cache_name)
                 except Exception as e:
-                    logger.error(
-                        f"Gemini call failed, trying Groq if available: {e}")
-                    # Fallback to Groq if available
-                    if self.groq_client:
-                        try:
-                            # Always use a valid Groq model for fallback
-                            groq_model = "llama-3.1-8b-instant"
-                            groq_response = self.groq_client.chat.completions.create(
-                                model=groq_model,
-                                messages=[{"role": "user", "content": prompt}]
-                            )
-                            return groq_response.choices[0].message.content
-                        except Exception as e2:
-                            logger.error(f"Groq fallback also failed: {e2}")
-                            return f"Error generating improvement suggestions: {str(e2)}"
-                    return f"Error generating improvement suggestions: {str(e)}"
-
-            # Groq (Llama)
-            if self.provider == "groq" and hasattr(client, "chat"):
-                try:
-                    groq_response = client.chat.completions.create(
+                    if cache_name is None or "cach" not in str(e).lower():
+                        raise
+                    # Expired or deleted on the server: forget it and send the prefix inline
+                    logger.info("Gemini context cache %s rejected (%s); retrying inline", cache_name, e)
+                    GeminiContextCache.default().invalidate(model, prompt.prefix)
+                    request, _ = _gemini_request(client, model, prompt, use_cache=False)
+                    return send(notify, request, None)
+            return _guarded("google", prompt, attempt, notify)
+        return _cached_completion("google", model, prompt, call, on_partial) or ""
+
+    @staticmethod
+    def _groq_text(client, model: str, prompt: str, on_partial: Optional[Callable[[str], None]] = None,
+                   cancel=None, usage: Optional[List[PromptUsage]] = None) -> str:
+        """Groq chat completion through the shared response cache.
+        A RenderedPrompt's static prefix is the system message (Groq caches prompt prefixes)."""
+        def call(notify):
+            if isinstance(prompt, RenderedPrompt) and prompt.prefix:
+                messages = [{"role": "system", "content": prompt.prefix}, {"role": "user", "content": prompt.suffix}]
+            else:
+                messages = [{"role": "user", "content": prompt}]
+
+            def attempt(notify):
+                if notify is None and cancel is None:  # see _gemini_text
+                    response = client.chat.completions.create(
                         model=model,
-                        messages=[{"role": "user", "content": prompt}]
+                        messages=messages
                     )
-                    return groq_response.choices[0].message.content
-                except Exception as e:
-                    logger.error(
-                        f"Groq call failed, trying Gemini if available: {e}")
-                    # Fallback to Gemini if available
-                    if self.gemini_client:
-                        try:
-                            # Always use a valid Gemini model for fallback
-                            gemini_model = "gemini-1.5-flash-latest"
-                            response = self.gemini_client.models.generate_content(
-                                model=gemini_model,
-                                contents=prompt
-                            )
-                            if not response or not response.text:
-                                logger.error("Gemini returned empty response")
-                                return "Error: AI generated an empty response."
-                            return response.text
-                        except Exception as e2:
-                            logger.error(f"Gemini fallback also failed: {e2}")
-                            return f"Error generating improvement suggestions: {str(e2)}"
-                    return f"Error generating improvement suggestions: {str(e)}"
-
-            # If all else fails
-            logger.error("No valid LLM provider or client found.")
-            return "Error: No valid LLM provider or client found."
-        except Exception as e:
-            logger.exception(f"LLM generation crash: {e}")
-            return f"Error generating improvement suggestions: {str(e)}"
+                    text = response.choices[0].message.content
+                    _record_usage(usage, "groq", model, prompt, groq_usage(getattr(response, "usage", None)),
+                                  output=text)
+                    return text
+                last: List[Any] = []
+                chunks = client.chat.completions.create(model=model, messages=messages, stream=True)
+                text = _collect_stream(
+                    chunks, lambda chunk: chunk.choices[0].delta.content if chunk.choices else None,
+                    notify or _ignore, cancel, last=last)
+                # Groq reports usage on the final chunk (x_groq.usage)
+                final = last[0] if last else None
+                reported = getattr(getattr(final, "x_groq", None), "usage", None) or getattr(final, "usage", None)
+                _record_usage(usage, "groq", model, prompt, groq_usage(reported), output=text)
+                return text
+            return _guarded("groq", prompt, attempt, notify)
+        return _cached_completion("groq", model, prompt, call, on_partial)
+
+
+def _gemini_request(client, model: str, prompt: str, use_cache: bool = True):
+    """generate_content arguments for ``prompt`` and the context cache they reference (or None)."""
+    if not isinstance(prompt, RenderedPrompt) or not prompt.prefix:
+        return {"contents": prompt}, None
+    name = None
+    if use_cache:
+        name = GeminiContextCache.default().name_for(
+            client, model, prompt.prefix, estimate_tokens(prompt.prefix, "google", model), label=prompt.template)
+    if name:
+        return {"contents": prompt.suffix, "config": {"cached_content": name}}, name
+    return {"contents": prompt.suffix, "config": {"system_instruction": prompt.prefix}}, None
+
+
+def _record_usage(usage: Optional[List[PromptUsage]], provider: str, model: str, prompt: str,
+                  counts=None, context_cache: bool = False, output: Optional[str] = None,
+                  response_cache: bool = False) -> None:
+    """Log one request's cached/fresh input tokens and add it to ``usage``.
+    Without provider counts, tokens are estimated (the prefix counts as cached only
+    when an explicit context cache was referenced)."""
+    record = PromptUsage(provider, model, getattr(prompt, "template", ""),
+                         context_cache=context_cache, response_cache=response_cache)
+    if not response_cache:
+        if counts is not None:
+            record.input_tokens, record.cached_tokens, record.output_tokens = counts
+        else:
+            record.estimated = True
+            record.input_tokens = estimate_tokens(prompt, provider, model)
+            if context_cache:
+                record.cached_tokens = estimate_tokens(prompt.prefix, provider, model)
+            record.output_tokens = estimate_tokens(output or "", provider, model)
+    logger.info("Prompt usage: %s", record.summary())
+    if usage is not None:
+        usage.append(record)
+
+
+def _collect_stream(chunks: Iterable[Any], piece: Callable[[Any], Optional[str]],
+                    notify: Callable[[str], None], cancel=None, last: Optional[List[Any]] = None) -> str:
+    """Join streamed chunks, reporting the accumulated text after each one.
+    Stops with Cancelled once ``cancel`` (a threading.Event) is set. The final chunk
+    (which carries usage counts) is left in ``last``."""
+    parts: List[str] = []
+    for chunk in chunks:
+        if last is not None:
+            last[:] = [chunk]
+        if cancel is not None and cancel.is_set():
+            close = getattr(chunks, "close", None)
+            if callable(close):
+                close()
+            raise Cancelled()
+        text = piece(chunk)
+        if text:
+            parts.append(text)
+            notify("".join(parts))
+    return "".join(parts)
+
+
+def _ignore(text: str) -> None:
+    pass
+
+
+def _guarded(provider: str, prompt: str, attempt: Callable[[Any], Optional[str]],
+             notify: Optional[Callable[[str], None]]) -> Optional[str]:
+    """Run ``attempt(notify)`` under the provider's rate limit, retries and circuit breaker.
+    A stream that already showed text is not retried (the reader would see it restart)."""
+    streamed = []
+
+    def tracked(text: str) -> None:
+        streamed.append(True)
+        notify(text)
+
+    return resilience.call(provider, lambda: attempt(tracked if notify is not None else None),
+                           tokens=estimate_tokens(prompt, provider), retryable=lambda: not streamed)
+
+
+def _cached_completion(provider: str, model: str, prompt: str, call: Callable[[Any], Optional[str]],
+                       on_partial: Optional[Callable[[str], None]]) -> Optional[str]:
+    """Run ``call(notify)`` through the response cache; a cached (or coalesced) answer
+    is reported to ``on_partial`` in one piece."""
+    streamed = []
+
+    def notify(text: str) -> None:
+        streamed.append(True)
+        on_partial(text)
+
+    text = LLMCache.default().get_or_call(
+        provider, model, prompt, lambda: call(notify if on_partial else None))
+    if on_partial is not None and text and not streamed:
+        on_partial(text)
+    return text
@@ -2,10 +2,22 @@
 from .logging import configure_logging
 from .mcp import MCPBus, MCPMessage
 from .evaluation import evaluate_recommendations
+from .singleflight import SingleFlight
+from .llm_cache import LLMCache
+from .llm_clients import LLMClientRegistry
+from .context_cache import GeminiContextCache
+from .provider_router import ProviderRouter
+from .resilience import Resilience
 
 __all__ = [
     "configure_logging",
     "MCPBus",
     "MCPMessage",
     "evaluate_recommendations",
+    "SingleFlight",
+    "LLMCache",
+    "LLMClientRegistry",
+    "GeminiContextCache",
+    "ProviderRouter",
+    "Resilience",
 ]
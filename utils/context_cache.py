@@ -0,0 +1,177 @@
+# utils/context_cache.py
+import hashlib
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+import logging
+
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_TTL = 3600        # seconds a Gemini context cache lives
+REFRESH_MARGIN = 60             # recreate a cache this long before it expires
+MIN_CACHE_TOKENS = 1024         # Gemini rejects smaller cached contents
+RETRY_UNSUPPORTED = 600.0       # seconds before trying again after a failed create
+
+
+@dataclass
+class PromptUsage:
+    """Input/output tokens of one LLM request; ``cached_tokens`` were served from a prefix cache."""
+    provider: str
+    model: str
+    template: str = ""
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    context_cache: bool = False   # an explicit Gemini context cache was referenced
+    response_cache: bool = False  # answered by the local response cache (no provider call)
+    estimated: bool = False       # provider reported no usage; counts are local estimates
+
+    @property
+    def fresh_tokens(self) -> int:
+        return max(0, self.input_tokens - self.cached_tokens)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "fresh_tokens": self.fresh_tokens}
+
+    def summary(self) -> str:
+        if self.response_cache:
+            return f"{self.provider}/{self.model} {self.template}: response cache hit, no input tokens"
+        return (f"{self.provider}/{self.model} {self.template}: {self.input_tokens} input tokens "
+                f"({self.cached_tokens} cached, {self.fresh_tokens} fresh{', estimated' if self.estimated else ''}), "
+                f"{self.output_tokens} output")
+
+
+def _int(value: Any) -> int:
+    return value if isinstance(value, int) else 0
+
+
+def gemini_usage(metadata: Any) -> Optional[Tuple[int, int, int]]:
+    """(input, cached, output) tokens from a Gemini ``usage_metadata``, or None."""
+    if metadata is None or getattr(metadata, "prompt_token_count", None) is None:
+        return None
+    return (_int(metadata.prompt_token_count), _int(getattr(metadata, "cached_content_token_count", 0)),
+            _int(getattr(metadata, "candidates_token_count", 0)))
+
+
+def groq_usage(usage: Any) -> Optional[Tuple[int, int, int]]:
+    """(input, cached, output) tokens from a Groq/OpenAI-style ``usage``, or None."""
+    if usage is None or getattr(usage, "prompt_tokens", None) is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return (_int(usage.prompt_tokens), _int(getattr(details, "cached_tokens", 0)),
+            _int(getattr(usage, "completion_tokens", 0)))
+
+
+def summarize_usage(records: Iterable[PromptUsage]) -> Dict[str, Any]:
+    records = list(records)
+    provider_calls = [r for r in records if not r.response_cache]
+    return {
+        "requests": len(records),
+        "response_cache_hits": len(records) - len(provider_calls),
+        "input_tokens": sum(r.input_tokens for r in provider_calls),
+        "cached_tokens": sum(r.cached_tokens for r in provider_calls),
+        "fresh_tokens": sum(r.fresh_tokens for r in provider_calls),
+        "output_tokens": sum(r.output_tokens for r in provider_calls),
+        "estimated": any(r.estimated for r in provider_calls),
+        "per_request": [r.to_dict() for r in records],
+    }
+
+
+class GeminiContextCache:
+    """
+    Explicit Gemini context caches for static prompt prefixes.
+      - name_for(client, model, prefix, prefix_tokens): name of a cached content holding
+        ``prefix`` as its system instruction, created on first use and recreated shortly
+        before it expires; None if caching is off, the prefix is too small, the SDK has
+        no caches API, or creation failed (retried after RETRY_UNSUPPORTED seconds).
+        Callers then send the prefix as a plain system instruction (the local fallback,
+        which still benefits from Gemini's implicit prefix caching).
+      - invalidate(...): forget a cache the API no longer accepts
+    Concurrent first requests for the same prefix share one create call.
+    """
+
+    _default: Optional["GeminiContextCache"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, ttl: int = DEFAULT_CACHE_TTL, min_tokens: int = MIN_CACHE_TOKENS, enabled: bool = True):
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.enabled = enabled
+        self._entries: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._unsupported: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._metrics = {"created": 0, "reused": 0, "fallbacks": 0, "create_errors": 0}
+
+    @classmethod
+    def default(cls) -> "GeminiContextCache":
+        """Process-wide instance; PUBLISH_ASSIST_CONTEXT_CACHE=off disables explicit caches,
+        PUBLISH_ASSIST_CONTEXT_CACHE_TTL sets their lifetime in seconds."""
+        with cls._default_lock:
+            if cls._default is None:
+                enabled = os.getenv("PUBLISH_ASSIST_CONTEXT_CACHE", "on").lower() not in {"0", "off", "false", "no"}
+                ttl = os.getenv("PUBLISH_ASSIST_CONTEXT_CACHE_TTL")
+                cls._default = cls(ttl=int(ttl) if ttl else DEFAULT_CACHE_TTL, enabled=enabled)
+            return cls._default
+
+    @staticmethod
+    def _key(model: str, prefix: str) -> Tuple[str, str]:
+        return model, hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+
+    def name_for(self, client: Any, model: str, prefix: str, prefix_tokens: int, label: str = "") -> Optional[str]:
+        if not (self.enabled and prefix and prefix_tokens >= self.min_tokens and hasattr(client, "caches")):
+            self._count("fallbacks")
+            return None
+        key = self._key(model, prefix)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] - REFRESH_MARGIN > now:
+                self._metrics["reused"] += 1
+                return entry[0]
+            if self._unsupported.get(key, 0.0) > now:
+                self._metrics["fallbacks"] += 1
+                return None
+        return self._flight.do(key, lambda: self._create(client, model, prefix, key, label))
+
+    def _create(self, client: Any, model: str, prefix: str, key: Tuple[str, str], label: str) -> Optional[str]:
+        with self._lock:  # a concurrent leader may have just created it
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] - REFRESH_MARGIN > time.time():
+                self._metrics["reused"] += 1
+                return entry[0]
+        try:
+            cached = client.caches.create(model=model, config={
+                "system_instruction": prefix,
+                "ttl": f"{self.ttl}s",
+                "display_name": f"publish-assist-{label or 'prompt'}-{key[1][:12]}",
+            })
+            name = cached.name
+        except Exception as e:
+            logger.info("Gemini context cache unavailable for %s (%s); sending the prefix inline", model, e)
+            with self._lock:
+                self._unsupported[key] = time.time() + RETRY_UNSUPPORTED
+                self._metrics["create_errors"] += 1
+                self._metrics["fallbacks"] += 1
+            return None
+        with self._lock:
+            self._entries[key] = (name, time.time() + self.ttl)
+            self._metrics["created"] += 1
+        logger.info("Gemini context cache %s created for %s (%s)", name, model, label)
+        return name
+
+    def invalidate(self, model: str, prefix: str) -> None:
+        with self._lock:
+            self._entries.pop(self._key(model, prefix), None)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._metrics[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._metrics, "active": len(self._entries)}
@@ -0,0 +1,221 @@
+# utils/llm_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "publication-assistant", "llm-cache.sqlite")
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_TTL = 7 * 24 * 3600.0
+DEFAULT_MAX_BYTES = 64 * 1024 ** 2
+EVICT_TO = 0.9  # size eviction trims down to this fraction of max_bytes
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Line endings and trailing/surrounding whitespace never change a prompt's meaning."""
+    lines = prompt.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def cache_key(provider: str, model: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Content address of one completion request."""
+    payload = json.dumps({
+        "provider": provider,
+        "model": model,
+        "prompt": hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest(),
+        "params": params or {},
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Two-tier cache of LLM text responses keyed by (provider, model, normalized
+    prompt hash, generation params).
+      - memory: LRU of the ``memory_entries`` most recent responses
+      - disk: SQLite table shared across runs and processes; entries expire after
+        ``ttl`` seconds and the least recently used are evicted once the stored
+        text exceeds ``max_bytes``
+      - get_or_call(...): cached response, or run ``call`` once (concurrent
+        callers of the same key share it) and store a non-empty result.
+        Exceptions propagate and are never cached.
+      - stats(): hit/miss/store/eviction counters
+    """
+
+    _default: Optional["LLMCache"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._metrics = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            try:
+                self._db = self._connect(path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("LLM cache database unavailable (%s); using memory only", e)
+
+    @classmethod
+    def default(cls) -> "LLMCache":
+        """Process-wide cache configured from PUBLISH_ASSIST_LLM_CACHE[_TTL_HOURS|_MAX_MB].
+        PUBLISH_ASSIST_LLM_CACHE=off keeps responses in memory only."""
+        with cls._default_lock:
+            if cls._default is None:
+                path = os.path.expanduser(os.getenv("PUBLISH_ASSIST_LLM_CACHE") or DEFAULT_CACHE_PATH)
+                if path.lower() in {"0", "off", "false", "no"}:
+                    path = None
+                ttl_hours = os.getenv("PUBLISH_ASSIST_LLM_CACHE_TTL_HOURS")
+                max_mb = os.getenv("PUBLISH_ASSIST_LLM_CACHE_MAX_MB")
+                cls._default = cls(path=path,
+                                   ttl=float(ttl_hours) * 3600 if ttl_hours else DEFAULT_TTL,
+                                   max_bytes=int(max_mb) * 1024 ** 2 if max_mb else DEFAULT_MAX_BYTES)
+            return cls._default
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                          key TEXT PRIMARY KEY,
+                          value TEXT NOT NULL,
+                          size INTEGER NOT NULL,
+                          created REAL NOT NULL,
+                          accessed REAL NOT NULL)""")
+        db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        return db
+
+    def get_or_call(self, provider: str, model: str, prompt: str, call: Callable[[], Optional[str]],
+                    params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        key = cache_key(provider, model, prompt, params)
+        cached = self.get(key)
+        if cached is not None:
+            logger.debug("LLM cache hit for %s/%s", provider, model)
+            return cached
+
+        def compute():
+            # A concurrent leader may have stored it while we waited for the flight
+            value = self.get(key, count=False)
+            if value is None:
+                value = call()
+                if value:
+                    self.set(key, value)
+            return value
+
+        return self._flight.do(key, compute)
+
+    def get(self, key: str, count: bool = True) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                if count:
+                    self._metrics["memory_hits"] += 1
+                return entry[0]
+            if entry is not None:
+                del self._memory[key]
+            row = None
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+                    if row is not None and now - row[1] >= self.ttl:
+                        self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        row = None
+                    elif row is not None:
+                        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                except sqlite3.Error as e:
+                    logger.warning("LLM cache read failed: %s", e)
+                    row = None
+            if row is None:
+                if count:
+                    self._metrics["misses"] += 1
+                return None
+            self._remember(key, row[0], row[1])
+            if count:
+                self._metrics["disk_hits"] += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self._metrics["stores"] += 1
+            if self._db is None:
+                return
+            try:
+                self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                                 (key, value, len(value.encode("utf-8")), now, now))
+                self._evict(now)
+            except sqlite3.Error as e:
+                logger.warning("LLM cache write failed: %s", e)
+
+    def _remember(self, key: str, value: str, created: float) -> None:
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then least recently used rows above the size bound."""
+        expired = self._db.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,)).rowcount
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        evicted = max(expired, 0)
+        if total > self.max_bytes:
+            target = int(self.max_bytes * EVICT_TO)
+            doomed = []
+            for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+                if total <= target:
+                    break
+                doomed.append((key,))
+                total -= size
+            self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+            evicted += len(doomed)
+            for (key,) in doomed:
+                self._memory.pop(key, None)
+        if evicted:
+            self._metrics["evictions"] += evicted
+            logger.info("LLM cache evicted %d entries", evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._metrics)
+            stats["memory_entries"] = len(self._memory)
+            if self._db is not None:
+                try:
+                    count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+                    stats.update(disk_entries=count, disk_bytes=size)
+                except sqlite3.Error:
+                    pass
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
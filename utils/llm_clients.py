@@ -0,0 +1,183 @@
+# utils/llm_clients.py
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+import logging
+
+try:
+    from google import genai
+except Exception:
+    genai = None
+try:
+    from groq import Groq
+except Exception:
+    Groq = None
+try:
+    import httpx
+except Exception:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+API_KEY_ENV = {"google": "GOOGLE_API_KEY", "groq": "GROQ_API_KEY"}
+DEFAULT_MAX_CONCURRENCY = 4
+KEEPALIVE_CONNECTIONS = 8
+KEEPALIVE_EXPIRY = 60.0  # seconds an idle pooled connection stays open
+
+
+def _pool_limits():
+    if httpx is None:
+        return None
+    return httpx.Limits(max_connections=KEEPALIVE_CONNECTIONS * 2,
+                        max_keepalive_connections=KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=KEEPALIVE_EXPIRY)
+
+
+# provider -> why its client runs without the keep-alive pool limits (see stats())
+_pool_fallbacks: Dict[str, str] = {}
+
+
+def _pool_fallback(provider: str, reason: str) -> None:
+    _pool_fallbacks[provider] = reason
+    logger.warning("%s client created without connection pool limits: %s", provider, reason)
+
+
+def _gemini_supports_client_args() -> bool:
+    """Older google-genai releases have no HttpOptions.client_args and reject the pool limits."""
+    http_options = getattr(getattr(genai, "types", None), "HttpOptions", None)
+    fields = getattr(http_options, "model_fields", None) or {}
+    return "client_args" in fields
+
+
+def _make_gemini(api_key: str) -> Any:
+    if genai is None:
+        return None
+    limits = _pool_limits()
+    if limits is None:
+        _pool_fallback("google", "httpx is not installed")
+    elif not _gemini_supports_client_args():
+        _pool_fallback("google", "google-genai has no HttpOptions.client_args; upgrade google-genai")
+    else:
+        try:
+            client = genai.Client(api_key=api_key, http_options={"client_args": {"limits": limits}})
+            _pool_fallbacks.pop("google", None)
+            return client
+        except Exception as e:
+            _pool_fallback("google", f"pool options rejected ({e})")
+    return genai.Client(api_key=api_key)
+
+
+def _make_groq(api_key: str) -> Any:
+    if Groq is None:
+        return None
+    limits = _pool_limits()
+    if limits is not None:
+        _pool_fallbacks.pop("groq", None)
+        return Groq(api_key=api_key, http_client=httpx.Client(limits=limits))
+    _pool_fallback("groq", "httpx is not installed")
+    return Groq(api_key=api_key)
+
+
+DEFAULT_FACTORIES: Dict[str, Callable[[str], Any]] = {"google": _make_gemini, "groq": _make_groq}
+
+
+class LLMClientRegistry:
+    """
+    Process-wide, long-lived LLM clients.
+      - get(provider): the provider's client, created on first use from its API key
+        environment variable (None if the SDK or key is missing). Clients keep a pooled
+        keep-alive HTTP connection pool, so TLS handshakes happen once per host rather
+        than once per request or per agent construction.
+      - limit(provider): context manager holding one of the provider's concurrency
+        slots (PUBLISH_ASSIST_<PROVIDER>_MAX_CONCURRENCY, default 4) for the duration
+        of a request
+      - stats(): per provider, whether a client exists and whether it is pooled (a
+        client created without pool limits is logged at WARNING and reported here)
+    Creation is guarded by a lock, so concurrent first callers share one client.
+    """
+
+    _default: Optional["LLMClientRegistry"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, factories: Optional[Dict[str, Callable[[str], Any]]] = None,
+                 max_concurrency: Optional[Dict[str, int]] = None):
+        self.factories = dict(factories or DEFAULT_FACTORIES)
+        self.max_concurrency = dict(max_concurrency or {})
+        self._clients: Dict[Tuple[str, str], Any] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "LLMClientRegistry":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def get(self, provider: str) -> Any:
+        api_key = os.getenv(API_KEY_ENV.get(provider, ""), "")
+        factory = self.factories.get(provider)
+        if not api_key or factory is None:
+            return None
+        key = (provider, api_key)  # A rotated key gets a fresh client
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            if key not in self._clients:
+                try:
+                    self._clients[key] = factory(api_key)
+                    if self._clients[key] is not None:
+                        logger.info("LLMClientRegistry: %s client initialized.", provider)
+                except Exception as e:
+                    logger.error("LLMClientRegistry: %s client initialization failed: %s", provider, e)
+                    return None
+            return self._clients[key]
+
+    @contextmanager
+    def limit(self, provider: str) -> Iterator[None]:
+        semaphore = self._semaphore(provider)
+        with semaphore:
+            yield
+
+    def _semaphore(self, provider: str) -> threading.BoundedSemaphore:
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            with self._lock:
+                semaphore = self._semaphores.get(provider)
+                if semaphore is None:
+                    cap = self.max_concurrency.get(provider)
+                    if cap is None:
+                        env = os.getenv(f"PUBLISH_ASSIST_{provider.upper()}_MAX_CONCURRENCY")
+                        cap = int(env) if env else DEFAULT_MAX_CONCURRENCY
+                    semaphore = self._semaphores[provider] = threading.BoundedSemaphore(max(1, cap))
+        return semaphore
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            providers = {provider for (provider, _), client in self._clients.items() if client is not None}
+        return {provider: {"client": provider in providers,
+                           "pooled": provider in providers and provider not in _pool_fallbacks,
+                           "pool_fallback": _pool_fallbacks.get(provider)}
+                for provider in self.factories}
+
+    def close(self) -> None:
+        """Close pooled connections (clients are recreated on next use)."""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            close = getattr(client, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception:
+                    pass
+
+
+def get_client(provider: str) -> Any:
+    return LLMClientRegistry.default().get(provider)
+
+
+def limit(provider: str):
+    return LLMClientRegistry.default().limit(provider)
@@ -0,0 +1,230 @@
+# utils/provider_router.py
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 200    # successful calls kept per backend for percentiles
+OUTCOME_WINDOW = 20     # recent outcomes used for the error rate
+MIN_SAMPLES = 3         # percentiles below this many samples are unknown
+ERROR_THRESHOLD = 0.5   # error rate at which a backend is considered unhealthy
+MIN_OUTCOMES = 4        # ...once it has at least this many recent outcomes
+COOLDOWN = 30.0         # seconds after which an unhealthy backend is probed again
+MIN_HEDGE_DELAY = 1.0   # never hedge earlier than this, whatever the p95
+
+
+class Cancelled(Exception):
+    """Raised by a backend call that noticed its cancel event (a hedge was won elsewhere)."""
+
+
+# call(prompt, cancel_event, on_partial) -> text; on_partial is None unless streaming
+BackendCall = Callable[[str, threading.Event, Optional[Callable[[str], None]]], str]
+
+
+@dataclass
+class Backend:
+    provider: str
+    model: str
+    call: BackendCall
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider}/{self.model}"
+
+
+class BackendStats:
+    """Latency percentiles (successful calls) and recent error rate of one backend."""
+
+    def __init__(self):
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._outcomes: Deque[bool] = deque(maxlen=OUTCOME_WINDOW)
+        self._lock = threading.Lock()
+        self.last_failure = 0.0
+        self.calls = 0
+
+    def record(self, success: bool, latency: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self._outcomes.append(success)
+            if success:
+                self._latencies.append(latency)
+            else:
+                self.last_failure = time.monotonic()
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Nearest-rank percentile of successful latencies, or None with too few samples."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < MIN_SAMPLES:
+            return None
+        rank = max(1, min(len(samples), round(p / 100 * len(samples) + 0.5)))
+        return samples[rank - 1]
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            outcomes = list(self._outcomes)
+        return outcomes.count(False) / len(outcomes) if outcomes else 0.0
+
+    @property
+    def healthy(self) -> bool:
+        with self._lock:
+            n = len(self._outcomes)
+        if n < MIN_OUTCOMES or self.error_rate < ERROR_THRESHOLD:
+            return True
+        # Half-open: let one request probe an unhealthy backend after the cooldown
+        return time.monotonic() - self.last_failure >= COOLDOWN
+
+
+class ProviderRouter:
+    """
+    Routes a completion to the fastest healthy backend (provider/model) and can hedge.
+      - rank(backends): healthy before unhealthy; among healthy ones, by measured p50
+        once every one of them has MIN_SAMPLES successes, declared order until then
+      - call(backends, prompt, on_partial): run the first ranked backend; if it fails,
+        the next one starts at once. With hedging, the next one also starts when the
+        running call exceeds its backend's p95; the first successful answer wins and
+        the others are cancelled (streaming calls stop at their next chunk).
+        Once a backend has streamed text to ``on_partial`` it is not hedged.
+      - stats(): per-backend calls, p50/p95, error rate, health, hedges fired and won
+    Statistics are kept per router; ``default()`` shares one per process.
+    """
+
+    _default: Optional["ProviderRouter"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, hedge: bool = True, hedge_percentile: float = 95.0,
+                 min_hedge_delay: float = MIN_HEDGE_DELAY, max_workers: int = 8):
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-route")
+        self._stats: Dict[str, BackendStats] = {}
+        self._lock = threading.Lock()
+        self._hedges = {"fired": 0, "won": 0}
+
+    @classmethod
+    def default(cls) -> "ProviderRouter":
+        """Process-wide router; PUBLISH_ASSIST_HEDGE=0 turns hedging off."""
+        with cls._default_lock:
+            if cls._default is None:
+                hedge = os.getenv("PUBLISH_ASSIST_HEDGE", "1").lower() not in {"0", "false", "no", "off"}
+                cls._default = cls(hedge=hedge)
+            return cls._default
+
+    def stats_for(self, backend: Backend) -> BackendStats:
+        with self._lock:
+            return self._stats.setdefault(backend.key, BackendStats())
+
+    def rank(self, backends: List[Backend]) -> List[Backend]:
+        healthy = [b for b in backends if self.stats_for(b).healthy]
+        unhealthy = [b for b in backends if b not in healthy]
+        p50 = {b.key: self.stats_for(b).percentile(50) for b in healthy}
+        if healthy and all(v is not None for v in p50.values()):
+            healthy.sort(key=lambda b: p50[b.key])  # stable: declared order breaks ties
+        return healthy + unhealthy
+
+    def call(self, backends: List[Backend], prompt: str,
+             on_partial: Optional[Callable[[str], None]] = None) -> Tuple[str, Backend]:
+        order = self.rank(backends)
+        if not order:
+            raise RuntimeError("No LLM backend available")
+        pending: Dict[Future, Tuple[Backend, float, threading.Event, bool]] = {}
+        owner: List[Optional[Backend]] = [None]  # backend whose partial text is shown
+        owner_lock = threading.Lock()
+        errors: List[str] = []
+        launched = 0
+
+        def launch(hedged: bool = False) -> None:
+            nonlocal launched
+            backend = order[launched]
+            launched += 1
+            cancel = threading.Event()
+
+            def partial(text: str) -> None:
+                with owner_lock:
+                    if owner[0] is None:
+                        owner[0] = backend
+                    if owner[0] is backend and not cancel.is_set():
+                        on_partial(text)
+
+            future = self._executor.submit(self._run, backend, prompt, cancel,
+                                           partial if on_partial is not None else None)
+            pending[future] = (backend, time.monotonic(), cancel, hedged)
+
+        launch()
+        while pending or launched < len(order):
+            if not pending:
+                launch()  # every running call failed: fail over immediately
+            timeout = self._hedge_timeout(pending) if launched < len(order) and owner[0] is None else None
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if owner[0] is not None:
+                    continue  # started streaming while we waited: no hedge any more
+                with self._lock:
+                    self._hedges["fired"] += 1
+                logger.info("ProviderRouter: hedging with %s", order[launched].key)
+                launch(hedged=True)
+                continue
+            for future in done:
+                backend, _, _, hedged = pending.pop(future)
+                try:
+                    text = future.result()
+                except Cancelled:
+                    continue
+                except Exception as e:
+                    logger.warning("ProviderRouter: %s failed: %s", backend.key, e)
+                    errors.append(f"{backend.key}: {e}")
+                    with owner_lock:
+                        if owner[0] is backend:
+                            owner[0] = None
+                    continue
+                for _, _, cancel, _ in pending.values():
+                    cancel.set()
+                if hedged:
+                    with self._lock:
+                        self._hedges["won"] += 1
+                return text, backend
+        raise RuntimeError("All LLM backends failed: " + "; ".join(errors))
+
+    def _hedge_timeout(self, pending: Dict[Future, Tuple[Backend, float, threading.Event, bool]]) -> Optional[float]:
+        """Seconds until the newest running call passes its backend's hedge percentile."""
+        if not self.hedge or not pending:
+            return None
+        backend, started, _, _ = max(pending.values(), key=lambda v: v[1])
+        p = self.stats_for(backend).percentile(self.hedge_percentile)
+        if p is None:
+            return None  # no latency profile yet: wait for the answer or a failure
+        return max(0.0, max(p, self.min_hedge_delay) - (time.monotonic() - started))
+
+    def _run(self, backend: Backend, prompt: str, cancel: threading.Event,
+             on_partial: Optional[Callable[[str], None]]) -> str:
+        start = time.monotonic()
+        try:
+            text = backend.call(prompt, cancel, on_partial)
+            if not text:
+                raise ValueError("empty response")
+        except Cancelled:
+            raise
+        except Exception:
+            self.stats_for(backend).record(False, time.monotonic() - start)
+            raise
+        self.stats_for(backend).record(True, time.monotonic() - start)
+        return text
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            items = list(self._stats.items())
+            hedges = dict(self._hedges)
+        backends = {}
+        for key, s in items:
+            p50, p95 = s.percentile(50), s.percentile(95)
+            backends[key] = {"calls": s.calls, "p50": p50, "p95": p95,
+                             "error_rate": round(s.error_rate, 3), "healthy": s.healthy}
+        return {"backends": backends, "hedges": hedges}
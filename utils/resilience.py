@@ -0,0 +1,330 @@
+# utils/resilience.py
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, TypeVar
+import logging
+
+from utils import llm_clients
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# (requests per minute, tokens per minute) per provider; 0 disables that bucket.
+# Overridden by PUBLISH_ASSIST_<PROVIDER>_RPM / PUBLISH_ASSIST_<PROVIDER>_TPM.
+DEFAULT_LIMITS = {"google": (60, 250_000), "groq": (30, 30_000)}
+MAX_THROTTLE_WAIT = 5.0      # seconds a request may wait for the rate limiter
+MAX_ATTEMPTS = 3             # per request, first attempt included
+BACKOFF_BASE = 0.5           # seconds; doubles per retry...
+BACKOFF_CAP = 4.0            # ...up to this
+RETRY_BUDGET = 8.0           # total seconds of backoff one request may spend
+FAILURE_THRESHOLD = 3        # consecutive failed requests (retries exhausted) that open the circuit
+RESET_TIMEOUT = 30.0         # seconds an open circuit waits before a probe request
+
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+TRANSIENT_MARKERS = ("429", "rate limit", "resource_exhausted", "resource exhausted", "unavailable",
+                     "overloaded", "deadline exceeded", "timed out", "timeout", "temporarily")
+TRANSIENT_TYPES = ("Timeout", "Connection", "RateLimit", "ServiceUnavailable", "ResourceExhausted",
+                   "InternalServer", "APIStatusError")
+
+
+class CircuitOpen(RuntimeError):
+    """The provider's circuit is open: fail fast to the fallback path."""
+
+
+class RateLimited(RuntimeError):
+    """The local rate limiter could not grant the request within MAX_THROTTLE_WAIT."""
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Rate limits, server errors, timeouts and connection errors are worth a retry;
+    anything else (bad request, auth, cancellation) is not."""
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int) and value in TRANSIENT_STATUS:
+            return True
+        if isinstance(value, int) and 400 <= value < 500:
+            return False
+    if any(name in type(exc).__name__ for name in TRANSIENT_TYPES):
+        return True
+    message = str(exc).lower()
+    return any(marker in message for marker in TRANSIENT_MARKERS)
+
+
+class TokenBucket:
+    """
+    Refills ``per_minute`` units per minute up to ``capacity`` (default: one minute's worth).
+    acquire(n, timeout) waits for n units and returns False if that takes longer than timeout.
+    A request larger than the capacity waits for a full bucket instead of forever.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are now)."""
+        with self._lock:
+            self._refill(self._clock())
+            missing = min(amount, self.capacity) - self._level
+            return max(0.0, missing / self.rate) if self.rate > 0 else float("inf")
+
+    def take(self, amount: float) -> bool:
+        with self._lock:
+            self._refill(self._clock())
+            amount = min(amount, self.capacity)
+            if self._level < amount:
+                return False
+            self._level -= amount
+            return True
+
+    def acquire(self, amount: float = 1.0, timeout: float = MAX_THROTTLE_WAIT) -> bool:
+        deadline = self._clock() + timeout
+        while not self.take(amount):
+            delay = self.reserve(amount)
+            if self._clock() + delay > deadline:
+                return False
+            time.sleep(max(delay, 0.001))
+        return True
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill(self._clock())
+            return self._level
+
+
+class CircuitBreaker:
+    """
+    closed -> open after ``failure_threshold`` consecutive failures; open rejects calls
+    for ``reset_timeout`` seconds; then half-open lets one probe through, whose success
+    closes the circuit and whose failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = "half_open"
+            return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        with self._lock:
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != "closed":
+                logger.info("Circuit closed after successful probe")
+            self._state, self._failures, self._probing = "closed", 0, False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self.times_opened += 1
+                self._state, self._opened_at = "open", self._clock()
+
+    def release(self) -> None:
+        """End a call that says nothing about provider health (e.g. a bad request)."""
+        with self._lock:
+            self._probing = False
+
+    @property
+    def consecutive_failures(self) -> int:
+        with self._lock:
+            return self._failures
+
+
+@dataclass
+class RetryPolicy:
+    """Capped exponential backoff with full jitter, bounded per request by attempts and total delay."""
+    max_attempts: int = MAX_ATTEMPTS
+    base: float = BACKOFF_BASE
+    cap: float = BACKOFF_CAP
+    budget: float = RETRY_BUDGET
+
+    def delay(self, retry: int) -> float:
+        return random.uniform(0, min(self.cap, self.base * 2 ** retry))
+
+
+class ProviderGuard:
+    """
+    Resilience layer around one provider's requests:
+      - rate limit: request and token buckets (per minute); a request that would wait
+        longer than MAX_THROTTLE_WAIT fails with RateLimited instead of blocking a worker
+      - circuit breaker: while open, calls fail at once with CircuitOpen so callers take
+        their fallback provider or heuristic path without waiting on a sick API; a
+        request counts as one failure once its retries are exhausted, so a single
+        request's retried 429s cannot open the circuit for everyone else
+      - retries: transient errors are retried with jittered backoff while the request's
+        retry budget (attempts and seconds) lasts and the circuit stays closed
+      - concurrency: each attempt holds one of the provider's client-pool slots
+    """
+
+    def __init__(self, provider: str, rpm: Optional[int] = None, tpm: Optional[int] = None,
+                 retry: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None,
+                 max_wait: float = MAX_THROTTLE_WAIT, sleep: Callable[[float], None] = time.sleep):
+        default_rpm, default_tpm = DEFAULT_LIMITS.get(provider, (0, 0))
+        rpm = _env_int(f"PUBLISH_ASSIST_{provider.upper()}_RPM", default_rpm) if rpm is None else rpm
+        tpm = _env_int(f"PUBLISH_ASSIST_{provider.upper()}_TPM", default_tpm) if tpm is None else tpm
+        self.provider = provider
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_wait = max_wait
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._metrics = {"calls": 0, "successes": 0, "failures": 0, "retries": 0,
+                         "short_circuited": 0, "rate_limited": 0, "throttle_wait_s": 0.0}
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._metrics[name] += amount
+
+    def call(self, fn: Callable[[], T], tokens: int = 0, retryable: Optional[Callable[[], bool]] = None) -> T:
+        """
+        Run ``fn`` under the rate limit, breaker and retry policy.
+        ``retryable`` can veto a retry (e.g. once a stream has shown partial text).
+        """
+        self._count("calls")
+        spent = 0.0
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._count("short_circuited")
+                raise CircuitOpen(f"{self.provider} circuit is open")
+            try:
+                self._throttle(tokens)
+            except RateLimited:
+                self.breaker.release()
+                raise
+            try:
+                with llm_clients.limit(self.provider):
+                    result = fn()
+            except Exception as e:
+                if not is_transient(e):
+                    self.breaker.release()
+                    raise
+                self._count("failures")
+                attempt += 1
+                delay = self.retry.delay(attempt - 1)
+                if (attempt >= self.retry.max_attempts or spent + delay > self.retry.budget
+                        or (retryable is not None and not retryable()) or self.breaker.state != "closed"):
+                    self.breaker.record_failure()  # once per request; a failed probe reopens at once
+                    raise
+                logger.warning("%s request failed (%s); retry %d in %.2fs", self.provider, e, attempt, delay)
+                self._count("retries")
+                spent += delay
+                self._sleep(delay)
+                continue
+            self.breaker.record_success()
+            self._count("successes")
+            return result
+
+    def _throttle(self, tokens: int) -> None:
+        start = time.monotonic()
+        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+            if bucket is None or amount <= 0:
+                continue
+            remaining = self.max_wait - (time.monotonic() - start)
+            if not bucket.acquire(amount, timeout=max(0.0, remaining)):
+                self._count("rate_limited")
+                raise RateLimited(f"{self.provider} rate limit: would wait more than {self.max_wait:.0f}s")
+        waited = time.monotonic() - start
+        if waited > 0.001:
+            self._count("throttle_wait_s", waited)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._metrics)
+        stats["throttle_wait_s"] = round(stats["throttle_wait_s"], 3)
+        stats.update(
+            state=self.breaker.state,
+            consecutive_failures=self.breaker.consecutive_failures,
+            times_opened=self.breaker.times_opened,
+            requests_available=round(self.requests.available, 1) if self.requests else None,
+            tokens_available=round(self.tokens.available) if self.tokens else None,
+        )
+        return stats
+
+
+class Resilience:
+    """Process-wide ProviderGuard per provider (see ``guard`` and ``stats``)."""
+
+    _default: Optional["Resilience"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self):
+        self._guards: Dict[str, ProviderGuard] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "Resilience":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def guard(self, provider: str) -> ProviderGuard:
+        with self._lock:
+            if provider not in self._guards:
+                self._guards[provider] = ProviderGuard(provider)
+            return self._guards[provider]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            guards = dict(self._guards)
+        return {provider: guard.stats() for provider, guard in guards.items()}
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    try:
+        return int(value) if value else default
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r", name, value)
+        return default
+
+
+def call(provider: str, fn: Callable[[], T], tokens: int = 0,
+         retryable: Optional[Callable[[], bool]] = None) -> T:
+    return Resilience.default().guard(provider).call(fn, tokens=tokens, retryable=retryable)
+
+
+def is_available(provider: str) -> bool:
+    """False while the provider's circuit is open (callers can skip straight to a fallback)."""
+    return Resilience.default().guard(provider).breaker.state != "open"